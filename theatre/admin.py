@@ -1,4 +1,11 @@
+from django.conf import settings
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.forms.models import BaseInlineFormSet
+from django.utils.functional import cached_property
+
+from theatre.cancellation import release_tickets
 from theatre.models import (
     TheatreHall,
     Genre,
@@ -6,23 +13,157 @@ from theatre.models import (
     Play,
     Performance,
     Reservation,
-    Ticket
+    Ticket,
+    Job,
 )
 
 
+class EstimatedCountPaginator(Paginator):
+    """
+    Take the row count from the planner's estimate when it is above
+    ADMIN_EXACT_COUNT_LIMIT, so changelists of the large tables do not run
+    COUNT(*) over every partition. Smaller results are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            estimate = cursor.fetchone()[0][0]["Plan"]["Plan Rows"]
+        if estimate > settings.ADMIN_EXACT_COUNT_LIMIT:
+            return int(estimate)
+        return super().count
+
+
+class TicketInlineFormSet(BaseInlineFormSet):
+    """One page of the tickets, chosen by `page_number`."""
+
+    page_number = 1
+
+    def get_queryset(self):
+        if not hasattr(self, "page"):
+            paginator = Paginator(
+                super().get_queryset(), settings.ADMIN_TICKETS_PER_PAGE
+            )
+            self.page = paginator.get_page(self.page_number)
+            self.page_range = paginator.get_elided_page_range(
+                self.page.number
+            )
+        return self.page.object_list
+
+
 class TicketInline(admin.TabularInline):
+    """Read-only tickets of a reservation, paged with ?tickets_page=."""
+
     model = Ticket
-    extra = 1
+    formset = TicketInlineFormSet
+    template = "admin/theatre/reservation/ticket_inline.html"
+    fields = ("performance", "row", "seat")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        return (
+            super().get_queryset(request)
+            .select_related("performance__play")
+            .order_by("show_time", "performance", "row", "seat")
+        )
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.page_number = request.GET.get("tickets_page", 1)
+        return formset
 
 
 @admin.register(Reservation)
 class ReservationAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "created_at")
+    list_select_related = ("user",)
+    list_filter = (("created_at", admin.DateFieldListFilter),)
+    # Exact matches use the unique email index.
+    search_fields = ("=user__email",)
+    autocomplete_fields = ("user",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     inlines = (TicketInline, )
 
 
+@admin.register(Ticket)
+class TicketAdmin(admin.ModelAdmin):
+    list_display = ("id", "performance", "row", "seat", "reservation_id")
+    list_select_related = ("performance__play",)
+    list_filter = (("show_time", admin.DateFieldListFilter),)
+    # The primary key leads the index of every partition.
+    ordering = ("-id",)
+    autocomplete_fields = ("performance",)
+    raw_id_fields = ("reservation",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Performance)
+class PerformanceAdmin(admin.ModelAdmin):
+    list_display = ("id", "play", "theatre_hall", "show_time", "end_time")
+    list_select_related = ("play", "theatre_hall")
+    list_filter = (
+        ("show_time", admin.DateFieldListFilter), "theatre_hall"
+    )
+    search_fields = ("play__title",)
+    autocomplete_fields = ("play",)
+    actions = ("cancel_reservations",)
+
+    def get_queryset(self, request):
+        # Autocomplete results are labelled with the play title too.
+        return super().get_queryset(request).select_related("play")
+
+    @admin.action(
+        description="Cancel all reservations for selected performances"
+    )
+    def cancel_reservations(self, request, queryset):
+        released = release_tickets(
+            Ticket.objects.filter(performance__in=queryset)
+        )
+        self.message_user(
+            request,
+            f"Released {len(released)} seats from "
+            f"{len({ticket.reservation_id for ticket in released})} "
+            "reservations.",
+        )
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id", "name", "queue", "status", "priority", "attempts", "run_at"
+    )
+    list_filter = ("status", "queue", "name")
+    readonly_fields = ("created_at", "finished_at", "last_error")
+
+
+@admin.register(Play)
+class PlayAdmin(admin.ModelAdmin):
+    list_display = ("title",)
+    search_fields = ("title",)
+    autocomplete_fields = ("genres", "actors")
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer("search_vector")
+
+
+@admin.register(Genre)
+class GenreAdmin(admin.ModelAdmin):
+    search_fields = ("name",)
+
+
+@admin.register(Actor)
+class ActorAdmin(admin.ModelAdmin):
+    search_fields = ("first_name", "last_name")
+
+
 admin.site.register(TheatreHall)
-admin.site.register(Genre)
-admin.site.register(Actor)
-admin.site.register(Play)
-admin.site.register(Performance)
-admin.site.register(Ticket)
@@ -0,0 +1,336 @@
+import threading
+from datetime import date, datetime, time, timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from theatre.jobs import get_task
+from theatre.models import (
+    ArchivedPerformance,
+    ArchivedTicket,
+    HallOccupancyWeek,
+    Performance,
+    PerformanceSales,
+    PlaySalesDay,
+    Ticket,
+)
+
+_pending = threading.local()
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def _day_range(day: date, field: str = "reservation__created_at") -> Q:
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return Q(**{
+        f"{field}__gte": start,
+        f"{field}__lt": start + timedelta(days=1),
+    })
+
+
+def occupancy(tickets_sold: int, capacity: int) -> float:
+    return round(tickets_sold / capacity, 4) if capacity else 0.0
+
+
+def refresh_performance_sales(performance_ids) -> set:
+    """
+    Recount the tickets of the given performances with one read and one
+    upsert. Returns the (hall id, week) keys whose weekly totals may have
+    changed, including the ones a moved performance left.
+    """
+    performance_ids = set(performance_ids)
+    if not performance_ids:
+        return set()
+
+    weeks = set(
+        PerformanceSales.objects.filter(pk__in=performance_ids)
+        .values_list("theatre_hall_id", "week")
+    )
+    performances = (
+        Performance.objects.filter(pk__in=performance_ids)
+        .select_related("theatre_hall")
+        .only(
+            "show_time",
+            "play_id",
+            "theatre_hall__rows",
+            "theatre_hall__seats_in_row",
+        )
+        .annotate(
+            tickets_sold=Count("tickets"),
+            reservation_count=Count("tickets__reservation", distinct=True),
+        )
+        .order_by()
+    )
+    rows = []
+    for performance in performances:
+        day = timezone.localtime(performance.show_time).date()
+        rows.append(PerformanceSales(
+            performance_id=performance.id,
+            play_id=performance.play_id,
+            theatre_hall_id=performance.theatre_hall_id,
+            date=day,
+            week=week_start(day),
+            capacity=performance.theatre_hall.capacity,
+            tickets_sold=performance.tickets_sold,
+            reservations=performance.reservation_count,
+        ))
+    PerformanceSales.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["performance"],
+        update_fields=[
+            "play", "theatre_hall", "date", "week", "capacity",
+            "tickets_sold", "reservations", "updated_at",
+        ],
+    )
+    return weeks | {(row.theatre_hall_id, row.week) for row in rows}
+
+
+def refresh_hall_weeks(keys) -> None:
+    """
+    Re-add the given (hall id, week) totals from the performance rows,
+    live and archived.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    weeks = {}
+    for model in (PerformanceSales, ArchivedPerformance):
+        totals = (
+            model.objects.filter(
+                theatre_hall_id__in={hall_id for hall_id, _ in keys},
+                week__in={week for _, week in keys},
+            )
+            .order_by()
+            .values("theatre_hall_id", "week")
+            .annotate(
+                performance_count=Count("pk"),
+                capacity_total=Sum("capacity"),
+                tickets_total=Sum("tickets_sold"),
+            )
+        )
+        for total in totals:
+            key = (total["theatre_hall_id"], total["week"])
+            if key not in keys:
+                continue
+            row = weeks.setdefault(key, HallOccupancyWeek(
+                theatre_hall_id=key[0],
+                week=key[1],
+                performances=0,
+                capacity=0,
+                tickets_sold=0,
+            ))
+            row.performances += total["performance_count"]
+            row.capacity += total["capacity_total"]
+            row.tickets_sold += total["tickets_total"]
+    rows = list(weeks.values())
+    HallOccupancyWeek.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["week", "theatre_hall"],
+        update_fields=[
+            "performances", "capacity", "tickets_sold", "updated_at",
+        ],
+    )
+    empty = keys - {(row.theatre_hall_id, row.week) for row in rows}
+    if empty:
+        HallOccupancyWeek.objects.filter(reduce(or_, (
+            Q(theatre_hall_id=hall_id, week=week) for hall_id, week in empty
+        ))).delete()
+
+
+def refresh_play_days(days) -> None:
+    """
+    Recount the tickets sold per play on each of `days`, live and
+    archived, reading only the reservations made on those days.
+    """
+    days = set(days)
+    if not days:
+        return
+    started = timezone.now()
+    live = (
+        Ticket.objects.filter(reduce(or_, map(_day_range, days)))
+        .annotate(day=TruncDate("reservation__created_at"))
+        .order_by()
+        .values_list("performance__play_id", "day", "reservation_id")
+    )
+    archived = (
+        ArchivedTicket.objects.filter(reduce(or_, (
+            _day_range(day, "sold_at") for day in days
+        )))
+        .annotate(day=TruncDate("sold_at"))
+        .order_by()
+        .values_list("performance__play_id", "day", "reservation_id")
+    )
+    # A reservation may have tickets on both sides, so reservations are
+    # counted once over the union rather than summed.
+    sold, params = live.union(archived, all=True).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT play_id, day, COUNT(*), COUNT(DISTINCT reservation_id) "
+            f"FROM ({sold}) AS sold (play_id, day, reservation_id) "
+            "GROUP BY play_id, day",
+            params,
+        )
+        rows = [
+            PlaySalesDay(
+                play_id=play_id,
+                date=day,
+                tickets_sold=tickets_sold,
+                reservations=reservations,
+            )
+            for play_id, day, tickets_sold, reservations in cursor.fetchall()
+        ]
+    PlaySalesDay.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["date", "play"],
+        update_fields=["tickets_sold", "reservations", "updated_at"],
+    )
+    # Plays that sold nothing more on these days were not rewritten.
+    PlaySalesDay.objects.filter(
+        date__in=days, updated_at__lt=started
+    ).delete()
+
+
+def refresh_sales(performance_ids=(), days=(), hall_weeks=()) -> None:
+    refresh_hall_weeks(
+        refresh_performance_sales(performance_ids) | set(hall_weeks)
+    )
+    refresh_play_days(days)
+
+
+def _take_pending() -> dict:
+    pending = getattr(_pending, "marks", None) or {
+        "performance_ids": set(), "days": set(), "hall_weeks": set(),
+    }
+    _pending.marks = {
+        "performance_ids": set(), "days": set(), "hall_weeks": set(),
+    }
+    return pending
+
+
+def _flush_pending() -> None:
+    pending = _take_pending()
+    if any(pending.values()):
+        get_task("theatre.refresh_sales").enqueue(
+            performance_ids=sorted(pending["performance_ids"]),
+            days=sorted(day.isoformat() for day in pending["days"]),
+            hall_weeks=sorted(
+                [hall_id, week.isoformat()]
+                for hall_id, week in pending["hall_weeks"]
+            ),
+        )
+
+
+def mark_sales_stale(performance_ids=(), sold_at=(), removed=()) -> None:
+    """
+    Queue one rollup refresh for everything marked in the current
+    transaction once it commits: the given performances, the days of the
+    `sold_at` reservation times and the weeks of `removed` performances.
+    """
+    if getattr(_pending, "marks", None) is None:
+        _take_pending()
+    _pending.marks["performance_ids"].update(performance_ids)
+    _pending.marks["days"].update(
+        timezone.localtime(moment).date() for moment in sold_at
+    )
+    _pending.marks["hall_weeks"].update(
+        (
+            performance.theatre_hall_id,
+            week_start(timezone.localtime(performance.show_time).date()),
+        )
+        for performance in removed
+    )
+    transaction.on_commit(_flush_pending)
+
+
+def _with_occupancy(rows) -> list[dict]:
+    return [
+        {**row, "occupancy": occupancy(row["tickets_sold"], row["capacity"])}
+        for row in rows
+    ]
+
+
+def performance_report(
+    date_from: date, date_to: date, play_id: int = None
+) -> list[dict]:
+    """Live and archived performances, in date and show time order."""
+    rows = PerformanceSales.objects.filter(date__range=(date_from, date_to))
+    archived = ArchivedPerformance.objects.filter(
+        date__range=(date_from, date_to)
+    )
+    if play_id is not None:
+        rows = rows.filter(play_id=play_id)
+        archived = archived.filter(play_id=play_id)
+    columns = (
+        "performance_id",
+        "date",
+        "play_id",
+        "theatre_hall_id",
+        "capacity",
+        "tickets_sold",
+        "reservations",
+        "show_time",
+        "play_title",
+        "theatre_hall_name",
+    )
+    rows = rows.annotate(
+        show_time=F("performance__show_time"),
+        play_title=F("play__title"),
+        theatre_hall_name=F("theatre_hall__name"),
+    ).values(*columns)
+    archived = archived.annotate(
+        performance_id=F("pk"),
+        play_title=F("play__title"),
+        theatre_hall_name=F("theatre_hall__name"),
+    ).values(*columns)
+    return _with_occupancy(
+        rows.union(archived, all=True).order_by(
+            "date", "show_time", "performance_id"
+        )
+    )
+
+
+def play_sales_report(
+    date_from: date, date_to: date, play_id: int = None
+) -> list[dict]:
+    rows = PlaySalesDay.objects.filter(date__range=(date_from, date_to))
+    if play_id is not None:
+        rows = rows.filter(play_id=play_id)
+    return list(
+        rows.order_by("date", "play__title", "play_id").values(
+            "date",
+            "play_id",
+            "tickets_sold",
+            "reservations",
+            play_title=F("play__title"),
+        )
+    )
+
+
+def hall_occupancy_report(
+    date_from: date, date_to: date, theatre_hall_id: int = None
+) -> list[dict]:
+    """Weeks that overlap the range, so the first one may start earlier."""
+    rows = HallOccupancyWeek.objects.filter(
+        week__range=(week_start(date_from), date_to)
+    )
+    if theatre_hall_id is not None:
+        rows = rows.filter(theatre_hall_id=theatre_hall_id)
+    return _with_occupancy(
+        rows.order_by("week", "theatre_hall__name", "theatre_hall_id").values(
+            "week",
+            "theatre_hall_id",
+            "performances",
+            "capacity",
+            "tickets_sold",
+            theatre_hall_name=F("theatre_hall__name"),
+        )
+    )
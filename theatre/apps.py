@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 
 class TheatreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "theatre"
+
+    def ready(self):
+        from theatre import signals  # noqa: F401
+        from theatre.autocomplete import connect_warm_up
+
+        autodiscover_modules("tasks")
+        connect_warm_up()
@@ -0,0 +1,129 @@
+from datetime import datetime
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from theatre.analytics import week_start
+from theatre.models import (
+    ArchivedPerformance,
+    ArchivedTicket,
+    Performance,
+    Reservation,
+    Ticket,
+)
+from theatre.summary import mark_summaries_stale
+
+ARCHIVED_TICKET_COLUMNS = (
+    "id", "performance_id", "row", "seat", "reservation_id", "user_id",
+    "sold_at",
+)
+
+
+def _archive_tickets(performance_ids: list[int], before: datetime) -> set:
+    """
+    Copy the tickets of `performance_ids` to the archive with one
+    INSERT ... SELECT, then delete them without sending per-ticket
+    signals. The show time bound keeps both to the old partitions.
+    Returns the (user id, reservation id) pairs of the tickets.
+    """
+    tickets = Ticket.objects.filter(
+        performance_id__in=performance_ids, show_time__lt=before
+    ).order_by()
+    select, params = tickets.values_list(
+        "pk",
+        "performance_id",
+        "row",
+        "seat",
+        "reservation_id",
+        "reservation__user_id",
+        "reservation__created_at",
+    ).query.sql_with_params()
+    delete, delete_params = tickets.values("pk").query.sql_with_params()
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(ArchivedTicket._meta.db_table)} "
+            f"({', '.join(map(quote, ARCHIVED_TICKET_COLUMNS))}) {select} "
+            "RETURNING user_id, reservation_id",
+            params,
+        )
+        owners = set(cursor.fetchall())
+        cursor.execute(
+            f"DELETE FROM {quote(Ticket._meta.db_table)} "
+            f"WHERE id IN ({delete}) AND show_time < %s",
+            (*delete_params, before),
+        )
+    return owners
+
+
+def archive_batch(before: datetime, batch_size: int) -> int:
+    """
+    Archive up to `batch_size` of the performances that started before
+    `before`, in one transaction. Each leaves an ArchivedPerformance row
+    with its sales totals; its tickets move to ArchivedTicket and
+    reservations left empty are deleted. Returns the number archived.
+    """
+    with transaction.atomic():
+        performance_ids = list(
+            Performance.objects.filter(show_time__lt=before)
+            .order_by("show_time", "pk")
+            .select_for_update(skip_locked=True)
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not performance_ids:
+            return 0
+
+        performances = (
+            Performance.objects.filter(pk__in=performance_ids)
+            .select_related("theatre_hall")
+            .annotate(
+                tickets_sold=Count("tickets"),
+                reservation_count=Count("tickets__reservation", distinct=True),
+            )
+            .order_by()
+        )
+        archived = []
+        for performance in performances:
+            day = timezone.localtime(performance.show_time).date()
+            archived.append(ArchivedPerformance(
+                id=performance.id,
+                play_id=performance.play_id,
+                theatre_hall_id=performance.theatre_hall_id,
+                show_time=performance.show_time,
+                end_time=performance.end_time,
+                date=day,
+                week=week_start(day),
+                capacity=performance.theatre_hall.capacity,
+                tickets_sold=performance.tickets_sold,
+                reservations=performance.reservation_count,
+            ))
+        ArchivedPerformance.objects.bulk_create(archived)
+
+        owners = _archive_tickets(performance_ids, before)
+        Reservation.objects.filter(
+            pk__in={reservation_id for _, reservation_id in owners},
+            tickets__isnull=True,
+        ).delete()
+        # Schedule, sales, waitlist and seat hold rows go with them.
+        Performance.objects.filter(pk__in=performance_ids).delete()
+        mark_summaries_stale(user_ids={user_id for user_id, _ in owners})
+    return len(performance_ids)
+
+
+def archive_performances(
+    before: datetime, batch_size: int, progress=None
+) -> int:
+    """
+    Archive every performance that started before `before`, one batch
+    per transaction, so locks are short and an interrupted run keeps
+    the batches it finished. Returns the number archived.
+    """
+    total = 0
+    while True:
+        count = archive_batch(before, batch_size)
+        if not count:
+            return total
+        total += count
+        if progress:
+            progress(total)
@@ -0,0 +1,267 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connection
+
+from theatre.models import Actor, Play
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"\w+")
+
+# Longest key bisected for, so a prefix range is [prefix, prefix + MAX_KEY).
+MAX_KEY = "\U0010ffff"
+
+
+def normalize(text: str) -> list[str]:
+    """Lowercased, accent-free words of `text`."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return WORD_RE.findall(text)
+
+
+def _fingerprint(kind: str, pk: int, label: str) -> int:
+    # Stable across processes, unlike hash().
+    digest = hashlib.blake2b(
+        f"{kind}:{pk}:{label}".encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big")
+
+
+class PrefixIndex:
+    """
+    Sorted array of (word, kind, id) keys over the words of every label.
+    A lookup bisects to the range of words starting with the query's
+    longest term and walks it in order, so the shortest completions come
+    first and only about `limit` entries are looked at.
+
+    `version` is the entry count plus an XOR of per-entry fingerprints;
+    it is order independent, so two processes holding the same labels
+    report the same version however their indexes were built.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._labels = {}
+        self._words = {}
+        self._fingerprint = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._labels)
+
+    @classmethod
+    def from_entries(cls, entries) -> "PrefixIndex":
+        """Build an index from unique (kind, id, label) tuples in one sort."""
+        index = cls()
+        for kind, pk, label in entries:
+            index._labels[kind, pk] = label
+            index._words[kind, pk] = sorted(set(normalize(label)))
+            index._fingerprint ^= _fingerprint(kind, pk, label)
+        index._keys = sorted(
+            (word, kind, pk)
+            for (kind, pk), words in index._words.items()
+            for word in words
+        )
+        return index
+
+    @property
+    def version(self) -> str:
+        return f"{len(self._labels)}-{self._fingerprint:016x}"
+
+    def add(self, kind: str, pk: int, label: str) -> None:
+        with self._lock:
+            if self._labels.get((kind, pk)) == label:
+                return
+            self.remove(kind, pk)
+            words = sorted(set(normalize(label)))
+            for word in words:
+                insort(self._keys, (word, kind, pk))
+            self._labels[kind, pk] = label
+            self._words[kind, pk] = words
+            self._fingerprint ^= _fingerprint(kind, pk, label)
+
+    def remove(self, kind: str, pk: int) -> None:
+        with self._lock:
+            label = self._labels.pop((kind, pk), None)
+            if label is None:
+                return
+            for word in self._words.pop((kind, pk)):
+                position = bisect_left(self._keys, (word, kind, pk))
+                del self._keys[position]
+            self._fingerprint ^= _fingerprint(kind, pk, label)
+
+    def search(self, text: str, limit: int = 10) -> list[dict]:
+        terms = normalize(text)
+        if not terms:
+            return []
+        lookup = max(terms, key=len)
+        others = list(terms)
+        others.remove(lookup)
+
+        results = []
+        seen = set()
+        with self._lock:
+            position = bisect_left(self._keys, (lookup,))
+            end = bisect_left(self._keys, (lookup + MAX_KEY,))
+            scan_end = min(end, position + settings.AUTOCOMPLETE_MAX_SCAN)
+            for key in range(position, scan_end):
+                _, kind, pk = self._keys[key]
+                if (kind, pk) in seen:
+                    continue
+                seen.add((kind, pk))
+                words = self._words[kind, pk]
+                if all(
+                    any(candidate.startswith(term) for candidate in words)
+                    for term in others
+                ):
+                    label = self._labels[kind, pk]
+                    results.append({"type": kind, "id": pk, "label": label})
+                    if len(results) == limit:
+                        break
+        return results
+
+
+SOURCES = {
+    "play": lambda: Play.objects.values_list("id", "title"),
+    "actor": lambda: (
+        (actor.id, actor.full_name)
+        for actor in Actor.objects.only("first_name", "last_name")
+    ),
+}
+
+
+def build_index() -> PrefixIndex:
+    return PrefixIndex.from_entries(
+        (kind, pk, label)
+        for kind, rows in SOURCES.items()
+        for pk, label in rows()
+    )
+
+
+_index = None
+_built_at = None
+# Changes made while the index is built, replayed onto the new index.
+_pending = None
+# Held by the thread building the index.
+_index_lock = threading.Lock()
+# Orders index updates with the swap to a new index.
+_updates_lock = threading.Lock()
+
+WARM_UP_UID = "theatre.autocomplete.warm_up"
+
+
+def _is_fresh() -> bool:
+    if _index is None or _built_at is None:
+        return False
+    age = time.monotonic() - _built_at
+    return age < settings.AUTOCOMPLETE_REBUILD_INTERVAL
+
+
+def get_index() -> PrefixIndex:
+    """
+    Return the process-wide index, building it if it is missing. Signals
+    only reach the process that made a change, so the index is also
+    rebuilt every AUTOCOMPLETE_REBUILD_INTERVAL seconds to pick up the
+    others'. The rebuild runs in the background and the previous index is
+    served until it is replaced; only callers without one wait.
+    """
+    index = _index
+    if index is None:
+        with _index_lock:
+            if _index is None:
+                _build()
+            return _index
+    if not _is_fresh():
+        refresh_index()
+    return index
+
+
+def refresh_index() -> None:
+    """Rebuild the index in a background thread, unless one is running."""
+    if not _index_lock.acquire(blocking=False):
+        return
+    try:
+        threading.Thread(
+            target=_rebuild, name="autocomplete-rebuild", daemon=True
+        ).start()
+    except BaseException:
+        _index_lock.release()
+        raise
+
+
+def _rebuild() -> None:
+    global _built_at
+    try:
+        _build()
+    except Exception:
+        logger.exception("Rebuilding the autocomplete index failed.")
+        # Keep serving the previous index and retry after an interval
+        # rather than on every lookup.
+        _built_at = time.monotonic()
+    finally:
+        connection.close()
+        _index_lock.release()
+
+
+def _build() -> None:
+    """Build and install a new index; the caller holds `_index_lock`."""
+    global _index, _built_at, _pending
+    with _updates_lock:
+        _pending = []
+    try:
+        index = build_index()
+    except BaseException:
+        with _updates_lock:
+            _pending = None
+        raise
+    with _updates_lock:
+        for change in _pending:
+            _apply(index, *change)
+        _index, _built_at, _pending = index, time.monotonic(), None
+
+
+def reset_index() -> None:
+    """Rebuild the index on next use; lookups keep it until then."""
+    global _built_at
+    _built_at = None
+
+
+def warm_index(**kwargs) -> None:
+    """
+    `request_started` receiver that starts building the index in the
+    background when the process starts serving, once, so autocomplete
+    lookups find it ready without delaying that first request.
+    """
+    request_started.disconnect(dispatch_uid=WARM_UP_UID)
+    refresh_index()
+
+
+def connect_warm_up() -> None:
+    request_started.connect(warm_index, dispatch_uid=WARM_UP_UID)
+
+
+def _apply(index: PrefixIndex, kind: str, pk: int, label: str) -> None:
+    if label is None:
+        index.remove(kind, pk)
+    else:
+        index.add(kind, pk, label)
+
+
+def index_update(kind: str, pk: int, label: str = None) -> None:
+    """
+    Apply one change to the index if it was already built, and to the
+    index being built, which may have read the rows before the change.
+    """
+    with _updates_lock:
+        if _pending is not None:
+            _pending.append((kind, pk, label))
+        if _index is not None:
+            _apply(_index, kind, pk, label)
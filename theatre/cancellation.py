@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import NamedTuple
+
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.dispatch import Signal
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from theatre.models import Reservation, Ticket
+
+# Sent inside the transaction that released the seats, with `tickets`, a
+# list of ReleasedTicket. Receivers see the tickets already deleted.
+tickets_released = Signal()
+
+
+class ReleasedTicket(NamedTuple):
+    id: int
+    performance_id: int
+    row: int
+    seat: int
+    reservation_id: int
+    sold_at: datetime
+
+
+class CancellationRefused(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = (
+        "Tickets for performances that have started cannot be cancelled."
+    )
+    default_code = "cancellation_refused"
+
+
+def release_tickets(tickets: QuerySet) -> list[ReleasedTicket]:
+    """
+    Delete the `tickets` queryset with a single DELETE ... RETURNING,
+    without loading the rows or sending per-ticket signals, then delete
+    the reservations it left empty and send `tickets_released`.
+    """
+    subquery, params = (
+        tickets.order_by().values("pk").query.sql_with_params()
+    )
+    quote = connection.ops.quote_name
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {quote(Ticket._meta.db_table)} AS ticket "
+                f"USING {quote(Reservation._meta.db_table)} AS reservation "
+                "WHERE reservation.id = ticket.reservation_id "
+                f"AND ticket.id IN ({subquery}) "
+                "RETURNING ticket.id, ticket.performance_id, ticket.row, "
+                "ticket.seat, ticket.reservation_id, reservation.created_at",
+                params,
+            )
+            released = [ReleasedTicket(*row) for row in cursor.fetchall()]
+        if released:
+            Reservation.objects.filter(
+                pk__in={ticket.reservation_id for ticket in released},
+                tickets__isnull=True,
+            ).delete()
+            tickets_released.send(sender=Ticket, tickets=released)
+    return released
+
+
+def cancel_tickets(tickets: QuerySet) -> list[ReleasedTicket]:
+    """Release `tickets`, refusing if any is for a started performance."""
+    if tickets.filter(performance__show_time__lte=timezone.now()).exists():
+        raise CancellationRefused()
+    return release_tickets(tickets)
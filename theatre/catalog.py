@@ -0,0 +1,566 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.expressions import ArraySubquery
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.db.models import OuterRef
+
+from theatre import autocomplete
+from theatre.analytics import (
+    refresh_hall_weeks,
+    refresh_performance_sales,
+    refresh_play_days,
+)
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+from theatre.schedule import refresh_schedule
+from theatre.search import update_search_vectors
+
+JSONL = "jsonl"
+CSV = "csv"
+FORMATS = (JSONL, CSV)
+
+
+def chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class CatalogType:
+    """
+    How one model is written to and read from a catalog file. Foreign
+    keys are stored as ids, except `natural_keys`, which are stored as a
+    unique field of the related row (reservations refer to users by
+    email, since user ids differ between installations).
+    """
+
+    def __init__(
+        self,
+        name,
+        model,
+        fields,
+        m2m=(),
+        natural_keys=None,
+        restore=(),
+        validate=None,
+    ):
+        self.name = name
+        self.model = model
+        self.fields = list(fields)
+        self.m2m = list(m2m)
+        self.natural_keys = natural_keys or {}
+        # Written again after the insert, which replaces auto_now_add.
+        self.restore = list(restore)
+        # Drops rows the database would reject, batch at a time.
+        self.validate = validate
+
+    @property
+    def columns(self) -> list[str]:
+        return ["id", *self.fields, *self.m2m]
+
+    def rows(self, chunk_size: int):
+        """Stream the model's rows as plain dicts in primary key order."""
+        queryset = self.model.objects.order_by("pk")
+        values = {"id": "pk"}
+        for name in self.fields:
+            key = self.natural_keys.get(name)
+            values[name] = f"{name}__{key}" if key else name
+        for name in self.m2m:
+            field = self.model._meta.get_field(name)
+            through = field.remote_field.through
+            target = f"{field.m2m_reverse_field_name()}_id"
+            queryset = queryset.annotate(**{
+                f"{name}_ids": ArraySubquery(
+                    through.objects.filter(**{
+                        field.m2m_field_name(): OuterRef("pk")
+                    })
+                    .order_by(target)
+                    .values(target)
+                )
+            })
+            values[name] = f"{name}_ids"
+
+        for row in queryset.values(*values.values()).iterator(
+            chunk_size=chunk_size
+        ):
+            yield {name: row[column] for name, column in values.items()}
+
+    def build(self, record: dict):
+        """An unsaved instance for `record`, or None if it is incomplete."""
+        values = {}
+        for name in self.fields:
+            if name in self.natural_keys:
+                continue
+            field = self.model._meta.get_field(name)
+            value = record.get(name)
+            value = None if value in ("", None) else field.to_python(value)
+            if value is None and not (field.null or field.blank):
+                return None
+            values[field.attname] = value
+        return self.model(pk=int(record["id"]), **values)
+
+    def resolve(self, records: list[dict], objects: list) -> list:
+        """
+        Fill natural keys and drop objects whose foreign keys point at
+        rows that do not exist, with one query per relation.
+        """
+        for name, key in self.natural_keys.items():
+            related = self.model._meta.get_field(name).related_model
+            wanted = {record.get(name) for record in records} - {None, ""}
+            pks = dict(
+                related.objects.filter(**{f"{key}__in": wanted})
+                .values_list(key, "pk")
+            )
+            attname = self.model._meta.get_field(name).attname
+            for record, obj in zip(records, objects):
+                if obj is not None:
+                    setattr(obj, attname, pks.get(record.get(name)))
+
+        objects = [obj for obj in objects if obj is not None]
+        for field in self.model._meta.concrete_fields:
+            if not isinstance(field, models.ForeignKey):
+                continue
+            wanted = {getattr(obj, field.attname) for obj in objects}
+            existing = set(
+                field.related_model.objects.filter(pk__in=wanted - {None})
+                .values_list("pk", flat=True)
+            )
+            objects = [
+                obj for obj in objects
+                if getattr(obj, field.attname) in existing
+            ]
+        return objects
+
+    def m2m_rows(self, records: list[dict], objects: list) -> dict:
+        """Through-table rows per relation, for targets that exist."""
+        kept = {obj.pk for obj in objects}
+        rows = {}
+        for name in self.m2m:
+            field = self.model._meta.get_field(name)
+            through = field.remote_field.through
+            source = f"{field.m2m_field_name()}_id"
+            target = f"{field.m2m_reverse_field_name()}_id"
+            links = {
+                (int(record["id"]), int(target_id))
+                for record in records
+                if int(record["id"]) in kept
+                for target_id in parse_ids(record.get(name))
+            }
+            existing = set(
+                field.related_model.objects.filter(
+                    pk__in={target_id for _, target_id in links}
+                ).values_list("pk", flat=True)
+            )
+            rows[through] = [
+                through(**{source: source_id, target: target_id})
+                for source_id, target_id in sorted(links)
+                if target_id in existing
+            ]
+        return rows
+
+
+def _valid_performances(objects: list) -> list:
+    for performance in objects:
+        performance.fill_end_time()
+    return [
+        performance for performance in objects
+        if performance.end_time > performance.show_time
+    ]
+
+
+def _valid_tickets(objects: list) -> list:
+    halls, show_times = {}, {}
+    for pk, rows, seats, show_time in Performance.objects.filter(
+        pk__in={ticket.performance_id for ticket in objects}
+    ).values_list(
+        "pk", "theatre_hall__rows", "theatre_hall__seats_in_row", "show_time"
+    ):
+        halls[pk] = (rows, seats)
+        show_times[pk] = show_time
+    for ticket in objects:
+        ticket.show_time = show_times.get(ticket.performance_id)
+    return [
+        ticket for ticket in objects
+        if 1 <= ticket.row <= halls[ticket.performance_id][0]
+        and 1 <= ticket.seat <= halls[ticket.performance_id][1]
+    ]
+
+
+CATALOG_TYPES = [
+    CatalogType("theatre_hall", TheatreHall, ["name", "rows", "seats_in_row"]),
+    CatalogType("genre", Genre, ["name"]),
+    CatalogType("actor", Actor, ["first_name", "last_name"]),
+    CatalogType(
+        "play", Play, ["title", "description"], m2m=["genres", "actors"]
+    ),
+    CatalogType(
+        "performance",
+        Performance,
+        ["play", "theatre_hall", "show_time", "end_time"],
+        validate=_valid_performances,
+    ),
+    CatalogType(
+        "reservation",
+        Reservation,
+        ["user", "created_at"],
+        natural_keys={"user": get_user_model().USERNAME_FIELD},
+        restore=["created_at"],
+    ),
+    CatalogType(
+        "ticket",
+        Ticket,
+        ["performance", "reservation", "row", "seat"],
+        validate=_valid_tickets,
+    ),
+]
+CATALOG = {catalog_type.name: catalog_type for catalog_type in CATALOG_TYPES}
+
+
+def parse_ids(value) -> list[int]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [int(pk) for pk in value.split()]
+    return [int(pk) for pk in value]
+
+
+def _isoformat(value) -> str:
+    # Unlike DjangoJSONEncoder, keeps microseconds.
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return " ".join(str(item) for item in value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def export_catalog(
+    path: str, fmt: str = JSONL, types=None, chunk_size: int = 2000,
+    progress=None,
+) -> dict:
+    """
+    Write the catalog in dependency order, one record per line, reading
+    `chunk_size` rows at a time. JSONL goes to one file with a `type` key
+    per record; CSV goes to one `<type>.csv` per type in directory `path`.
+    Returns the number of records written per type.
+    """
+    catalog_types = [
+        catalog_type for catalog_type in CATALOG_TYPES
+        if types is None or catalog_type.name in types
+    ]
+    written = {}
+    if fmt == JSONL:
+        with open(path, "w", encoding="utf-8") as output:
+            for catalog_type in catalog_types:
+                count = 0
+                for row in catalog_type.rows(chunk_size):
+                    output.write(json.dumps(
+                        {"type": catalog_type.name, **row},
+                        default=_isoformat,
+                        ensure_ascii=False,
+                    ))
+                    output.write("\n")
+                    count += 1
+                    if progress and count % chunk_size == 0:
+                        progress(catalog_type.name, count)
+                written[catalog_type.name] = count
+    else:
+        os.makedirs(path, exist_ok=True)
+        for catalog_type in catalog_types:
+            count = 0
+            csv_path = os.path.join(path, f"{catalog_type.name}.csv")
+            with open(csv_path, "w", encoding="utf-8", newline="") as output:
+                writer = csv.DictWriter(output, catalog_type.columns)
+                writer.writeheader()
+                for row in catalog_type.rows(chunk_size):
+                    writer.writerow(
+                        {key: _csv_value(value) for key, value in row.items()}
+                    )
+                    count += 1
+                    if progress and count % chunk_size == 0:
+                        progress(catalog_type.name, count)
+            written[catalog_type.name] = count
+
+    for name, count in written.items():
+        if progress:
+            progress(name, count)
+    return written
+
+
+class _Lines:
+    """Decoded lines of a file read in binary, tracking the byte offset."""
+
+    def __init__(self, path: str):
+        self.file = open(path, "rb")
+        self.offset = 0
+
+    def seek(self, offset: int) -> None:
+        self.file.seek(offset)
+        self.offset = offset
+
+    def __iter__(self):
+        for raw in self.file:
+            self.offset += len(raw)
+            yield raw.decode("utf-8")
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def read_jsonl(path: str, offset: int = 0):
+    """Yield (type, record, offset after the record) from `offset` on."""
+    lines = _Lines(path)
+    try:
+        lines.seek(offset)
+        for line in lines:
+            if line.strip():
+                record = json.loads(line)
+                yield record.pop("type"), record, lines.offset
+    finally:
+        lines.close()
+
+
+def read_csv(path: str, name: str, offset: int = 0):
+    """Yield (type, record, offset after the record) from `offset` on."""
+    lines = _Lines(path)
+    try:
+        header = next(csv.reader(lines), None)
+        if header is None:
+            return
+        lines.seek(max(offset, lines.offset))
+        for row in csv.reader(lines):
+            yield name, dict(zip(header, row)), lines.offset
+    finally:
+        lines.close()
+
+
+def catalog_sources(path: str) -> list[tuple[str, callable]]:
+    """(checkpoint key, reader) pairs for a JSONL file or a CSV directory."""
+    if not os.path.isdir(path):
+        return [(os.path.basename(path), lambda offset: read_jsonl(
+            path, offset
+        ))]
+    sources = []
+    for catalog_type in CATALOG_TYPES:
+        file_name = f"{catalog_type.name}.csv"
+        csv_path = os.path.join(path, file_name)
+        if os.path.exists(csv_path):
+            sources.append((
+                file_name,
+                lambda offset, csv_path=csv_path, name=catalog_type.name: (
+                    read_csv(csv_path, name, offset)
+                ),
+            ))
+    return sources
+
+
+class Checkpoint:
+    """
+    Import progress saved after every committed batch: the byte offset
+    reached in each source file and the id ranges of rows whose derived
+    data (search vectors, schedule) must be rebuilt at the end.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offsets = {}
+        self.touched = {}
+
+    @classmethod
+    def load(cls, path: str) -> "Checkpoint":
+        checkpoint = cls(path)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as source:
+                data = json.load(source)
+            checkpoint.offsets = data["offsets"]
+            checkpoint.touched = data["touched"]
+        return checkpoint
+
+    def touch(self, name: str, pks) -> None:
+        pks = [pk for pk in pks if pk is not None]
+        if not pks:
+            return
+        low, high = self.touched.get(name, (min(pks), max(pks)))
+        self.touched[name] = [min(low, *pks), max(high, *pks)]
+
+    def save(self) -> None:
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as output:
+            json.dump(
+                {"offsets": self.offsets, "touched": self.touched}, output
+            )
+        os.replace(temporary, self.path)
+
+    def delete(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def load_batch(catalog_type: CatalogType, records: list[dict]) -> list:
+    """Insert one batch of records, skipping rows that already exist."""
+    objects = catalog_type.resolve(
+        records, [catalog_type.build(record) for record in records]
+    )
+    if catalog_type.validate and objects:
+        objects = catalog_type.validate(objects)
+
+    # Partitioned tables only see a conflict on (id, partition key), so
+    # rows whose id exists are left out of the insert here.
+    existing = set(
+        catalog_type.model.objects.filter(
+            pk__in=[obj.pk for obj in objects if obj.pk is not None]
+        ).values_list("pk", flat=True)
+    )
+    fresh = [obj for obj in objects if obj.pk not in existing]
+    restored = [
+        [getattr(obj, name) for name in catalog_type.restore]
+        for obj in fresh
+    ]
+    with transaction.atomic():
+        catalog_type.model.objects.bulk_create(fresh, ignore_conflicts=True)
+        if catalog_type.restore and fresh:
+            for obj, values in zip(fresh, restored):
+                for name, value in zip(catalog_type.restore, values):
+                    setattr(obj, name, value)
+            catalog_type.model.objects.bulk_update(
+                fresh, catalog_type.restore
+            )
+        for through, rows in catalog_type.m2m_rows(records, objects).items():
+            through.objects.bulk_create(rows, ignore_conflicts=True)
+    return objects
+
+
+def _flush(checkpoint, key, name, batch, offset, stats, progress) -> None:
+    catalog_type = CATALOG[name]
+    objects = load_batch(catalog_type, batch)
+    if name in ("play", "performance"):
+        checkpoint.touch(name, [obj.pk for obj in objects])
+    elif name == "ticket":
+        checkpoint.touch(
+            "performance", [ticket.performance_id for ticket in objects]
+        )
+        checkpoint.touch(
+            "reservation", [ticket.reservation_id for ticket in objects]
+        )
+    checkpoint.offsets[key] = offset
+    checkpoint.save()
+
+    read, skipped = stats.get(name, (0, 0))
+    stats[name] = (read + len(batch), skipped + len(batch) - len(objects))
+    if progress:
+        progress(name, *stats[name])
+
+
+def import_catalog(
+    path: str,
+    checkpoint_path: str = None,
+    batch_size: int = 1000,
+    restart: bool = False,
+    progress=None,
+) -> dict:
+    """
+    Load a catalog written by `export_catalog`, `batch_size` records per
+    transaction. Records keep their ids, and rows that already exist (or
+    performances that would overlap one) are left alone, so an
+    interrupted import can resume from its checkpoint or simply be run
+    again. Records referring to rows that do not exist are skipped.
+    Returns (read, skipped) counts per type.
+    """
+    checkpoint_path = checkpoint_path or f"{path.rstrip(os.sep)}.checkpoint"
+    if restart:
+        Checkpoint(checkpoint_path).delete()
+    checkpoint = Checkpoint.load(checkpoint_path)
+
+    stats = {}
+    for key, read in catalog_sources(path):
+        batch = []
+        batch_type = None
+        offset = checkpoint.offsets.get(key, 0)
+        for name, record, end in read(offset):
+            if name not in CATALOG:
+                continue
+            if batch and (name != batch_type or len(batch) >= batch_size):
+                _flush(
+                    checkpoint, key, batch_type, batch, offset, stats,
+                    progress,
+                )
+                batch = []
+            batch_type = name
+            batch.append(record)
+            offset = end
+        if batch:
+            _flush(
+                checkpoint, key, batch_type, batch, offset, stats, progress
+            )
+
+    finish_import(checkpoint, batch_size)
+    checkpoint.delete()
+    return stats
+
+
+def finish_import(checkpoint: Checkpoint, batch_size: int) -> None:
+    """
+    Catch up on what signals would have done for the imported rows:
+    sequences, planner statistics, search vectors, the schedule, the
+    sales rollups and the autocomplete index.
+    """
+    catalog_models = [catalog_type.model for catalog_type in CATALOG_TYPES]
+    m2m_models = [
+        catalog_type.model._meta.get_field(name).remote_field.through
+        for catalog_type in CATALOG_TYPES
+        for name in catalog_type.m2m
+    ]
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(
+            no_style(), catalog_models
+        ):
+            cursor.execute(sql)
+        # Fresh rows have no statistics yet, which makes the search
+        # vector UPDATE below pick a very slow plan.
+        for model in catalog_models + m2m_models:
+            cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+    if "play" in checkpoint.touched:
+        plays = Play.objects.filter(
+            pk__range=checkpoint.touched["play"]
+        ).order_by("pk").values_list("pk", flat=True)
+        for play_ids in chunked(plays.iterator(batch_size), batch_size):
+            update_search_vectors(play_ids)
+
+    if "performance" in checkpoint.touched:
+        performances = Performance.objects.filter(
+            pk__range=checkpoint.touched["performance"]
+        ).order_by("pk").values_list("pk", flat=True)
+        for performance_ids in chunked(
+            performances.iterator(batch_size), batch_size
+        ):
+            refresh_schedule(performance_ids)
+            refresh_hall_weeks(refresh_performance_sales(performance_ids))
+
+    if "reservation" in checkpoint.touched:
+        days = Reservation.objects.filter(
+            pk__range=checkpoint.touched["reservation"]
+        ).dates("created_at", "day")
+        for batch in chunked(days, 31):
+            refresh_play_days(batch)
+
+    autocomplete.reset_index()
@@ -0,0 +1,213 @@
+import mimetypes
+import os
+import zlib
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.views.static import serve
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def available_encodings() -> tuple:
+    """Encodings this process can produce, in order of preference."""
+    if brotli is not None:
+        return "br", "gzip"
+    return ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str, encodings) -> str | None:
+    """
+    Pick the first of `encodings` accepted by an `Accept-Encoding` header,
+    honouring q-values (`q=0` refuses an encoding, `*` matches the rest).
+    """
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name.strip()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compressor(encoding: str, level: int):
+    """Return `(compress, flush)` callables for a streaming compressor."""
+    if encoding == "br":
+        engine = brotli.Compressor(quality=level)
+        return engine.process, engine.finish
+
+    # wbits=31 produces a gzip container instead of a raw zlib stream.
+    engine = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return engine.compress, engine.flush
+
+
+def compress_bytes(data: bytes, encoding: str, level: int) -> bytes:
+    compress, flush = compressor(encoding, level)
+    return compress(data) + flush()
+
+
+def compress_iterator(iterator, encoding: str, level: int):
+    compress, flush = compressor(encoding, level)
+    for chunk in iterator:
+        data = compress(chunk)
+        if data:
+            yield data
+    yield flush()
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith(settings.COMPRESSION_CONTENT_TYPES)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with the best encoding the client accepts.
+    Bodies below COMPRESSION_MIN_SIZE, non-text content and responses
+    that already carry a Content-Encoding are passed through.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+
+        if not is_compressible(response.get("Content-Type", "")):
+            return response
+
+        if response.streaming:
+            size = response.get("Content-Length")
+        else:
+            size = len(response.content)
+        if size is not None and int(size) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        encoding = negotiate_encoding(
+            request.META.get("HTTP_ACCEPT_ENCODING", ""),
+            available_encodings(),
+        )
+        if encoding is None:
+            return response
+        level = settings.COMPRESSION_LEVELS[encoding]
+
+        if response.streaming:
+            if response.is_async:
+                return response
+            response.streaming_content = compress_iterator(
+                response.streaming_content, encoding, level
+            )
+            del response.headers["Content-Length"]
+        else:
+            compressed_content = compress_bytes(
+                response.content, encoding, level
+            )
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers["Content-Length"] = str(
+                len(compressed_content)
+            )
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+
+        return response
+
+
+def precompress_file(path: Path, force: bool = False) -> list[Path]:
+    """
+    Write `.br`/`.gz` siblings of `path` at the highest compression level.
+    Variants that are up to date or not smaller than the source are skipped.
+    Return the variants that were written.
+    """
+    path = Path(path)
+    written = []
+    data = None
+    for encoding in available_encodings():
+        target = path.with_name(path.name + PRECOMPRESSED_SUFFIXES[encoding])
+        if (
+            not force
+            and target.exists()
+            and target.stat().st_mtime >= path.stat().st_mtime
+        ):
+            continue
+
+        if data is None:
+            data = path.read_bytes()
+        level = 11 if encoding == "br" else 9
+        compressed = compress_bytes(data, encoding, level)
+        if len(compressed) >= len(data):
+            target.unlink(missing_ok=True)
+            continue
+
+        target.write_bytes(compressed)
+        written.append(target)
+    return written
+
+
+def serve_precompressed(request, path, document_root=None, show_indexes=False):
+    """
+    Serve a file like `django.views.static.serve`, preferring a
+    precompressed `.br`/`.gz` sibling accepted by the client.
+    """
+    accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    encoding = variant = None
+    for candidate, suffix in PRECOMPRESSED_SUFFIXES.items():
+        if not negotiate_encoding(accept_encoding, (candidate,)):
+            continue
+        try:
+            if os.path.isfile(safe_join(document_root, path + suffix)):
+                encoding, variant = candidate, path + suffix
+                break
+        except SuspiciousFileOperation:
+            break
+
+    if variant is None:
+        response = serve(request, path, document_root, show_indexes)
+        if is_compressible(response.get("Content-Type", "")):
+            patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+    response = serve(request, variant, document_root)
+    content_type, _ = mimetypes.guess_type(path)
+    response.headers["Content-Type"] = (
+        content_type or "application/octet-stream"
+    )
+    response.headers["Content-Encoding"] = encoding
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def serve_static(request, path):
+    """
+    Serve collected static files from `STATIC_ROOT`, using the variants
+    written there by `compress_static`.
+    """
+    return serve_precompressed(
+        request, path, document_root=settings.STATIC_ROOT
+    )
@@ -0,0 +1,145 @@
+import csv
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import Count, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from theatre.models import Reservation, Ticket
+from theatre.renderers import FastJSONRenderer
+
+CSV = "csv"
+JSONL = "jsonl"
+CONTENT_TYPES = {
+    CSV: "text/csv; charset=utf-8",
+    JSONL: "application/x-ndjson",
+}
+
+# Export column -> lookup, in output order.
+TICKET_COLUMNS = {
+    "ticket_id": "id",
+    "reservation_id": "reservation_id",
+    "reserved_at": "reservation__created_at",
+    "user_email": "reservation__user__email",
+    "performance_id": "performance_id",
+    "show_time": "performance__show_time",
+    "play_id": "performance__play_id",
+    "play_title": "performance__play__title",
+    "theatre_hall": "performance__theatre_hall__name",
+    "row": "row",
+    "seat": "seat",
+}
+RESERVATION_COLUMNS = {
+    "reservation_id": "id",
+    "created_at": "created_at",
+    "user_email": "user__email",
+    "tickets": "tickets_count",
+}
+
+
+def created_range(date_from: date | None, date_to: date | None) -> dict:
+    """Aware bounds for whole days, usable by an index on created_at."""
+    bounds = {}
+    if date_from is not None:
+        bounds["gte"] = timezone.make_aware(
+            datetime.combine(date_from, time.min)
+        )
+    if date_to is not None:
+        bounds["lt"] = timezone.make_aware(
+            datetime.combine(date_to + timedelta(days=1), time.min)
+        )
+    return bounds
+
+
+def ticket_rows(
+    date_from: date = None, date_to: date = None, performance_id: int = None
+) -> QuerySet:
+    """Sold tickets, filtered by reservation day or performance."""
+    tickets = Ticket.objects.order_by("pk")
+    for lookup, bound in created_range(date_from, date_to).items():
+        tickets = tickets.filter(
+            **{f"reservation__created_at__{lookup}": bound}
+        )
+    if performance_id is not None:
+        tickets = tickets.filter(performance_id=performance_id)
+    return tickets.values_list(*TICKET_COLUMNS.values())
+
+
+def reservation_rows(
+    date_from: date = None, date_to: date = None, performance_id: int = None
+) -> QuerySet:
+    """Reservations with their ticket count, filtered like tickets."""
+    reservations = Reservation.objects.order_by("pk")
+    for lookup, bound in created_range(date_from, date_to).items():
+        reservations = reservations.filter(**{f"created_at__{lookup}": bound})
+    if performance_id is not None:
+        reservations = reservations.filter(
+            pk__in=Ticket.objects.filter(
+                performance_id=performance_id
+            ).values("reservation_id")
+        )
+    # A correlated count rather than GROUP BY: the primary key of the
+    # partitioned table includes created_at, so PostgreSQL no longer
+    # accepts grouping by id alone.
+    tickets_count = (
+        Ticket.objects.filter(reservation=OuterRef("pk"))
+        .order_by()
+        .values("reservation")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return reservations.annotate(
+        tickets_count=Coalesce(Subquery(tickets_count), 0)
+    ).values_list(*RESERVATION_COLUMNS.values())
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class _Echo:
+    """File-like object whose write() returns what it was given."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(columns, rows, chunk_size: int):
+    writer = csv.writer(_Echo())
+    # The header goes out before the query runs.
+    yield writer.writerow(columns).encode()
+    chunk = []
+    for row in rows:
+        chunk.append(writer.writerow([_csv_value(value) for value in row]))
+        if len(chunk) >= chunk_size:
+            yield "".join(chunk).encode()
+            chunk = []
+    if chunk:
+        yield "".join(chunk).encode()
+
+
+def stream_jsonl(columns, rows, chunk_size: int):
+    renderer = FastJSONRenderer()
+    chunk = []
+    for row in rows:
+        chunk.append(renderer.dumps(dict(zip(columns, row))))
+        if len(chunk) >= chunk_size:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+def stream_export(columns, rows: QuerySet, fmt: str):
+    """
+    Encode `rows` as CSV or JSONL while reading them through a server
+    side cursor, so memory stays flat however many rows there are.
+    """
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    rows = rows.iterator(chunk_size=chunk_size)
+    if fmt == CSV:
+        return stream_csv(list(columns), rows, chunk_size)
+    return stream_jsonl(list(columns), rows, chunk_size)
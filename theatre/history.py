@@ -0,0 +1,43 @@
+from datetime import date
+
+from django.db.models import Prefetch, QuerySet
+
+from theatre.exports import created_range
+from theatre.models import Performance, Reservation, Ticket
+
+# The columns TicketListSerializer reads, and the keys prefetching needs.
+TICKET_FIELDS = ("id", "row", "seat", "performance_id", "reservation_id")
+PERFORMANCE_FIELDS = (
+    "id",
+    "play__title",
+    "play__image",
+    "play__image_variants",
+    "theatre_hall__name",
+    "theatre_hall__rows",
+    "theatre_hall__seats_in_row",
+)
+
+
+def reservation_history(
+    user, date_from: date = None, date_to: date = None
+) -> QuerySet:
+    """
+    The user's reservations, filtered by reservation day, with tickets and
+    performances narrowed to the columns the list shows. Each performance
+    is loaded once, with its play and hall, however many tickets share it.
+    """
+    reservations = Reservation.objects.filter(user=user)
+    for lookup, bound in created_range(date_from, date_to).items():
+        reservations = reservations.filter(**{f"created_at__{lookup}": bound})
+    return reservations.prefetch_related(
+        Prefetch(
+            "tickets",
+            queryset=Ticket.objects.only(*TICKET_FIELDS).order_by("pk"),
+        ),
+        Prefetch(
+            "tickets__performance",
+            queryset=Performance.objects.select_related(
+                "play", "theatre_hall"
+            ).only(*PERFORMANCE_FIELDS),
+        ),
+    )
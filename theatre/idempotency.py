@@ -0,0 +1,122 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from theatre.models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = (
+        "This Idempotency-Key was already used with a different request."
+    )
+    default_code = "idempotency_key_reused"
+
+
+class IdempotencyKeyInProgress(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A request with this Idempotency-Key is in progress."
+    default_code = "idempotency_key_in_progress"
+
+
+def request_hash(request) -> str:
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(
+        f"{request.method} {request.path}\n{body}".encode()
+    ).hexdigest()
+
+
+def _lock_id(user_id: int, key: str) -> int:
+    digest = hashlib.blake2b(
+        f"idempotency:{user_id}:{key}".encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _lock(user_id: int, key: str) -> None:
+    """
+    Take a transaction-level advisory lock for the key, so a concurrent
+    duplicate waits here until the first request has committed its
+    response, or gives up after IDEMPOTENCY_LOCK_TIMEOUT seconds.
+    """
+    timeout_ms = int(settings.IDEMPOTENCY_LOCK_TIMEOUT * 1000)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SET LOCAL lock_timeout = {timeout_ms}")
+        try:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s)", [_lock_id(user_id, key)]
+            )
+        except OperationalError:
+            raise IdempotencyKeyInProgress()
+        cursor.execute("SET LOCAL lock_timeout = DEFAULT")
+
+
+def _replay(stored: IdempotencyKey) -> Response:
+    response = Response(stored.response, status=stored.status_code)
+    response[REPLAYED_HEADER] = "true"
+    return response
+
+
+def idempotent(request, handler) -> Response:
+    """
+    Run `handler` at most once per user and `Idempotency-Key` header.
+    Its response (success or client error) is stored for
+    IDEMPOTENCY_KEY_TTL seconds and replayed to retries of the same
+    request; server errors are not stored, so they can be retried.
+    """
+    key = request.headers.get(HEADER)
+    if key is None:
+        return handler()
+    if not key or len(key) > 255:
+        raise ValidationError({HEADER: "Must be 1 to 255 characters."})
+
+    fingerprint = request_hash(request)
+    with transaction.atomic():
+        _lock(request.user.pk, key)
+        stored = IdempotencyKey.objects.filter(
+            user=request.user, key=key
+        ).first()
+        if stored is not None and stored.expires_at <= timezone.now():
+            stored.delete()
+            stored = None
+        if stored is not None:
+            if stored.request_hash != fingerprint:
+                raise IdempotencyKeyReused()
+            return _replay(stored)
+
+        response = handler()
+        if response.status_code < 500:
+            IdempotencyKey.objects.create(
+                user=request.user,
+                key=key,
+                request_hash=fingerprint,
+                status_code=response.status_code,
+                response=response.data,
+                expires_at=timezone.now() + timedelta(
+                    seconds=settings.IDEMPOTENCY_KEY_TTL
+                ),
+            )
+        return response
+
+
+def purge_expired_keys(batch_size: int = 1000) -> int:
+    """Delete expired keys `batch_size` rows per statement."""
+    purged = 0
+    while True:
+        batch = IdempotencyKey.objects.filter(
+            expires_at__lte=timezone.now()
+        ).values("pk")[:batch_size]
+        deleted, _ = IdempotencyKey.objects.filter(pk__in=batch).delete()
+        purged += deleted
+        if deleted < batch_size:
+            return purged
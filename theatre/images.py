@@ -0,0 +1,135 @@
+import hashlib
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from theatre.models import Play
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = "uploads/play/variants/"
+
+PIL_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+
+EXIF_ORIENTATION = 0x0112
+
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+def variant_name(source_name: str, digest: str, width: int, fmt: str) -> str:
+    stem, _ = os.path.splitext(os.path.basename(source_name))
+    extension = "jpg" if fmt == "jpeg" else fmt
+    return os.path.join(
+        VARIANTS_DIR, f"{stem}-{digest[:12]}-{width}w.{extension}"
+    )
+
+
+def variant_widths(source_width: int) -> list[int]:
+    """Configured widths that do not upscale the source image."""
+    widths = [
+        width for width in settings.PLAY_IMAGE_VARIANT_WIDTHS
+        if width <= source_width
+    ]
+    return widths or [source_width]
+
+
+def _encode(image: Image.Image, fmt: str) -> bytes:
+    if fmt == "jpeg" and image.mode != "RGB":
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        if image.mode in ("RGBA", "LA"):
+            background.paste(image, mask=image.getchannel("A"))
+        else:
+            background.paste(image.convert("RGB"))
+        image = background
+
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        PIL_FORMATS[fmt],
+        quality=settings.PLAY_IMAGE_VARIANT_FORMATS[fmt],
+        optimize=True,
+    )
+    return buffer.getvalue()
+
+
+def build_variants(source_name: str) -> dict:
+    """
+    Write resized copies of `source_name` for every configured width and
+    format. File names carry a hash of the source content, so existing
+    variants are reused and the URLs can be cached forever.
+    """
+    with default_storage.open(source_name, "rb") as source:
+        data = source.read()
+    digest = hashlib.sha256(data).hexdigest()
+
+    image = Image.open(BytesIO(data))
+    source_width = image.width
+    if image.getexif().get(EXIF_ORIENTATION) in ROTATED_ORIENTATIONS:
+        source_width = image.height
+    widths = variant_widths(source_width)
+
+    # Let the JPEG decoder downscale by a power of two while decoding.
+    scale = max(widths) / source_width
+    image.draft(
+        "RGB", (round(image.width * scale), round(image.height * scale))
+    )
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA", "L", "LA"):
+        image = image.convert("RGBA")
+
+    variants = {}
+    for fmt in settings.PLAY_IMAGE_VARIANT_FORMATS:
+        variants[fmt] = {}
+        for width in widths:
+            name = variant_name(source_name, digest, width, fmt)
+            if not default_storage.exists(name):
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), Image.LANCZOS)
+                name = default_storage.save(
+                    name, ContentFile(_encode(resized, fmt))
+                )
+            variants[fmt][str(width)] = name
+    return variants
+
+
+def delete_variants(variants: dict, keep: dict = None) -> None:
+    keep_names = {
+        name for names in (keep or {}).values() for name in names.values()
+    }
+    for names in variants.values():
+        for name in names.values():
+            if name not in keep_names:
+                default_storage.delete(name)
+
+
+def generate_play_image_variants(play_id: int) -> dict | None:
+    """Build variants for the current image of a play and store them."""
+    play = Play.objects.filter(pk=play_id).only("image", "image_variants")
+    play = play.first()
+    if play is None or not play.image:
+        return None
+
+    try:
+        variants = build_variants(play.image.name)
+    except (OSError, Image.DecompressionBombError):
+        logger.warning(
+            "Could not build image variants for play %s", play_id,
+            exc_info=True,
+        )
+        return None
+
+    updated = Play.objects.filter(pk=play_id, image=play.image.name).update(
+        image_variants=variants
+    )
+    if not updated:
+        # The image was replaced meanwhile; its own task owns the variants.
+        delete_variants(variants)
+        return None
+
+    delete_variants(play.image_variants, keep=variants)
+    return variants
@@ -0,0 +1,316 @@
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import (
+    DatabaseError,
+    InterfaceError,
+    close_old_connections,
+    connection,
+    transaction,
+)
+from django.db.models import F
+from django.utils import timezone
+
+from theatre.metrics import timer
+from theatre.models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+class Task:
+    """A function that can be run by the job workers."""
+
+    def __init__(self, func, name, queue, priority, max_attempts):
+        self.func = func
+        self.name = name
+        self.queue = queue
+        self.priority = priority
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(
+        self,
+        *,
+        run_at: datetime = None,
+        delay: float = None,
+        priority: int = None,
+        **payload,
+    ) -> Job:
+        return enqueue(
+            self.name,
+            payload,
+            queue=self.queue,
+            priority=self.priority if priority is None else priority,
+            run_at=run_at,
+            delay=delay,
+            max_attempts=self.max_attempts,
+        )
+
+
+def task(
+    name: str = None,
+    *,
+    queue: str = "default",
+    priority: int = 0,
+    max_attempts: int = None,
+):
+    """
+    Register a function as a job handler. Jobs call it with their payload
+    as keyword arguments, so the payload must be JSON serializable.
+    """
+
+    def decorator(func):
+        task_name = name or f"{func.__module__}.{func.__qualname__}"
+        registered = Task(
+            func,
+            task_name,
+            queue,
+            priority,
+            max_attempts or settings.JOB_MAX_ATTEMPTS,
+        )
+        _registry[task_name] = registered
+        return registered
+
+    return decorator
+
+
+def get_task(name: str) -> Task | None:
+    return _registry.get(name)
+
+
+def enqueue(
+    name: str,
+    payload: dict = None,
+    *,
+    queue: str = "default",
+    priority: int = 0,
+    run_at: datetime = None,
+    delay: float = None,
+    max_attempts: int = None,
+) -> Job:
+    """
+    Add a job to the queue. The row is written on the current connection,
+    so a job enqueued inside a transaction only becomes visible to the
+    workers once that transaction commits.
+    """
+    if run_at is None:
+        run_at = timezone.now()
+    if delay:
+        run_at += timedelta(seconds=delay)
+    return Job.objects.create(
+        name=name,
+        queue=queue,
+        payload=payload or {},
+        priority=priority,
+        run_at=run_at,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def dequeue(queues, worker_id: str) -> Job | None:
+    """
+    Claim the next due job from `queues`, highest priority first. Rows
+    locked by other workers are skipped instead of waited on.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(
+                status=Job.Status.QUEUED, queue__in=queues, run_at__lte=now
+            )
+            .order_by("-priority", "run_at", "id")
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = Job.Status.RUNNING
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.locked_until = now + timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+        job.save(
+            update_fields=["status", "attempts", "locked_by", "locked_until"]
+        )
+    return job
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Release jobs whose worker died: requeue them, or mark them failed
+    once they used up their attempts, so a job that kills its worker is
+    not retried forever. Returns the number released.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.Status.RUNNING, locked_until__lt=now
+    )
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.Status.FAILED,
+        locked_by="",
+        locked_until=None,
+        last_error="The worker running the job stopped.",
+        finished_at=now,
+    )
+    return failed + stale.update(
+        status=Job.Status.QUEUED, locked_by="", locked_until=None
+    )
+
+
+def _keep_locked(job: Job, done: threading.Event) -> None:
+    """
+    Extend the lock of a running job every third of JOB_LOCK_TIMEOUT
+    until `done` is set, so a long job is not handed to another worker.
+    """
+    try:
+        while not done.wait(settings.JOB_LOCK_TIMEOUT / 3):
+            try:
+                Job.objects.filter(
+                    pk=job.pk,
+                    status=Job.Status.RUNNING,
+                    locked_by=job.locked_by,
+                ).update(
+                    locked_until=timezone.now()
+                    + timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+                )
+            except (DatabaseError, InterfaceError):
+                logger.warning(
+                    "Could not extend the lock of job %s", job.id,
+                    exc_info=True,
+                )
+                close_old_connections()
+    finally:
+        connection.close()
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with a little jitter, capped."""
+    delay = min(
+        settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1),
+        settings.JOB_RETRY_MAX_DELAY,
+    )
+    return delay + random.uniform(0, delay / 10)
+
+
+def _finish(job: Job, **fields) -> None:
+    # Only the worker holding the lock may record the outcome.
+    Job.objects.filter(
+        pk=job.pk, status=Job.Status.RUNNING, locked_by=job.locked_by
+    ).update(locked_by="", locked_until=None, **fields)
+
+
+def run_job(job: Job) -> bool:
+    """Run a claimed job and record the outcome; True on success."""
+    registered = get_task(job.name)
+    if registered is None:
+        logger.error("Job %s has no registered task %r", job.id, job.name)
+        _finish(
+            job,
+            status=Job.Status.FAILED,
+            last_error=f"Unknown task {job.name!r}",
+            finished_at=timezone.now(),
+        )
+        return False
+
+    done = threading.Event()
+    heartbeat = threading.Thread(
+        target=_keep_locked, args=(job, done), daemon=True
+    )
+    heartbeat.start()
+    try:
+        with timer("job", task=job.name, queue=job.queue) as tags:
+            tags["status"] = "failed"
+            registered(**job.payload)
+            tags["status"] = "done"
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            delay = retry_delay(job.attempts)
+            logger.warning(
+                "Job %s (%s) failed, retrying in %.0fs",
+                job.id, job.name, delay, exc_info=True,
+            )
+            _finish(
+                job,
+                status=Job.Status.QUEUED,
+                run_at=timezone.now() + timedelta(seconds=delay),
+                last_error=error,
+            )
+        else:
+            logger.exception("Job %s (%s) failed", job.id, job.name)
+            _finish(
+                job,
+                status=Job.Status.FAILED,
+                last_error=error,
+                finished_at=timezone.now(),
+            )
+        return False
+    finally:
+        done.set()
+        heartbeat.join()
+
+    _finish(job, status=Job.Status.DONE, finished_at=timezone.now())
+    return True
+
+
+def work(
+    queues,
+    stop: threading.Event = None,
+    burst: bool = False,
+    poll_interval: float = None,
+    worker_id: str = None,
+) -> int:
+    """
+    Run jobs from `queues` until `stop` is set, or until no job is due
+    when `burst` is true. Database errors, such as a restarted server,
+    close the broken connection and the worker polls again after a pause
+    that doubles up to JOB_DB_RETRY_MAX_DELAY. Returns the number of jobs
+    run.
+    """
+    if poll_interval is None:
+        poll_interval = settings.JOB_POLL_INTERVAL
+    worker_id = worker_id or default_worker_id()
+    stop = stop or threading.Event()
+
+    processed = 0
+    failures = 0
+    while not stop.is_set():
+        try:
+            job = dequeue(queues, worker_id)
+            if job is None:
+                if requeue_stale_jobs():
+                    continue
+                if burst:
+                    break
+                stop.wait(poll_interval)
+                continue
+            run_job(job)
+        except (DatabaseError, InterfaceError):
+            failures += 1
+            delay = min(
+                max(poll_interval, 0.1) * 2 ** (failures - 1),
+                settings.JOB_DB_RETRY_MAX_DELAY,
+            )
+            logger.exception(
+                "Job worker lost the database, retrying in %.1fs", delay
+            )
+            close_old_connections()
+            stop.wait(delay)
+            continue
+        failures = 0
+        processed += 1
+    return processed
@@ -0,0 +1,54 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from theatre.partitions import (
+    PARTITIONED_TABLES,
+    add_months,
+    archive_partitions,
+    month_start,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Detach the ticket and reservation partitions of months before "
+        "--before (default: PARTITION_RETENTION_MONTHS ago) and move them "
+        "to the archive schema. Ticket partitions of months with live "
+        "performances (run archive_performances first) and reservation "
+        "partitions still referenced by live tickets are kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            type=date.fromisoformat,
+            help="First month kept live (ex. 2025-01-01).",
+        )
+        parser.add_argument(
+            "--schema", default=settings.PARTITION_ARCHIVE_SCHEMA
+        )
+
+    def handle(self, *args, **options):
+        before = options["before"] or add_months(
+            month_start(timezone.now()), -settings.PARTITION_RETENTION_MONTHS
+        )
+        # Tickets go first, so their reservations can follow.
+        for table in PARTITIONED_TABLES:
+            archived, kept = archive_partitions(
+                table, before, options["schema"]
+            )
+            for name in archived:
+                self.stdout.write(f"Archived {name}")
+            reason = (
+                "it has live performances" if table == "theatre_ticket"
+                else "it has live tickets"
+            )
+            for name in kept:
+                self.stdout.write(f"Kept {name}: {reason}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Partitions before {before} are archived in "
+            f"{options['schema']}."
+        ))
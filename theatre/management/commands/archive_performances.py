@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from theatre.archive import archive_performances
+
+
+class Command(BaseCommand):
+    help = (
+        "Move performances that started more than --days days ago "
+        "(default: PERFORMANCE_ARCHIVE_DAYS), with their tickets, to the "
+        "archive tables, one batch of performances per transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.PERFORMANCE_ARCHIVE_DAYS
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.PERFORMANCE_ARCHIVE_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options["days"])
+        archived = archive_performances(
+            before,
+            options["batch_size"],
+            progress=lambda total: self.stdout.write(
+                f"Archived {total} performances"
+            ),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} performances that started before "
+            f"{before:%Y-%m-%d %H:%M}."
+        ))
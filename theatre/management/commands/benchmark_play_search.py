@@ -0,0 +1,137 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from theatre.models import Actor, Genre, Play
+from theatre.search import search_plays, update_search_vectors
+
+SYLLABLES = (
+    "ka", "ri", "lo", "ven", "mar", "ta", "sol", "dre", "an", "bel", "cor",
+    "mi", "nu", "pe", "ros", "sha", "tel", "vi", "zan", "or", "lu", "gen",
+)
+
+
+def make_word(rng) -> str:
+    return "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a large catalog inside a transaction and compare `?search=` "
+        "against the old `title__icontains` filter. The seeded rows are "
+        "rolled back unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--plays", type=int, default=50_000)
+        parser.add_argument("--actors", type=int, default=2_000)
+        parser.add_argument("--words", type=int, default=5_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Commit the seeded catalog instead of rolling it back.",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        words = sorted({make_word(rng) for _ in range(options["words"])})
+        with transaction.atomic():
+            plays = self.seed(
+                rng, words, options["plays"], options["actors"]
+            )
+
+            sample = rng.choice(plays)
+            actor = sample.actors.first()
+            queries = (
+                sample.title.split()[0],
+                " ".join(sample.title.split()[:2]),
+                sample.title.split()[-1][:3],
+                f"{actor.last_name[:4]} {sample.title.split()[1]}",
+            )
+            for text in queries:
+                self.report(
+                    f"search={text!r}",
+                    lambda: search_plays(Play.objects.all(), text),
+                    options["repeat"],
+                )
+                self.report(
+                    f"title__icontains={text!r}",
+                    lambda: Play.objects.filter(title__icontains=text),
+                    options["repeat"],
+                )
+
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+    def seed(self, rng, words, play_count, actor_count) -> list[Play]:
+        started = time.perf_counter()
+        Genre.objects.bulk_create(
+            [Genre(name=f"Bench {word}") for word in words[:30]],
+            ignore_conflicts=True,
+        )
+        genres = list(Genre.objects.filter(name__startswith="Bench "))
+        actors = Actor.objects.bulk_create(
+            Actor(
+                first_name=make_word(rng).title(),
+                last_name=make_word(rng).title(),
+            )
+            for _ in range(actor_count)
+        )
+        plays = Play.objects.bulk_create(
+            (
+                Play(
+                    title=" ".join(rng.sample(words, 3)).title(),
+                    description=" ".join(rng.choices(words, k=40)),
+                )
+                for _ in range(play_count)
+            ),
+            batch_size=5_000,
+        )
+        Play.actors.through.objects.bulk_create(
+            (
+                Play.actors.through(play_id=play.id, actor_id=actor.id)
+                for play in plays
+                for actor in rng.sample(actors, 3)
+            ),
+            batch_size=10_000,
+        )
+        Play.genres.through.objects.bulk_create(
+            (
+                Play.genres.through(play_id=play.id, genre_id=genre.id)
+                for play in plays
+                for genre in rng.sample(genres, 2)
+            ),
+            batch_size=10_000,
+        )
+        # Fresh rows have no statistics; without them the planner runs the
+        # per-play name subqueries as sequential scans.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "ANALYZE theatre_play, theatre_play_actors, "
+                "theatre_play_genres, theatre_actor, theatre_genre"
+            )
+        update_search_vectors(Play.objects.values("pk"))
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE theatre_play")
+        self.stdout.write(
+            f"Seeded {play_count} plays in "
+            f"{time.perf_counter() - started:.1f}s"
+        )
+        return plays
+
+    def report(self, label, build_queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = list(build_queryset()[:20])
+            timings.append((time.perf_counter() - started) * 1000)
+        self.stdout.write(
+            f"{label:<40} {len(rows):>3} rows  "
+            f"median {statistics.median(timings):7.2f}ms  "
+            f"max {max(timings):7.2f}ms"
+        )
@@ -0,0 +1,121 @@
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from theatre.history import reservation_history
+from theatre.models import Performance, Play, Reservation, TheatreHall, Ticket
+from theatre.serializers import ReservationListSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a user with a long reservation history inside a transaction "
+        "and compare the history query against the old full-row prefetch. "
+        "The seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reservations", type=int, default=1_000)
+        parser.add_argument("--tickets", type=int, default=4)
+        parser.add_argument("--performances", type=int, default=100)
+        parser.add_argument("--description", type=int, default=5_000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = self.seed(options)
+            self.report(
+                "full rows",
+                lambda: Reservation.objects.filter(user=user).prefetch_related(
+                    "tickets__performance__play",
+                    "tickets__performance__theatre_hall",
+                ),
+                options["repeat"],
+            )
+            self.report(
+                "history",
+                lambda: reservation_history(user),
+                options["repeat"],
+            )
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        started = time.perf_counter()
+        user = get_user_model().objects.create_user(
+            email="history-benchmark@test.com", password="benchmark"
+        )
+        hall = TheatreHall.objects.create(
+            name="Benchmark Hall", rows=50, seats_in_row=50
+        )
+        plays = Play.objects.bulk_create(
+            Play(
+                title=f"Benchmark Play {number}",
+                description="x" * options["description"],
+            )
+            for number in range(options["performances"])
+        )
+        first_show = timezone.now() + timedelta(days=1)
+        performances = Performance.objects.bulk_create(
+            Performance(
+                play=play,
+                theatre_hall=hall,
+                show_time=first_show + timedelta(days=number),
+                end_time=first_show + timedelta(days=number, hours=3),
+            )
+            for number, play in enumerate(plays)
+        )
+        reservations = Reservation.objects.bulk_create(
+            Reservation(user=user) for _ in range(options["reservations"])
+        )
+        sold = [0] * len(performances)
+        tickets = []
+        for number, reservation in enumerate(reservations):
+            index = number % len(performances)
+            for _ in range(options["tickets"]):
+                row, seat = divmod(sold[index], hall.seats_in_row)
+                sold[index] += 1
+                tickets.append(Ticket(
+                    reservation=reservation,
+                    performance=performances[index],
+                    row=row + 1,
+                    seat=seat + 1,
+                    show_time=performances[index].show_time,
+                ))
+        Ticket.objects.bulk_create(tickets, batch_size=5_000)
+        self.stdout.write(
+            f"Seeded {len(tickets)} tickets in {len(reservations)} "
+            f"reservations in {time.perf_counter() - started:.1f}s"
+        )
+        return user
+
+    def report(self, label, build_queryset, repeat):
+        loads, serializations = [], []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            reservations = list(build_queryset())
+            loaded = time.perf_counter()
+            ReservationListSerializer(reservations, many=True).data
+            loads.append((loaded - started) * 1000)
+            serializations.append((time.perf_counter() - loaded) * 1000)
+
+        with CaptureQueriesContext(connection) as queries:
+            tracemalloc.start()
+            reservations = list(build_queryset())
+            loaded, _ = tracemalloc.get_traced_memory()
+            ReservationListSerializer(reservations, many=True).data
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.stdout.write(
+            f"{label:<10} {len(queries):>2} queries  "
+            f"load {statistics.median(loads):7.1f}ms "
+            f"{loaded / 2 ** 20:6.1f}MiB  "
+            f"serialize {statistics.median(serializations):7.1f}ms  "
+            f"peak {peak / 2 ** 20:6.1f}MiB"
+        )
@@ -0,0 +1,73 @@
+import statistics
+import time
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from theatre.throttling import BookingThrottle, get_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the booking throttle (per-user and per-performance token "
+        "buckets and the waiting room) on prepared reservation requests, "
+        "without the database or the rest of the request cycle."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=100_000)
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--performances", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        view = SimpleNamespace(action="create", kwargs={})
+        requests = []
+        for number in range(options["users"]):
+            performance = number % options["performances"]
+            request = Request(
+                factory.post(
+                    "/api/v1/theatre/reservations/",
+                    {"tickets": [
+                        {"row": 1, "seat": 1, "performance": performance},
+                        {"row": 1, "seat": 2, "performance": performance},
+                    ]},
+                    format="json",
+                ),
+                parsers=[JSONParser()],
+            )
+            request.user = get_user_model()(pk=number + 1)
+            request.data
+            requests.append(request)
+
+        for label, room_rate in (
+            ("buckets", None),
+            ("buckets + waiting room", "1000000/s"),
+        ):
+            with override_settings(BOOKING_WAITING_ROOM_RATE=room_rate):
+                self.report(label, requests, view, options)
+
+    def report(self, label, requests, view, options):
+        timings = []
+        throttled = 0
+        for _ in range(options["repeat"]):
+            get_store().clear()
+            started = time.perf_counter()
+            for index in range(options["requests"]):
+                request = requests[index % len(requests)]
+                if not BookingThrottle().allow_request(request, view):
+                    throttled += 1
+            elapsed = time.perf_counter() - started
+            timings.append(elapsed / options["requests"] * 1_000_000)
+        get_store().clear()
+        self.stdout.write(
+            f"{label:<24} median {statistics.median(timings):6.2f}us  "
+            f"max {max(timings):6.2f}us per request  "
+            f"({throttled} throttled)"
+        )
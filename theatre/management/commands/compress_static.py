@@ -0,0 +1,46 @@
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from theatre.compression import PRECOMPRESSED_SUFFIXES, precompress_file
+
+
+class Command(BaseCommand):
+    help = "Write .br/.gz variants of text assets in PRECOMPRESS_DIRS."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Recompress files whose variants are up to date.",
+        )
+
+    def handle(self, *args, **options):
+        suffixes = tuple(PRECOMPRESSED_SUFFIXES.values())
+        scanned = written = 0
+
+        for directory in settings.PRECOMPRESS_DIRS:
+            if not os.path.isdir(directory):
+                self.stdout.write(f"Skipping missing directory {directory}")
+                continue
+
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    path = Path(root, name)
+                    if (
+                        name.endswith(suffixes)
+                        or path.suffix not in settings.PRECOMPRESS_EXTENSIONS
+                        or path.stat().st_size
+                        < settings.COMPRESSION_MIN_SIZE
+                    ):
+                        continue
+                    scanned += 1
+                    written += len(
+                        precompress_file(path, force=options["force"])
+                    )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Precompressed {scanned} files, wrote {written} variants."
+        ))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from theatre.catalog import CATALOG, FORMATS, JSONL, export_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream plays, actors, genres, halls, performances, reservations "
+        "and tickets to a JSONL file or a directory of CSV files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", help="JSONL file, or directory for CSV files."
+        )
+        parser.add_argument("--format", choices=FORMATS, default=JSONL)
+        parser.add_argument(
+            "--type",
+            action="append",
+            dest="types",
+            choices=list(CATALOG),
+            help="Only export this type (repeatable).",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        written = export_catalog(
+            options["path"],
+            options["format"],
+            types=options["types"],
+            chunk_size=options["batch_size"],
+            progress=self.progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {sum(written.values())} records to {options['path']}."
+        ))
+
+    def progress(self, name, count):
+        self.stdout.write(f"{name}: {count} written")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from theatre.images import generate_play_image_variants
+from theatre.models import Play
+
+
+class Command(BaseCommand):
+    help = "Build resized image variants for plays that do not have them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild variants for every play with an image.",
+        )
+
+    def handle(self, *args, **options):
+        plays = Play.objects.exclude(image="").exclude(image__isnull=True)
+        if not options["force"]:
+            plays = plays.filter(image_variants={})
+
+        built = failed = 0
+        for play_id in plays.values_list("id", flat=True).iterator():
+            if generate_play_image_variants(play_id) is None:
+                failed += 1
+                self.stdout.write(
+                    self.style.WARNING(f"Play {play_id}: no variants built")
+                )
+            else:
+                built += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Built variants for {built} plays, {failed} failed."
+        ))
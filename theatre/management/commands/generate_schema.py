@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from theatre.schema import write_schema_artifacts
+
+
+class Command(BaseCommand):
+    help = "Pre-generate the OpenAPI schema served at /api/v1/schema/."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=settings.OPENAPI_SCHEMA_DIR,
+            help="Directory to write the schema artifacts to.",
+        )
+        parser.add_argument(
+            "--code-version",
+            default=settings.CODE_VERSION,
+            help="Code version recorded in the manifest.",
+        )
+
+    def handle(self, *args, **options):
+        manifest = write_schema_artifacts(
+            options["output"], options["code_version"]
+        )
+        for entry in manifest["files"].values():
+            self.stdout.write(f"{entry['name']} {entry['etag']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Schema for version {manifest['version']} written to "
+            f"{options['output']}"
+        ))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from theatre.catalog import import_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a catalog written by export_catalog in batches. An "
+        "interrupted import resumes from its checkpoint file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", help="JSONL file, or directory of CSV files."
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--checkpoint",
+            help="Progress file, <path>.checkpoint by default.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore an existing checkpoint and start from the top.",
+        )
+
+    def handle(self, *args, **options):
+        stats = import_catalog(
+            options["path"],
+            checkpoint_path=options["checkpoint"],
+            batch_size=options["batch_size"],
+            restart=options["restart"],
+            progress=self.progress,
+        )
+        read = sum(count for count, _ in stats.values())
+        skipped = sum(count for _, count in stats.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {read - skipped} records, skipped {skipped}."
+        ))
+
+    def progress(self, name, read, skipped):
+        self.stdout.write(f"{name}: {read} read, {skipped} skipped")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from theatre.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired reservation idempotency keys in batches. Run it "
+        "periodically; expired keys are otherwise only replaced when "
+        "reused."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        purged = purge_expired_keys(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {purged} expired idempotency keys."
+        ))
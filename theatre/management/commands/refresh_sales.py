@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+
+from theatre.analytics import (
+    refresh_hall_weeks,
+    refresh_performance_sales,
+    refresh_play_days,
+)
+from theatre.catalog import chunked
+from theatre.models import (
+    ArchivedPerformance,
+    ArchivedTicket,
+    HallOccupancyWeek,
+    Performance,
+    PlaySalesDay,
+    Reservation,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the sales rollups from tickets and reservations. Changes "
+        "are applied incrementally as they commit; run this after "
+        "deploying the rollups and periodically to reconcile edits made "
+        "outside reservations."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        performances = Performance.objects.order_by("pk").values_list(
+            "pk", flat=True
+        )
+        weeks = set(
+            HallOccupancyWeek.objects.values_list("theatre_hall_id", "week")
+        )
+        weeks |= set(
+            ArchivedPerformance.objects.values_list("theatre_hall_id", "week")
+        )
+        refreshed = 0
+        for performance_ids in chunked(
+            performances.iterator(chunk_size=batch_size), batch_size
+        ):
+            weeks |= refresh_performance_sales(performance_ids)
+            refreshed += len(performance_ids)
+        for keys in chunked(sorted(weeks), batch_size):
+            refresh_hall_weeks(keys)
+
+        days = set(Reservation.objects.dates("created_at", "day"))
+        days |= set(PlaySalesDay.objects.dates("date", "day"))
+        days |= set(ArchivedTicket.objects.dates("sold_at", "day"))
+        for batch in chunked(sorted(days), 31):
+            refresh_play_days(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed sales of {refreshed} performances, {len(weeks)} "
+            f"hall weeks and {len(days)} days."
+        ))
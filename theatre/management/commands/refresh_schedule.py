@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from theatre.models import Performance
+from theatre.schedule import refresh_schedule
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized performance schedule."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        ids = Performance.objects.order_by("pk").values_list("pk", flat=True)
+        refreshed = 0
+        batch = []
+        for performance_id in ids.iterator(chunk_size=options["batch_size"]):
+            batch.append(performance_id)
+            if len(batch) == options["batch_size"]:
+                refreshed += refresh_schedule(batch)
+                batch = []
+        refreshed += refresh_schedule(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Refreshed {refreshed} schedule rows.")
+        )
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from theatre.partitions import PARTITIONED_TABLES, roll_forward
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the monthly ticket and reservation partitions up to "
+        "--ahead months from now, moving in any rows the default "
+        "partitions hold for them. Run it at least monthly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD
+        )
+
+    def handle(self, *args, **options):
+        created = []
+        with transaction.atomic(), connection.cursor() as cursor:
+            for table, column in PARTITIONED_TABLES.items():
+                created += roll_forward(
+                    cursor, table, column, options["ahead"]
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(created)} partitions: {', '.join(created)}"
+            if created else "All partitions exist."
+        ))
@@ -0,0 +1,99 @@
+import multiprocessing
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from theatre.jobs import work
+
+
+def _work_and_close(queues, stop, burst, poll_interval):
+    try:
+        work(queues, stop=stop, burst=burst, poll_interval=poll_interval)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the database queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.JOB_WORKER_CONCURRENCY,
+            help="Number of jobs to run at the same time.",
+        )
+        parser.add_argument(
+            "--pool",
+            choices=("thread", "process"),
+            default="thread",
+            help="Run jobs in threads or in forked processes.",
+        )
+        parser.add_argument(
+            "--queue",
+            action="append",
+            dest="queues",
+            help="Queue to take jobs from; repeat for several queues. "
+                 "Defaults to all of JOB_QUEUES.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once no job is due instead of waiting for more.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.JOB_POLL_INTERVAL,
+            help="Seconds to wait between polls of an empty queue.",
+        )
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1.")
+        queues = options["queues"] or list(settings.JOB_QUEUES)
+
+        if options["pool"] == "process":
+            # Children must open their own database connections.
+            connections.close_all()
+            context = multiprocessing.get_context("fork")
+            stop = context.Event()
+            worker_class = context.Process
+        else:
+            stop = threading.Event()
+            worker_class = threading.Thread
+
+        def request_stop(signum, frame):
+            stop.set()
+
+        previous_handlers = {
+            signum: signal.signal(signum, request_stop)
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+
+        self.stdout.write(
+            f"Starting {options['concurrency']} {options['pool']} workers "
+            f"for queues: {', '.join(queues)}"
+        )
+        workers = [
+            worker_class(
+                target=_work_and_close,
+                args=(
+                    queues, stop, options["burst"], options["poll_interval"]
+                ),
+            )
+            for _ in range(options["concurrency"])
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
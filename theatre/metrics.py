@@ -0,0 +1,29 @@
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("theatre.metrics")
+
+
+def record_timing(name: str, seconds: float, **tags) -> None:
+    """Record a timing sample on the `theatre.metrics` logger."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+
+    labels = " ".join(f"{key}={value}" for key, value in tags.items())
+    logger.debug(
+        "%s %.3fms %s",
+        name,
+        seconds * 1000,
+        labels,
+        extra={"metric": name, "duration": seconds, "tags": tags},
+    )
+
+
+@contextmanager
+def timer(name: str, **tags):
+    start = time.perf_counter()
+    try:
+        yield tags
+    finally:
+        record_timing(name, time.perf_counter() - start, **tags)
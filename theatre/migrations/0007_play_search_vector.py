@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-19 09:16
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+BACKFILL_SQL = """
+UPDATE theatre_play AS play SET search_vector =
+    setweight(to_tsvector('english', play.title), 'A')
+    || setweight(to_tsvector('english', coalesce((
+        SELECT string_agg(actor.first_name || ' ' || actor.last_name, ' ')
+        FROM theatre_actor AS actor
+        JOIN theatre_play_actors AS link ON link.actor_id = actor.id
+        WHERE link.play_id = play.id
+    ), '')), 'B')
+    || setweight(to_tsvector('english', coalesce((
+        SELECT string_agg(genre.name, ' ')
+        FROM theatre_genre AS genre
+        JOIN theatre_play_genres AS link ON link.genre_id = genre.id
+        WHERE link.play_id = play.id
+    ), '')), 'B')
+    || setweight(to_tsvector('english', play.description), 'C')
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0006_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="play",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="play",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="play_search_vector_idx"
+            ),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.4 on 2026-10-19 09:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def fill_schedule(apps, schema_editor):
+    Performance = apps.get_model("theatre", "Performance")
+    PerformanceSchedule = apps.get_model("theatre", "PerformanceSchedule")
+
+    performances = (
+        Performance.objects.select_related("play", "theatre_hall")
+        .annotate(tickets_sold=Count("tickets"))
+        .order_by()
+    )
+    rows = []
+    for performance in performances.iterator(chunk_size=2000):
+        hall = performance.theatre_hall
+        capacity = hall.rows * hall.seats_in_row
+        rows.append(PerformanceSchedule(
+            performance_id=performance.id,
+            date=timezone.localtime(performance.show_time).date(),
+            show_time=performance.show_time,
+            play_id=performance.play_id,
+            play_title=performance.play.title,
+            theatre_hall_id=hall.id,
+            theatre_hall_name=hall.name,
+            capacity=capacity,
+            seats_left=capacity - performance.tickets_sold,
+        ))
+    PerformanceSchedule.objects.bulk_create(rows, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0007_play_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PerformanceSchedule",
+            fields=[
+                (
+                    "performance",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="schedule",
+                        serialize=False,
+                        to="theatre.performance",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("show_time", models.DateTimeField()),
+                ("play_title", models.CharField(max_length=255)),
+                ("theatre_hall_name", models.CharField(max_length=255)),
+                ("capacity", models.IntegerField()),
+                ("seats_left", models.IntegerField()),
+                (
+                    "play",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="theatre.play",
+                    ),
+                ),
+                (
+                    "theatre_hall",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="theatre.theatrehall",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "performance_schedule",
+                "ordering": ["date", "play_title", "show_time"],
+                "indexes": [
+                    models.Index(
+                        fields=["date", "play_title", "show_time"],
+                        name="schedule_date_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_schedule, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.4 on 2026-10-19 09:44
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+import theatre.models
+from django.db import migrations, models
+
+# Existing performances get the default length they were scheduled with.
+BACKFILL_SQL = """
+UPDATE theatre_performance
+SET end_time = show_time + interval '180 minutes'
+WHERE end_time IS NULL
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0008_performance_schedule"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="performance",
+            name="end_time",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+        migrations.AlterField(
+            model_name="performance",
+            name="end_time",
+            field=models.DateTimeField(blank=True),
+        ),
+        migrations.AddIndex(
+            model_name="performance",
+            index=models.Index(
+                fields=["theatre_hall", "show_time"], name="performance_hall_time_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="performance",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("end_time__gt", models.F("show_time"))),
+                name="performance_ends_after_start",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="performance",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                expressions=[
+                    (
+                        theatre.models.Int8Range(
+                            "theatre_hall",
+                            "theatre_hall",
+                            django.contrib.postgres.fields.ranges.RangeBoundary(
+                                inclusive_lower=True, inclusive_upper=True
+                            ),
+                        ),
+                        "&&",
+                    ),
+                    (theatre.models.TsTzRange("show_time", "end_time"), "&&"),
+                ],
+                name="performance_no_hall_overlap",
+                violation_error_message="The theatre hall is already booked at this time.",
+            ),
+        ),
+    ]
@@ -0,0 +1,148 @@
+# Generated by Django 5.2.4 on 2026-10-19 09:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0009_performance_end_time"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HallOccupancyWeek",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("week", models.DateField(help_text="Monday of the week.")),
+                ("performances", models.IntegerField()),
+                ("capacity", models.IntegerField()),
+                ("tickets_sold", models.IntegerField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "sales_hall_week",
+                "ordering": ["week", "theatre_hall"],
+            },
+        ),
+        migrations.CreateModel(
+            name="PerformanceSales",
+            fields=[
+                (
+                    "performance",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="sales",
+                        serialize=False,
+                        to="theatre.performance",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("week", models.DateField(help_text="Monday of the performance week.")),
+                ("capacity", models.IntegerField()),
+                ("tickets_sold", models.IntegerField()),
+                ("reservations", models.IntegerField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "sales_performance",
+                "ordering": ["date", "performance"],
+            },
+        ),
+        migrations.CreateModel(
+            name="PlaySalesDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("tickets_sold", models.IntegerField()),
+                ("reservations", models.IntegerField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "sales_play_day",
+                "ordering": ["date", "play"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(fields=["created_at"], name="reservation_created_idx"),
+        ),
+        migrations.AddField(
+            model_name="halloccupancyweek",
+            name="theatre_hall",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="theatre.theatrehall",
+            ),
+        ),
+        migrations.AddField(
+            model_name="performancesales",
+            name="play",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="theatre.play",
+            ),
+        ),
+        migrations.AddField(
+            model_name="performancesales",
+            name="theatre_hall",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="theatre.theatrehall",
+            ),
+        ),
+        migrations.AddField(
+            model_name="playsalesday",
+            name="play",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="theatre.play",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="halloccupancyweek",
+            constraint=models.UniqueConstraint(
+                fields=("week", "theatre_hall"), name="sales_hall_week_unique"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="performancesales",
+            index=models.Index(fields=["date"], name="sales_performance_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="performancesales",
+            index=models.Index(
+                fields=["theatre_hall", "week"], name="sales_performance_week_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="playsalesday",
+            constraint=models.UniqueConstraint(
+                fields=("date", "play"), name="sales_play_day_unique"
+            ),
+        ),
+    ]
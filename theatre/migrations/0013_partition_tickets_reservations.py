@@ -0,0 +1,65 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from theatre.partitions import (
+    PARTITIONED_TABLES,
+    partition_table,
+    unpartition_table,
+)
+
+BACKFILL_SQL = """
+UPDATE theatre_ticket
+SET show_time = theatre_performance.show_time
+FROM theatre_performance
+WHERE theatre_performance.id = theatre_ticket.performance_id
+"""
+
+# Partitions are created up to this many months ahead; later ones come
+# from `manage.py roll_partitions`.
+MONTHS_AHEAD = 3
+
+
+def partition(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table, column in PARTITIONED_TABLES.items():
+            partition_table(cursor, table, column, MONTHS_AHEAD)
+
+
+def unpartition(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table, column in PARTITIONED_TABLES.items():
+            unpartition_table(cursor, table, column)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0012_waitlist"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="show_time",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+        migrations.AlterField(
+            model_name="ticket",
+            name="show_time",
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name="ticket",
+            name="reservation",
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="tickets",
+                to="theatre.reservation",
+            ),
+        ),
+        migrations.RunPython(partition, unpartition),
+    ]
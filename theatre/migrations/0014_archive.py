@@ -0,0 +1,94 @@
+# Generated by Django 5.2.4 on 2026-10-19 10:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0013_partition_tickets_reservations"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedPerformance",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("show_time", models.DateTimeField()),
+                ("end_time", models.DateTimeField()),
+                ("date", models.DateField()),
+                ("week", models.DateField(help_text="Monday of the performance week.")),
+                ("capacity", models.IntegerField()),
+                ("tickets_sold", models.IntegerField()),
+                ("reservations", models.IntegerField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "play",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_performances",
+                        to="theatre.play",
+                    ),
+                ),
+                (
+                    "theatre_hall",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="theatre.theatrehall",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "archive_performance",
+                "ordering": ["-show_time"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedTicket",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("row", models.IntegerField()),
+                ("seat", models.IntegerField()),
+                ("reservation_id", models.BigIntegerField()),
+                ("sold_at", models.DateTimeField()),
+                (
+                    "performance",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tickets",
+                        to="theatre.archivedperformance",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_tickets",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "archive_ticket",
+                "ordering": ["row", "seat"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="archivedperformance",
+            index=models.Index(fields=["date"], name="archive_performance_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="archivedperformance",
+            index=models.Index(
+                fields=["theatre_hall", "week"], name="archive_performance_week_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedticket",
+            index=models.Index(fields=["sold_at"], name="archive_ticket_sold_idx"),
+        ),
+    ]
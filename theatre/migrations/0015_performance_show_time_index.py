@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0014_archive"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="performance",
+            index=models.Index(fields=["show_time"], name="performance_show_time_idx"),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:40
+
+from django.db import migrations
+
+PLAY_VECTOR_SQL = """
+    setweight(to_tsvector('{config}', play.title), 'A')
+    || setweight(to_tsvector('{config}', coalesce((
+        SELECT string_agg(actor.first_name || ' ' || actor.last_name, ' ')
+        FROM theatre_actor AS actor
+        JOIN theatre_play_actors AS link ON link.actor_id = actor.id
+        WHERE link.play_id = play.id
+    ), '')), 'B')
+    || setweight(to_tsvector('{config}', coalesce((
+        SELECT string_agg(genre.name, ' ')
+        FROM theatre_genre AS genre
+        JOIN theatre_play_genres AS link ON link.genre_id = genre.id
+        WHERE link.play_id = play.id
+    ), '')), 'B')
+    || setweight(to_tsvector('{config}', play.description), 'C')
+"""
+
+
+def backfill_sql(*configs):
+    vectors = " || ".join(
+        PLAY_VECTOR_SQL.format(config=config) for config in configs
+    )
+    return f"UPDATE theatre_play AS play SET search_vector = {vectors}"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0015_performance_show_time_index"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            backfill_sql("english", "simple"), backfill_sql("english")
+        ),
+    ]
@@ -0,0 +1,148 @@
+import logging
+from itertools import chain, islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework import mixins
+from rest_framework.response import Response
+
+from theatre.idempotency import idempotent
+from theatre.pagination import LimitOffsetPagination
+from theatre.renderers import FastJSONRenderer
+from theatre.replicas import choose_replica, reset_replica, use_replica
+from theatre.throttling import BookingThrottle
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingListModelMixin(mixins.ListModelMixin):
+    """
+    List a queryset, streaming the JSON body when the page holds at least
+    `JSON_STREAMING_THRESHOLD` objects. A streamed page is read from the
+    database and serialized `JSON_STREAMING_CHUNK_SIZE` objects at a time,
+    so neither the rows, the representations nor the body are held in
+    memory.
+
+    The query runs before the response starts, so it fails with a regular
+    error response. A later error can only abort the body: it is logged
+    and re-raised, and the client gets an incomplete response.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if self._can_stream(request):
+            lazy_page = self.paginator.paginate_queryset_lazily(
+                queryset, request, view=self
+            )
+            if lazy_page is not None:
+                page, length = lazy_page
+                if length >= settings.JSON_STREAMING_THRESHOLD:
+                    return self._streaming_response(request, page)
+                serializer = self.get_serializer(list(page), many=True)
+                return self.get_paginated_response(serializer.data)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    def _can_stream(self, request) -> bool:
+        renderer = request.accepted_renderer
+        return (
+            isinstance(self.paginator, LimitOffsetPagination)
+            and isinstance(renderer, FastJSONRenderer)
+            and renderer.get_indent(request.accepted_media_type, {}) is None
+        )
+
+    def _streaming_response(self, request, page):
+        envelope = dict(self.get_paginated_response([]).data)
+        envelope.pop("results", None)
+        child = self.get_serializer(many=True).child
+
+        # The body is produced after `finalize_response` has reset the
+        # replica of the request, so the page is pinned to the database
+        # chosen now; related objects follow their instance's database.
+        instances = page.using(page.db).iterator(
+            chunk_size=settings.JSON_STREAMING_CHUNK_SIZE
+        )
+        first = list(islice(instances, 1))
+
+        response = StreamingHttpResponse(
+            request.accepted_renderer.render_stream(
+                envelope,
+                self._represent(child, chain(first, instances)),
+                settings.JSON_STREAMING_CHUNK_SIZE,
+            ),
+            content_type=request.accepted_renderer.media_type,
+        )
+        response["Vary"] = "Accept"
+        return response
+
+    def _represent(self, child, instances):
+        try:
+            for instance in instances:
+                yield child.to_representation(instance)
+        except Exception:
+            logger.exception(
+                "Streaming %s failed after the response started.",
+                self.request.get_full_path(),
+            )
+            raise
+
+
+class IdempotentCreateModelMixin(mixins.CreateModelMixin):
+    """
+    Create an object once per `Idempotency-Key` header: retries of the
+    same request get the stored response back, and a concurrent duplicate
+    waits for the first one instead of running the create again.
+    """
+
+    def create(self, request, *args, **kwargs):
+        return idempotent(
+            request, lambda: self._create_response(request, *args, **kwargs)
+        )
+
+    def _create_response(self, request, *args, **kwargs):
+        # Client errors are stored and replayed like successes.
+        try:
+            return super().create(request, *args, **kwargs)
+        except Exception as exc:
+            return self.handle_exception(exc)
+
+
+class BookingThrottleMixin:
+    """
+    Throttle `booking_actions` with the booking rate limits and waiting
+    room instead of the default throttles.
+    """
+
+    booking_actions = ()
+
+    def get_throttles(self):
+        if self.action in self.booking_actions:
+            return [BookingThrottle()]
+        return super().get_throttles()
+
+
+class ReplicaReadMixin:
+    """
+    Read `replica_actions` from a database replica unless the user wrote
+    recently. Other actions, and every write, use the primary.
+    """
+
+    replica_actions = ("list", "retrieve")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions:
+            self._replica_token = use_replica(choose_replica(request))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = self.__dict__.pop("_replica_token", None)
+        if token is not None:
+            reset_replica(token)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -1,8 +1,21 @@
 import os
 import uuid
-
+from datetime import timedelta
+
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import (
+    BigIntegerRangeField,
+    DateTimeRangeField,
+    RangeBoundary,
+    RangeOperators,
+)
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F, Func, Q
+from django.utils import timezone
 from django.utils.text import slugify
 
 from theatre_service import settings
@@ -56,14 +69,36 @@ class Play(models.Model):
     genres = models.ManyToManyField(Genre, related_name="plays")
     actors = models.ManyToManyField(Actor, related_name="plays")
     image = models.ImageField(null=True, upload_to=play_image_file_path)
+    image_variants = models.JSONField(
+        default=dict, blank=True, editable=False
+    )
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ["title"]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="play_search_vector_idx")
+        ]
 
     def __str__(self):
         return self.title
 
 
+class Int8Range(Func):
+    """
+    One-element bigint range, so equality can be expressed as `&&` in a
+    GiST exclusion constraint without the btree_gist extension.
+    """
+
+    function = "INT8RANGE"
+    output_field = BigIntegerRangeField()
+
+
+class TsTzRange(Func):
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
 class Performance(models.Model):
     play = models.ForeignKey(
         Play, related_name="performances", on_delete=models.CASCADE
@@ -72,13 +107,215 @@ class Performance(models.Model):
         TheatreHall, related_name="performances", on_delete=models.CASCADE
     )
     show_time = models.DateTimeField()
+    end_time = models.DateTimeField(blank=True)
 
     class Meta:
         ordering = ["-show_time"]
+        indexes = [
+            models.Index(
+                fields=["theatre_hall", "show_time"],
+                name="performance_hall_time_idx",
+            ),
+            models.Index(
+                fields=["show_time"], name="performance_show_time_idx"
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(end_time__gt=F("show_time")),
+                name="performance_ends_after_start",
+            ),
+            ExclusionConstraint(
+                name="performance_no_hall_overlap",
+                expressions=[
+                    (
+                        Int8Range(
+                            "theatre_hall",
+                            "theatre_hall",
+                            RangeBoundary(
+                                inclusive_lower=True, inclusive_upper=True
+                            ),
+                        ),
+                        RangeOperators.OVERLAPS,
+                    ),
+                    (
+                        TsTzRange("show_time", "end_time"),
+                        RangeOperators.OVERLAPS,
+                    ),
+                ],
+                violation_error_message=(
+                    "The theatre hall is already booked at this time."
+                ),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.play.title} - {self.show_time}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_times = (
+            instance.__dict__.get("show_time"),
+            instance.__dict__.get("end_time"),
+        )
+        return instance
+
+    def fill_end_time(self) -> None:
+        """
+        Default a missing end time to the standard length, and keep the
+        length when show_time is moved without touching end_time since
+        the instance was loaded or last saved.
+        """
+        show_time = self._meta.get_field("show_time").to_python(
+            self.show_time
+        )
+        if show_time is None:
+            return
+        loaded_show_time, loaded_end_time = getattr(
+            self, "_loaded_times", (None, None)
+        )
+        if self.end_time is None:
+            self.end_time = show_time + timedelta(
+                minutes=settings.PERFORMANCE_DEFAULT_DURATION
+            )
+        elif (
+            loaded_show_time is not None
+            and self.end_time == loaded_end_time
+            and show_time != loaded_show_time
+        ):
+            self.end_time = show_time + (loaded_end_time - loaded_show_time)
+        self._loaded_times = (show_time, self.end_time)
+
+    def clean(self):
+        self.fill_end_time()
+
+
+class PerformanceSchedule(models.Model):
+    """
+    One row per performance, denormalized for calendar reads and kept
+    current by `theatre.schedule.refresh_schedule`.
+    """
+
+    performance = models.OneToOneField(
+        Performance,
+        primary_key=True,
+        related_name="schedule",
+        on_delete=models.CASCADE,
+    )
+    date = models.DateField()
+    show_time = models.DateTimeField()
+    play = models.ForeignKey(
+        Play, related_name="+", on_delete=models.CASCADE
+    )
+    play_title = models.CharField(max_length=255)
+    theatre_hall = models.ForeignKey(
+        TheatreHall, related_name="+", on_delete=models.CASCADE
+    )
+    theatre_hall_name = models.CharField(max_length=255)
+    capacity = models.IntegerField()
+    seats_left = models.IntegerField()
+
+    class Meta:
+        db_table = "performance_schedule"
+        ordering = ["date", "play_title", "show_time"]
+        indexes = [
+            models.Index(
+                fields=["date", "play_title", "show_time"],
+                name="schedule_date_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.play_title} - {self.show_time}"
+
+
+class PerformanceSales(models.Model):
+    """Tickets sold for one performance, kept up to date by a job."""
+
+    performance = models.OneToOneField(
+        Performance,
+        primary_key=True,
+        related_name="sales",
+        on_delete=models.CASCADE,
+    )
+    play = models.ForeignKey(
+        Play, related_name="+", on_delete=models.CASCADE
+    )
+    theatre_hall = models.ForeignKey(
+        TheatreHall, related_name="+", on_delete=models.CASCADE
+    )
+    date = models.DateField()
+    week = models.DateField(help_text="Monday of the performance week.")
+    capacity = models.IntegerField()
+    tickets_sold = models.IntegerField()
+    reservations = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "sales_performance"
+        ordering = ["date", "performance"]
+        indexes = [
+            models.Index(fields=["date"], name="sales_performance_date_idx"),
+            models.Index(
+                fields=["theatre_hall", "week"],
+                name="sales_performance_week_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.performance_id}: {self.tickets_sold}/{self.capacity}"
+
+
+class PlaySalesDay(models.Model):
+    """Tickets sold for a play on one day, by reservation time."""
+
+    play = models.ForeignKey(
+        Play, related_name="+", on_delete=models.CASCADE
+    )
+    date = models.DateField()
+    tickets_sold = models.IntegerField()
+    reservations = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "sales_play_day"
+        ordering = ["date", "play"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "play"], name="sales_play_day_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.play_id}: {self.tickets_sold}"
+
+
+class HallOccupancyWeek(models.Model):
+    """Seats sold against seats offered in a hall over one week."""
+
+    theatre_hall = models.ForeignKey(
+        TheatreHall, related_name="+", on_delete=models.CASCADE
+    )
+    week = models.DateField(help_text="Monday of the week.")
+    performances = models.IntegerField()
+    capacity = models.IntegerField()
+    tickets_sold = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "sales_hall_week"
+        ordering = ["week", "theatre_hall"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["week", "theatre_hall"],
+                name="sales_hall_week_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.week} {self.theatre_hall_id}: {self.tickets_sold}"
+
 
 class Reservation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -92,7 +329,14 @@ class Reservation(models.Model):
         return str(self.created_at)
 
     class Meta:
+        # Range partitioned by month of created_at (theatre/partitions.py),
+        # so the primary key is (id, created_at) in the database.
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["created_at"], name="reservation_created_idx"
+            ),
+        ]
 
 
 class Ticket(models.Model):
@@ -102,10 +346,20 @@ class Ticket(models.Model):
         Performance, related_name="tickets", on_delete=models.CASCADE
     )
     reservation = models.ForeignKey(
-        Reservation, related_name="tickets", on_delete=models.CASCADE
+        Reservation,
+        related_name="tickets",
+        on_delete=models.CASCADE,
+        # Partitioned reservations have no unique key on id alone.
+        db_constraint=False,
     )
+    # The performance's show time, the partition key of the table.
+    show_time = models.DateTimeField(editable=False)
 
     class Meta:
+        # Range partitioned by month of show_time (theatre/partitions.py).
+        # The primary key is (id, show_time) in the database and the unique
+        # seat constraint also includes show_time, which the performance
+        # determines.
         unique_together = ("row", "seat", "performance")
         ordering = ["row", "seat"]
 
@@ -148,7 +402,232 @@ class Ticket(models.Model):
             using=None,
             update_fields=None,
     ):
+        self.show_time = self.performance.show_time
         self.full_clean()
         return super(Ticket, self).save(
             force_insert, force_update, using, update_fields
         )
+
+
+class ArchivedPerformance(models.Model):
+    """
+    A performance moved out of the live tables by `theatre.archive`, kept
+    as one compact row with its sales totals. Its tickets are kept in
+    ArchivedTicket.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    play = models.ForeignKey(
+        Play, related_name="archived_performances", on_delete=models.CASCADE
+    )
+    theatre_hall = models.ForeignKey(
+        TheatreHall, related_name="+", on_delete=models.CASCADE
+    )
+    show_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    date = models.DateField()
+    week = models.DateField(help_text="Monday of the performance week.")
+    capacity = models.IntegerField()
+    tickets_sold = models.IntegerField()
+    reservations = models.IntegerField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "archive_performance"
+        ordering = ["-show_time"]
+        indexes = [
+            models.Index(fields=["date"], name="archive_performance_date_idx"),
+            models.Index(
+                fields=["theatre_hall", "week"],
+                name="archive_performance_week_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.play_id} - {self.show_time} (archived)"
+
+
+class ArchivedTicket(models.Model):
+    """A ticket of an archived performance, with its reservation details."""
+
+    id = models.BigIntegerField(primary_key=True)
+    performance = models.ForeignKey(
+        ArchivedPerformance, related_name="tickets", on_delete=models.CASCADE
+    )
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    # The reservation is deleted once it holds no live tickets.
+    reservation_id = models.BigIntegerField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="archived_tickets",
+        on_delete=models.CASCADE,
+    )
+    sold_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "archive_ticket"
+        ordering = ["row", "seat"]
+        indexes = [
+            models.Index(fields=["sold_at"], name="archive_ticket_sold_idx"),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.performance_id}: row {self.row}, seat {self.seat} "
+            "(archived)"
+        )
+
+
+class Job(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = "queued"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    name = models.CharField(max_length=255)
+    queue = models.CharField(max_length=64, default="default")
+    payload = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=1)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["queue", "-priority", "run_at", "id"],
+                condition=Q(status="queued"),
+                name="job_ready_idx",
+            ),
+            models.Index(
+                fields=["locked_until"],
+                condition=Q(status="running"),
+                name="job_running_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """
+    Response stored for a client supplied `Idempotency-Key`, replayed
+    when the same request is retried before `expires_at`.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "idempotency_key"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="idempotency_key_unique"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["expires_at"], name="idempotency_key_expires_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}:{self.key}"
+
+
+class WaitlistEntry(models.Model):
+    """
+    A user waiting for `seats` seats of a sold out performance. The line
+    is served in id order; the head is offered released seats, held for
+    them until `offer_expires_at`.
+    """
+
+    class Status(models.TextChoices):
+        WAITING = "waiting"
+        OFFERED = "offered"
+        BOOKED = "booked"
+        EXPIRED = "expired"
+
+    performance = models.ForeignKey(
+        Performance, related_name="waitlist", on_delete=models.CASCADE
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="waitlist_entries",
+        on_delete=models.CASCADE,
+    )
+    seats = models.PositiveSmallIntegerField(default=1)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.WAITING
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    offer_expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "waitlist_entry"
+        ordering = ["id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["performance", "user"],
+                condition=Q(status__in=["waiting", "offered"]),
+                name="waitlist_entry_active_unique",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["performance", "id"],
+                condition=Q(status="waiting"),
+                name="waitlist_queue_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.performance_id}:{self.user_id} ({self.status})"
+
+
+class SeatHold(models.Model):
+    """A seat kept for the waitlist entry it was offered to."""
+
+    entry = models.ForeignKey(
+        WaitlistEntry, related_name="holds", on_delete=models.CASCADE
+    )
+    performance = models.ForeignKey(
+        Performance, related_name="+", on_delete=models.CASCADE
+    )
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "waitlist_seat_hold"
+        ordering = ["row", "seat"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["performance", "row", "seat"],
+                name="seat_hold_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.performance_id}: row {self.row}, seat {self.seat}"
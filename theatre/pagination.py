@@ -0,0 +1,32 @@
+from django.conf import settings
+from rest_framework import pagination
+
+
+class LimitOffsetPagination(pagination.LimitOffsetPagination):
+    """
+    Limit/offset pagination with `?limit=` capped at PAGINATION_MAX_LIMIT.
+    """
+
+    @property
+    def max_limit(self) -> int:
+        return settings.PAGINATION_MAX_LIMIT
+
+    def paginate_queryset_lazily(self, queryset, request, view=None):
+        """
+        Like `paginate_queryset`, but return the page as an unevaluated
+        queryset together with its length, or None without a limit.
+        """
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = self.get_count(queryset)
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        length = max(0, min(self.limit, self.count - self.offset))
+        if length == 0:
+            return queryset.none(), 0
+        return queryset[self.offset:self.offset + self.limit], length
@@ -0,0 +1,256 @@
+import re
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+# Range partitioned tables and their partition key. Every table has one
+# partition per calendar month (UTC), `<table>_pYYYY_MM`, and a default
+# partition that catches rows outside them.
+PARTITIONED_TABLES = {
+    "theatre_ticket": "show_time",
+    "theatre_reservation": "created_at",
+}
+
+_PARTITION_MONTH = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def month_start(moment: datetime | date) -> date:
+    if isinstance(moment, datetime):
+        moment = moment.astimezone(dt_timezone.utc)
+    return date(moment.year, moment.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    year, month_index = divmod(month.year * 12 + month.month - 1 + count, 12)
+    return date(year, month_index + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def _bounds(month: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(month, datetime.min.time(), dt_timezone.utc)
+    end = datetime.combine(
+        add_months(month, 1), datetime.min.time(), dt_timezone.utc
+    )
+    return start, end
+
+
+def partition_months(cursor, table: str) -> list[date]:
+    """Months of the monthly partitions attached to `table`."""
+    cursor.execute(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = %s::regclass",
+        [table],
+    )
+    months = []
+    for (name,) in cursor.fetchall():
+        match = _PARTITION_MONTH.search(name)
+        if match:
+            months.append(date(int(match[1]), int(match[2]), 1))
+    return sorted(months)
+
+
+def create_partition(cursor, table: str, column: str, month: date) -> str:
+    """
+    Attach the partition of `month`, first moving into it the rows the
+    default partition holds for that month.
+    """
+    quote = connection.ops.quote_name
+    name = partition_name(table, month)
+    start, end = _bounds(month)
+    cursor.execute(
+        f"CREATE TABLE {quote(name)} (LIKE {quote(table)} "
+        "INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {quote(table + '_default')} "
+        f"WHERE {quote(column)} >= %s AND {quote(column)} < %s "
+        f"RETURNING *) INSERT INTO {quote(name)} SELECT * FROM moved",
+        [start, end],
+    )
+    cursor.execute(
+        f"ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} "
+        "FOR VALUES FROM (%s) TO (%s)",
+        [start, end],
+    )
+    return name
+
+
+def roll_forward(cursor, table: str, column: str, months_ahead: int, now=None):
+    """
+    Create the missing partitions from the current month to `months_ahead`
+    months later, so new rows never land in the default partition.
+    """
+    current = month_start(now or timezone.now())
+    existing = set(partition_months(cursor, table))
+    return [
+        create_partition(cursor, table, column, month)
+        for month in (
+            add_months(current, count) for count in range(months_ahead + 1)
+        )
+        if month not in existing
+    ]
+
+
+def _definitions(cursor, table: str):
+    """The indexes and foreign key and unique constraints of `table`."""
+    cursor.execute(
+        "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+        "WHERE indrelid = %s::regclass AND indexrelid NOT IN "
+        "(SELECT conindid FROM pg_constraint WHERE conrelid = %s::regclass)",
+        [table, table],
+    )
+    indexes = [definition for (definition,) in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid), ARRAY("
+        "  SELECT attname FROM unnest(conkey) WITH ORDINALITY key(num, pos)"
+        "  JOIN pg_attribute ON attrelid = conrelid AND attnum = key.num"
+        "  ORDER BY key.pos"
+        ") FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype IN ('f', 'u')",
+        [table],
+    )
+    return indexes, cursor.fetchall()
+
+
+def _rebuild(cursor, table: str, source: str, key: list[str], definitions):
+    """Copy `source` into `table`, drop it and restore its definitions."""
+    quote = connection.ops.quote_name
+    cursor.execute(
+        "SELECT pg_get_serial_sequence(%s, 'id'), "
+        "pg_get_serial_sequence(%s, 'id')",
+        [source, table],
+    )
+    old_sequence, sequence = cursor.fetchone()
+    cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(source)}")
+    cursor.execute(
+        f"SELECT setval(%s, last_value, is_called) FROM {old_sequence}",
+        [sequence],
+    )
+    cursor.execute(f"DROP TABLE {quote(source)}")
+    cursor.execute(
+        f"ALTER SEQUENCE {sequence} RENAME TO {quote(table + '_id_seq')}"
+    )
+    cursor.execute(
+        f"ALTER TABLE {quote(table)} ADD CONSTRAINT "
+        f"{quote(table + '_pkey')} PRIMARY KEY "
+        f"({', '.join(map(quote, key))})"
+    )
+    indexes, constraints = definitions
+    for name, kind, definition, columns in constraints:
+        if kind == "u":
+            columns = [column for column in columns if column not in key]
+            definition = f"UNIQUE ({', '.join(map(quote, columns + key[1:]))})"
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} "
+            f"{definition}"
+        )
+    for definition in indexes:
+        cursor.execute(re.sub(
+            r" ON (ONLY )?\S+ USING ", f" ON {quote(table)} USING ", definition
+        ))
+
+
+def partition_table(cursor, table: str, column: str, months_ahead: int):
+    """
+    Turn `table` into a table range partitioned by `column`, with monthly
+    partitions from its oldest row to `months_ahead` months from now.
+    Primary key and unique constraints gain the partition key, as
+    PostgreSQL requires; names, indexes and foreign keys are kept.
+    """
+    quote = connection.ops.quote_name
+    source = f"{table}_unpartitioned"
+    cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(source)}")
+    definitions = _definitions(cursor, source)
+    cursor.execute(
+        f"CREATE TABLE {quote(table)} (LIKE {quote(source)} "
+        "INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE ({quote(column)})"
+    )
+    cursor.execute(
+        f"CREATE TABLE {quote(table + '_default')} "
+        f"PARTITION OF {quote(table)} DEFAULT"
+    )
+    cursor.execute(f"SELECT min({quote(column)}) FROM {quote(source)}")
+    oldest = cursor.fetchone()[0] or timezone.now()
+    month = month_start(oldest)
+    last = add_months(month_start(timezone.now()), months_ahead)
+    while month <= last:
+        start, end = _bounds(month)
+        cursor.execute(
+            f"CREATE TABLE {quote(partition_name(table, month))} "
+            f"PARTITION OF {quote(table)} FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+        month = add_months(month, 1)
+    _rebuild(cursor, table, source, ["id", column], definitions)
+
+
+def unpartition_table(cursor, table: str, column: str):
+    """Turn the partitioned `table` back into a plain table."""
+    quote = connection.ops.quote_name
+    source = f"{table}_partitioned"
+    cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(source)}")
+    definitions = _definitions(cursor, source)
+    cursor.execute(
+        f"CREATE TABLE {quote(table)} (LIKE {quote(source)} "
+        "INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING CONSTRAINTS)"
+    )
+    indexes, constraints = definitions
+    constraints = [
+        (name, kind, definition, [c for c in columns if c != column])
+        for name, kind, definition, columns in constraints
+    ]
+    _rebuild(cursor, table, source, ["id"], (indexes, constraints))
+
+
+def archive_partitions(
+    table: str, before: date, schema: str
+) -> tuple[list[str], list[str]]:
+    """
+    Detach the monthly partitions of `table` that end by `before` and move
+    them to `schema`, where they stay queryable but out of every live
+    query. Ticket partitions of months with live performances (not yet
+    moved by `archive_performances`) and reservation partitions still
+    referenced by live tickets are kept, so sales rollups never lose
+    tickets of a live performance. Returns the archived and the kept
+    partition names.
+    """
+    quote = connection.ops.quote_name
+    archived, kept = [], []
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {quote(schema)}")
+        for month in partition_months(cursor, table):
+            if add_months(month, 1) > before:
+                continue
+            name = partition_name(table, month)
+            if table == "theatre_ticket":
+                cursor.execute(
+                    "SELECT EXISTS (SELECT 1 FROM theatre_performance "
+                    "WHERE show_time >= %s AND show_time < %s)",
+                    _bounds(month),
+                )
+                if cursor.fetchone()[0]:
+                    kept.append(name)
+                    continue
+            if table == "theatre_reservation":
+                cursor.execute(
+                    "SELECT EXISTS (SELECT 1 FROM theatre_ticket "
+                    f"JOIN {quote(name)} reservation "
+                    "ON reservation.id = theatre_ticket.reservation_id)"
+                )
+                if cursor.fetchone()[0]:
+                    kept.append(name)
+                    continue
+            cursor.execute(
+                f"ALTER TABLE {quote(table)} DETACH PARTITION {quote(name)}"
+            )
+            cursor.execute(
+                f"ALTER TABLE {quote(name)} SET SCHEMA {quote(schema)}"
+            )
+            archived.append(name)
+    return archived, kept
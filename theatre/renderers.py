@@ -0,0 +1,108 @@
+import json
+import time
+
+from rest_framework.renderers import JSONRenderer
+
+from theatre.metrics import record_timing
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer that encodes with orjson when it is installed
+    and falls back to the stdlib encoder of DRF otherwise.
+    Indented output (browsable API, `; indent=` media type)
+    always goes through the stdlib encoder.
+    """
+
+    def __init__(self):
+        self._encoder = self.encoder_class()
+
+    @property
+    def engine(self) -> str:
+        return "orjson" if orjson is not None else "json"
+
+    def _default(self, obj):
+        return self._encoder.default(obj)
+
+    def dumps(self, data) -> bytes:
+        """Compactly encode `data` with the fastest available engine."""
+        if orjson is None:
+            ret = json.dumps(
+                data,
+                cls=self.encoder_class,
+                ensure_ascii=self.ensure_ascii,
+                allow_nan=not self.strict,
+                separators=(",", ":") if self.compact else (", ", ": "),
+            ).encode()
+        else:
+            ret = orjson.dumps(
+                data,
+                default=self._default,
+                option=(
+                    orjson.OPT_NON_STR_KEYS
+                    | orjson.OPT_PASSTHROUGH_DATETIME
+                ),
+            )
+
+        # Keep the output a strict javascript subset like JSONRenderer does.
+        return ret.replace(
+            b"\xe2\x80\xa8", b"\\u2028"
+        ).replace(b"\xe2\x80\xa9", b"\\u2029")
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+
+        start = time.perf_counter()
+        ret = self.dumps(data)
+        duration = time.perf_counter() - start
+
+        response = renderer_context.get("response")
+        if response is not None:
+            response["Server-Timing"] = (
+                f"render;desc={self.engine};dur={duration * 1000:.3f}"
+            )
+        record_timing(
+            "render", duration, engine=self.engine, streaming=False
+        )
+        return ret
+
+    def render_stream(self, envelope: dict, items, chunk_size: int):
+        """
+        Yield a paginated body chunk by chunk. `envelope` holds the
+        pagination keys, `items` lazily produces the serialized results,
+        which are encoded `chunk_size` at a time.
+        """
+        start = time.perf_counter()
+        head = self.dumps(envelope)[:-1]
+        yield head + (b',"results":[' if envelope else b'"results":[')
+
+        chunk = []
+        first = True
+        for item in items:
+            chunk.append(self.dumps(item))
+            if len(chunk) >= chunk_size:
+                yield (b"" if first else b",") + b",".join(chunk)
+                first = False
+                chunk = []
+        if chunk:
+            yield (b"" if first else b",") + b",".join(chunk)
+        yield b"]}"
+
+        record_timing(
+            "render",
+            time.perf_counter() - start,
+            engine=self.engine,
+            streaming=True,
+        )
@@ -0,0 +1,93 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+
+_replica = ContextVar("theatre_replica", default=None)
+
+
+def pin_key(user_id: int) -> str:
+    return f"theatre:primary-pin:{user_id}"
+
+
+def pin_to_primary(user_id: int) -> None:
+    """Read the user's requests from the primary for a while."""
+    cache.set(
+        pin_key(user_id), True, settings.DATABASE_REPLICA_PIN_SECONDS
+    )
+
+
+def is_pinned(user_id: int | None) -> bool:
+    return user_id is not None and cache.get(pin_key(user_id), False)
+
+
+def use_replica(alias: str | None):
+    """Route reads of the current context to `alias`; returns a token."""
+    return _replica.set(alias)
+
+
+def reset_replica(token) -> None:
+    _replica.reset(token)
+
+
+def choose_replica(request) -> str | None:
+    """
+    A replica for the reads of a safe request, or None to stay on the
+    primary because there are no replicas or the user wrote recently.
+    """
+    if request.method not in SAFE_METHODS or not settings.DATABASE_REPLICAS:
+        return None
+    if is_pinned(getattr(request.user, "id", None)):
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+class PrimaryReplicaRouter:
+    """
+    Send reads to the replica chosen for the current request, if any.
+    Writes, migrations and reads inside a transaction on the primary stay
+    on the primary, so a transaction reads its own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _replica.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the primary's rows.
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class PrimaryPinMiddleware(MiddlewareMixin):
+    """
+    Pin users to the primary for DATABASE_REPLICA_PIN_SECONDS after a
+    successful write, so they read their own writes despite replica lag.
+    """
+
+    def process_response(self, request, response):
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            user_id = getattr(getattr(request, "user", None), "id", None)
+            if user_id is not None:
+                pin_to_primary(user_id)
+        return response
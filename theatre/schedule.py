@@ -0,0 +1,134 @@
+import threading
+from datetime import date
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from theatre.models import Performance, PerformanceSchedule
+
+SCHEDULE_FIELDS = [
+    "date",
+    "show_time",
+    "play",
+    "play_title",
+    "theatre_hall",
+    "theatre_hall_name",
+    "capacity",
+    "seats_left",
+]
+
+_pending = threading.local()
+
+
+def schedule_row(performance: Performance) -> PerformanceSchedule:
+    hall = performance.theatre_hall
+    return PerformanceSchedule(
+        performance_id=performance.id,
+        date=timezone.localtime(performance.show_time).date(),
+        show_time=performance.show_time,
+        play_id=performance.play_id,
+        play_title=performance.play.title,
+        theatre_hall_id=hall.id,
+        theatre_hall_name=hall.name,
+        capacity=hall.capacity,
+        seats_left=hall.capacity - performance.tickets_sold,
+    )
+
+
+def refresh_schedule(performance_ids) -> int:
+    """
+    Recompute the schedule rows of the given performances with one read
+    and one upsert. Returns the number of rows written.
+    """
+    performance_ids = set(performance_ids)
+    if not performance_ids:
+        return 0
+
+    performances = (
+        Performance.objects.filter(pk__in=performance_ids)
+        .select_related("play", "theatre_hall")
+        .only(
+            "show_time",
+            "play__title",
+            "theatre_hall__name",
+            "theatre_hall__rows",
+            "theatre_hall__seats_in_row",
+        )
+        .annotate(tickets_sold=Count("tickets"))
+        .order_by()
+    )
+    rows = [schedule_row(performance) for performance in performances]
+    PerformanceSchedule.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["performance"],
+        update_fields=SCHEDULE_FIELDS,
+    )
+    return len(rows)
+
+
+def _flush_pending() -> None:
+    performance_ids = getattr(_pending, "ids", set())
+    _pending.ids = set()
+    refresh_schedule(performance_ids)
+
+
+def mark_schedule_stale(performance_ids) -> None:
+    """
+    Refresh the schedule rows of `performance_ids` once the current
+    transaction commits. The first flush after a commit refreshes every
+    pending id at once, so a reservation of many seats costs one refresh;
+    ids left over from a rolled back transaction ride along harmlessly.
+    """
+    if not hasattr(_pending, "ids"):
+        _pending.ids = set()
+    _pending.ids.update(performance_ids)
+    transaction.on_commit(_flush_pending)
+
+
+def calendar(date_from: date, date_to: date) -> list[dict]:
+    """
+    Performances between two dates (inclusive) grouped by day and then by
+    play, read from the schedule table with one range scan.
+    """
+    rows = (
+        PerformanceSchedule.objects.filter(date__range=(date_from, date_to))
+        .order_by("date", "play_title", "play_id", "show_time")
+        .values_list(
+            "date",
+            "play_id",
+            "play_title",
+            "performance_id",
+            "show_time",
+            "theatre_hall_id",
+            "theatre_hall_name",
+            "capacity",
+            "seats_left",
+        )
+    )
+
+    days = []
+    for day, day_rows in groupby(rows, key=lambda row: row[0]):
+        plays = []
+        for (play_id, title), play_rows in groupby(
+            day_rows, key=lambda row: (row[1], row[2])
+        ):
+            plays.append({
+                "play_id": play_id,
+                "play_title": title,
+                "performances": [
+                    {
+                        "id": row[3],
+                        "show_time": row[4],
+                        "theatre_hall_id": row[5],
+                        "theatre_hall": row[6],
+                        "capacity": row[7],
+                        "seats_left": row[8],
+                    }
+                    for row in play_rows
+                ],
+            })
+        days.append({"date": day, "plays": plays})
+    return days
@@ -0,0 +1,174 @@
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.exceptions import APIException, ErrorDetail
+
+from theatre.analytics import mark_sales_stale
+from theatre.models import Performance, Play, TheatreHall
+from theatre.schedule import mark_schedule_stale
+
+
+class PerformanceConflict(APIException):
+    """
+    409 response listing the performances a new or moved performance
+    would overlap, shaped like the bulk schedule `conflicts`.
+    """
+
+    status_code = 409
+    default_detail = "The theatre hall is already booked at this time."
+    default_code = "performance_conflict"
+
+    def __init__(self, conflicts=()):
+        super().__init__()
+        self.detail = {
+            "detail": ErrorDetail(self.default_detail, self.default_code),
+            "conflicts": list(conflicts),
+        }
+
+
+def recurrence(
+    date_from: date, date_to: date, weekdays, times
+) -> list[datetime]:
+    """
+    Aware start times for every `times` entry on each day between the two
+    dates (inclusive) whose weekday (Monday is 0) is in `weekdays`.
+    """
+    weekdays = set(weekdays)
+    starts = []
+    day = date_from
+    while day <= date_to:
+        if day.weekday() in weekdays:
+            starts.extend(
+                timezone.make_aware(datetime.combine(day, start))
+                for start in times
+            )
+        day += timedelta(days=1)
+    return sorted(set(starts))
+
+
+def _prefix_latest_end(intervals):
+    """For each position, the interval with the latest end so far."""
+    latest = []
+    for interval in intervals:
+        if not latest or interval[1] > latest[-1][1]:
+            latest.append(interval)
+        else:
+            latest.append(latest[-1])
+    return latest
+
+
+def find_conflicts(
+    theatre_hall: TheatreHall,
+    intervals: list[tuple[datetime, datetime]],
+    exclude=(),
+) -> list[dict]:
+    """
+    Candidate (start, end) intervals that would overlap another performance
+    in the hall or another candidate; performances in `exclude` are
+    ignored. Existing performances are read with one range query and
+    compared in a sweep over both sorted lists.
+    """
+    if not intervals:
+        return []
+    intervals = sorted(intervals)
+    existing = list(
+        Performance.objects.filter(
+            theatre_hall=theatre_hall,
+            show_time__lt=max(end for _, end in intervals),
+            end_time__gt=intervals[0][0],
+        )
+        .exclude(pk__in=[pk for pk in exclude if pk is not None])
+        .order_by("show_time")
+        .values_list("show_time", "end_time", "id")
+    )
+    existing_starts = [interval[0] for interval in existing]
+    existing_latest = _prefix_latest_end(existing)
+
+    conflicts = []
+    previous = None
+    for start, end in intervals:
+        position = bisect_left(existing_starts, end) - 1
+        other = None
+        if position >= 0 and existing_latest[position][1] > start:
+            other = existing_latest[position]
+        elif previous is not None and previous[1] > start:
+            other = previous
+        if other is not None:
+            conflicts.append({
+                "show_time": start,
+                "end_time": end,
+                "conflicts_with": {
+                    "id": other[2],
+                    "show_time": other[0],
+                    "end_time": other[1],
+                },
+            })
+        if previous is None or end > previous[1]:
+            previous = (start, end, None)
+    return conflicts
+
+
+def bulk_schedule(
+    play: Play,
+    theatre_hall: TheatreHall,
+    starts: list[datetime],
+    duration: timedelta,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Create a performance of `play` in `theatre_hall` for every start time
+    in one `bulk_create`, unless any of them conflicts. The hall row is
+    locked so two bulk schedules for one hall cannot interleave; a single
+    performance committed in between is caught by the exclusion
+    constraint and raised as `PerformanceConflict`.
+    """
+    intervals = [(start, start + duration) for start in starts]
+    with transaction.atomic():
+        TheatreHall.objects.select_for_update().get(pk=theatre_hall.pk)
+        conflicts = find_conflicts(theatre_hall, intervals)
+        created = []
+        if not conflicts and not dry_run:
+            try:
+                with transaction.atomic():
+                    created = Performance.objects.bulk_create(
+                        Performance(
+                            play=play,
+                            theatre_hall=theatre_hall,
+                            show_time=start,
+                            end_time=start + duration,
+                        )
+                        for start in starts
+                    )
+            except IntegrityError as error:
+                if "performance_no_hall_overlap" not in str(error):
+                    raise
+                raise PerformanceConflict(
+                    find_conflicts(theatre_hall, intervals)
+                )
+            performance_ids = [performance.id for performance in created]
+            mark_schedule_stale(performance_ids)
+            mark_sales_stale(performance_ids)
+
+    if created:
+        performances = [
+            {
+                "id": performance.id,
+                "show_time": performance.show_time,
+                "end_time": performance.end_time,
+            }
+            for performance in created
+        ]
+    else:
+        performances = [
+            {"id": None, "show_time": start, "end_time": start + duration}
+            for start in starts
+        ]
+    return {
+        "dry_run": dry_run,
+        "requested": len(starts),
+        "created": len(created),
+        "performances": performances,
+        "conflicts": conflicts,
+    }
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView
+
+from theatre.compression import (
+    PRECOMPRESSED_SUFFIXES,
+    negotiate_encoding,
+    precompress_file,
+)
+
+SCHEMA_RENDERERS = {
+    "yaml": OpenApiYamlRenderer,
+    "json": OpenApiJsonRenderer,
+}
+
+MANIFEST_NAME = "manifest.json"
+
+_artifacts = {}
+_artifacts_lock = threading.Lock()
+
+
+def generate_schema() -> dict:
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=None, public=True)
+
+
+def render_schema(schema: dict) -> dict:
+    """Render `schema` once per format, keyed by renderer format."""
+    return {
+        schema_format: renderer().render(schema, renderer_context={})
+        for schema_format, renderer in SCHEMA_RENDERERS.items()
+    }
+
+
+def etag_for(content: bytes) -> str:
+    return '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+
+
+def write_schema_artifacts(directory: Path, version: str) -> dict:
+    """
+    Generate the schema and write it to `directory` as `schema.<format>`
+    files plus precompressed variants and a manifest recording the code
+    version the artifacts were built from.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    manifest = {"version": version, "files": {}}
+    for schema_format, content in render_schema(generate_schema()).items():
+        path = directory / f"schema.{schema_format}"
+        path.write_bytes(content)
+        precompress_file(path, force=True)
+        manifest["files"][schema_format] = {
+            "name": path.name,
+            "etag": etag_for(content),
+        }
+
+    (directory / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def _read_artifacts(directory: Path, version: str) -> dict | None:
+    try:
+        manifest = json.loads((directory / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != version:
+        return None
+
+    artifacts = {}
+    for schema_format, entry in manifest["files"].items():
+        path = directory / entry["name"]
+        variants = {}
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+            variant = path.with_name(path.name + suffix)
+            if variant.exists():
+                variants[encoding] = variant.read_bytes()
+        artifacts[schema_format] = {
+            "content": path.read_bytes(),
+            "etag": entry["etag"],
+            "variants": variants,
+        }
+    return artifacts
+
+
+def _generate_artifacts() -> dict:
+    return {
+        schema_format: {
+            "content": content,
+            "etag": etag_for(content),
+            "variants": {},
+        }
+        for schema_format, content in render_schema(generate_schema()).items()
+    }
+
+
+def get_schema_artifacts() -> dict:
+    """
+    Return the rendered schema for the running code version. Built
+    artifacts are read from OPENAPI_SCHEMA_DIR once per process; when they
+    are missing or stale the schema is generated once and kept in memory.
+    """
+    version = settings.CODE_VERSION
+    artifacts = _artifacts.get(version)
+    if artifacts is not None:
+        return artifacts
+
+    with _artifacts_lock:
+        if version not in _artifacts:
+            _artifacts.clear()
+            _artifacts[version] = (
+                _read_artifacts(Path(settings.OPENAPI_SCHEMA_DIR), version)
+                or _generate_artifacts()
+            )
+        return _artifacts[version]
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    Serve the pre-generated schema with strong ETags instead of
+    introspecting every view on each request. Requests for a specific
+    `lang` or `version` are still generated on the fly.
+    """
+
+    def _get_schema_response(self, request):
+        if request.GET.get("lang") or request.GET.get("version"):
+            return super()._get_schema_response(request)
+
+        renderer = request.accepted_renderer
+        artifact = get_schema_artifacts().get(renderer.format)
+        if artifact is None:
+            return super()._get_schema_response(request)
+
+        encoding = negotiate_encoding(
+            request.META.get("HTTP_ACCEPT_ENCODING", ""),
+            tuple(artifact["variants"]),
+        )
+        etag = artifact["etag"]
+        if encoding is not None:
+            etag = f'{etag[:-1]}-{encoding}"'
+
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+        if if_none_match and (
+            etag in parse_etags(if_none_match) or if_none_match == "*"
+        ):
+            response = HttpResponseNotModified()
+        else:
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type += f"; charset={renderer.charset}"
+            response = HttpResponse(
+                artifact["variants"][encoding]
+                if encoding else artifact["content"],
+                content_type=content_type,
+            )
+            if encoding is not None:
+                response["Content-Encoding"] = encoding
+            response["Content-Disposition"] = (
+                'inline; filename="%s"' % self._get_filename(request, None)
+            )
+
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+        return response
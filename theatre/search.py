@@ -0,0 +1,109 @@
+import re
+from functools import reduce
+from operator import add, and_
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db.models import (
+    F,
+    OuterRef,
+    QuerySet,
+    Subquery,
+    TextField,
+    Value,
+)
+from django.db.models.functions import Coalesce, Concat
+
+from theatre.models import Actor, Genre, Play
+
+SEARCH_CONFIG = "english"
+
+# Prefixes are matched against unstemmed lexemes with stopwords kept, so
+# "the tem" or "lovel" (stemmed to "love" in English) find what is typed.
+PREFIX_CONFIG = "simple"
+
+# Field weights, from most to least relevant.
+TITLE_WEIGHT = "A"
+PEOPLE_WEIGHT = "B"
+DESCRIPTION_WEIGHT = "C"
+
+MAX_SEARCH_TERMS = 8
+
+TERM_RE = re.compile(r"\w+")
+
+
+def _related_names(model, expression) -> Coalesce:
+    """Space separated `expression` of `model` rows linked to the play."""
+    names = (
+        model.objects.filter(plays=OuterRef("pk"))
+        .order_by()
+        .values("plays")
+        .annotate(names=StringAgg(expression, delimiter=" "))
+        .values("names")
+    )
+    return Coalesce(Subquery(names), Value(""), output_field=TextField())
+
+
+def play_search_vector() -> SearchVector:
+    actor_names = _related_names(
+        Actor, Concat("first_name", Value(" "), "last_name")
+    )
+    genre_names = _related_names(Genre, F("name"))
+    fields = (
+        (F("title"), TITLE_WEIGHT),
+        (actor_names, PEOPLE_WEIGHT),
+        (genre_names, PEOPLE_WEIGHT),
+        (F("description"), DESCRIPTION_WEIGHT),
+    )
+    return reduce(add, (
+        SearchVector(expression, weight=weight, config=config)
+        for config in (SEARCH_CONFIG, PREFIX_CONFIG)
+        for expression, weight in fields
+    ))
+
+
+def update_search_vectors(play_ids) -> int:
+    """
+    Recompute `search_vector` for the given plays in one UPDATE.
+    `play_ids` may be a list of ids or a queryset of ids.
+    """
+    if isinstance(play_ids, QuerySet):
+        plays = Play.objects.filter(pk__in=play_ids)
+    else:
+        play_ids = list(play_ids)
+        if not play_ids:
+            return 0
+        plays = Play.objects.filter(pk__in=play_ids)
+    return plays.update(search_vector=play_search_vector())
+
+
+def search_query(text: str) -> SearchQuery | None:
+    """
+    Turn user input into a query where every word must match, either as
+    a prefix of an unstemmed word or as an English word form, so
+    "shake ham" finds "Hamlet" by Shakespeare while typing.
+    """
+    terms = TERM_RE.findall(text.lower())[:MAX_SEARCH_TERMS]
+    if not terms:
+        return None
+    return reduce(and_, (
+        SearchQuery(f"{term}:*", search_type="raw", config=PREFIX_CONFIG)
+        | SearchQuery(term, config=SEARCH_CONFIG)
+        for term in terms
+    ))
+
+
+def search_plays(queryset: QuerySet, text: str) -> QuerySet:
+    """Filter `queryset` to plays matching `text`, best matches first."""
+    query = search_query(text)
+    if query is None:
+        return queryset.none()
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank", "title", "id")
+    )
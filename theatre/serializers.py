@@ -1,15 +1,49 @@
-from django.db import transaction
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 
 from theatre.models import (
+    ArchivedPerformance,
+    ArchivedTicket,
     Ticket,
     TheatreHall,
     Actor,
     Genre,
     Reservation,
     Play,
-    Performance
+    Performance,
+    WaitlistEntry,
+)
+from theatre.scheduling import (
+    PerformanceConflict,
+    find_conflicts,
+    recurrence,
 )
+from theatre.tasks import send_reservation_confirmation
+from theatre.uploads import StreamedImageField
+from theatre.waitlist import claim_offers, held_for_others, position
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """
+    Expose stored image variants as `{format: {"<width>w": url}}`,
+    ready to be joined into a srcset.
+    """
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        srcset = {}
+        for fmt, names in (value or {}).items():
+            srcset[fmt] = {}
+            for width, name in names.items():
+                url = default_storage.url(name)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                srcset[fmt][f"{width}w"] = url
+        return srcset
 
 
 class GenreSerializer(serializers.ModelSerializer):
@@ -43,22 +77,42 @@ class PlayListSerializer(serializers.ModelSerializer):
     genres = serializers.SlugRelatedField(
         slug_field="name", read_only=True, many=True
     )
+    image_srcset = ImageVariantsField(source="image_variants")
 
     class Meta:
         model = Play
-        fields = ("id", "title", "description", "genres", "actors", "image")
+        fields = (
+            "id",
+            "title",
+            "description",
+            "genres",
+            "actors",
+            "image",
+            "image_srcset",
+        )
 
 
 class PlayRetrieveSerializer(serializers.ModelSerializer):
     actors = ActorSerializer(many=True, read_only=True)
     genres = GenreSerializer(many=True, read_only=True)
+    image_srcset = ImageVariantsField(source="image_variants")
 
     class Meta:
         model = Play
-        fields = ("id", "title", "description", "genres", "actors", "image")
+        fields = (
+            "id",
+            "title",
+            "description",
+            "genres",
+            "actors",
+            "image",
+            "image_srcset",
+        )
 
 
 class PlayImageSerializer(serializers.ModelSerializer):
+    image = StreamedImageField(allow_null=True, required=False)
+
     class Meta:
         model = Play
         fields = ("id", "image")
@@ -67,12 +121,64 @@ class PlayImageSerializer(serializers.ModelSerializer):
 class PerformanceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Performance
-        fields = ("id", "show_time", "play", "theatre_hall")
+        fields = ("id", "show_time", "end_time", "play", "theatre_hall")
+        extra_kwargs = {"end_time": {"required": False}}
+
+    def _current(self, data, field):
+        return data.get(field, getattr(self.instance, field, None))
+
+    def _conflicts(self, data) -> list[dict]:
+        return find_conflicts(
+            self._current(data, "theatre_hall"),
+            [(self._current(data, "show_time"), data["end_time"])],
+            exclude=[getattr(self.instance, "pk", None)],
+        )
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        show_time = self._current(data, "show_time")
+        if "end_time" not in data:
+            if self.instance is not None:
+                # A moved performance keeps its length.
+                duration = self.instance.end_time - self.instance.show_time
+            else:
+                duration = timedelta(
+                    minutes=settings.PERFORMANCE_DEFAULT_DURATION
+                )
+            data["end_time"] = show_time + duration
+        if data["end_time"] <= show_time:
+            raise serializers.ValidationError(
+                {"end_time": "Must be after show_time."}
+            )
+
+        conflicts = self._conflicts(data)
+        if conflicts:
+            raise PerformanceConflict(conflicts)
+        return data
+
+    def _save_checked(self, save, *args):
+        # The exclusion constraint still catches a conflicting performance
+        # committed between validate() and the write.
+        validated_data = args[-1]
+        try:
+            with transaction.atomic():
+                return save(*args)
+        except IntegrityError as error:
+            if "performance_no_hall_overlap" not in str(error):
+                raise
+            raise PerformanceConflict(self._conflicts(validated_data))
+
+    def create(self, validated_data):
+        return self._save_checked(super().create, validated_data)
+
+    def update(self, instance, validated_data):
+        return self._save_checked(super().update, instance, validated_data)
 
 
 class PerformanceListSerializer(serializers.ModelSerializer):
     play_title = serializers.CharField(source="play.title", read_only=True)
     play_image = serializers.ImageField(source="play.image", read_only=True)
+    play_image_srcset = ImageVariantsField(source="play.image_variants")
     theatre_hall = serializers.CharField(
         source="theatre_hall.name", read_only=True
     )
@@ -87,12 +193,90 @@ class PerformanceListSerializer(serializers.ModelSerializer):
             "id",
             "play_title",
             "play_image",
+            "play_image_srcset",
             "theatre_hall",
             "theatre_hall_capacity",
             "tickets_available"
         )
 
 
+class PerformanceBulkScheduleSerializer(serializers.Serializer):
+    play = serializers.PrimaryKeyRelatedField(queryset=Play.objects.all())
+    theatre_hall = serializers.PrimaryKeyRelatedField(
+        queryset=TheatreHall.objects.all()
+    )
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6),
+        default=list(range(7)),
+        help_text="Days of the week to schedule, Monday is 0",
+    )
+    times = serializers.ListField(
+        child=serializers.TimeField(), allow_empty=False
+    )
+    duration = serializers.IntegerField(
+        min_value=1,
+        default=settings.PERFORMANCE_DEFAULT_DURATION,
+        help_text="Length of each performance in minutes",
+    )
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        if data["date_to"] < data["date_from"]:
+            raise serializers.ValidationError(
+                {"date_to": "Must not be before date_from."}
+            )
+        days = (data["date_to"] - data["date_from"]).days + 1
+        if days > settings.BULK_SCHEDULE_MAX_DAYS:
+            raise serializers.ValidationError(
+                {
+                    "date_to": f"At most {settings.BULK_SCHEDULE_MAX_DAYS} "
+                               f"days can be scheduled at once."
+                }
+            )
+        data["starts"] = recurrence(
+            data["date_from"], data["date_to"], data["weekdays"], data["times"]
+        )
+        if not data["starts"]:
+            raise serializers.ValidationError(
+                "The rule does not produce any performances."
+            )
+        if len(data["starts"]) > settings.BULK_SCHEDULE_MAX_PERFORMANCES:
+            raise serializers.ValidationError(
+                f"The rule produces {len(data['starts'])} performances, "
+                f"at most {settings.BULK_SCHEDULE_MAX_PERFORMANCES} "
+                f"are allowed at once."
+            )
+        return data
+
+
+class ScheduledPerformanceSerializer(serializers.Serializer):
+    id = serializers.IntegerField(allow_null=True)
+    show_time = serializers.DateTimeField()
+    end_time = serializers.DateTimeField()
+
+
+class ScheduleConflictSerializer(serializers.Serializer):
+    show_time = serializers.DateTimeField()
+    end_time = serializers.DateTimeField()
+    conflicts_with = ScheduledPerformanceSerializer()
+
+
+class PerformanceConflictSerializer(serializers.Serializer):
+    detail = serializers.CharField()
+    conflicts = ScheduleConflictSerializer(many=True)
+
+
+class PerformanceBulkScheduleResultSerializer(serializers.Serializer):
+    dry_run = serializers.BooleanField()
+    requested = serializers.IntegerField()
+    created = serializers.IntegerField()
+    performances = ScheduledPerformanceSerializer(many=True)
+    conflicts = ScheduleConflictSerializer(many=True)
+
+
 class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
@@ -109,8 +293,21 @@ class TicketSerializer(serializers.ModelSerializer):
         return data
 
 
+class TicketPerformanceSerializer(PerformanceListSerializer):
+    """
+    Serializes each performance once per response, however many of the
+    listed tickets are for it.
+    """
+
+    def to_representation(self, instance):
+        cache = self.__dict__.setdefault("_representations", {})
+        if instance.pk not in cache:
+            cache[instance.pk] = super().to_representation(instance)
+        return dict(cache[instance.pk])
+
+
 class TicketListSerializer(TicketSerializer):
-    performance = PerformanceListSerializer(many=False, read_only=True)
+    performance = TicketPerformanceSerializer(many=False, read_only=True)
 
 
 class TicketSeatsSerializer(serializers.ModelSerializer):
@@ -128,7 +325,14 @@ class PerformanceRetrieveSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Performance
-        fields = ("id", "show_time", "play", "theatre_hall", "taken_places")
+        fields = (
+            "id",
+            "show_time",
+            "end_time",
+            "play",
+            "theatre_hall",
+            "taken_places",
+        )
 
 
 class ReservationSerializer(serializers.ModelSerializer):
@@ -138,14 +342,232 @@ class ReservationSerializer(serializers.ModelSerializer):
         model = Reservation
         fields = ("id", "tickets", "created_at")
 
+    def validate_tickets(self, tickets):
+        request = self.context.get("request")
+        held = held_for_others(
+            request.user if request else None,
+            [
+                (ticket["performance"].id, ticket["row"], ticket["seat"])
+                for ticket in tickets
+            ],
+        )
+        if held:
+            raise serializers.ValidationError([
+                f"Row {row}, seat {seat} is held for the waitlist of "
+                f"performance {performance_id}."
+                for performance_id, row, seat in held
+            ])
+        return tickets
+
     def create(self, validated_data):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             reservation = Reservation.objects.create(**validated_data)
             for ticket_data in tickets_data:
                 Ticket.objects.create(reservation=reservation, **ticket_data)
+            claim_offers(
+                reservation.user,
+                [ticket["performance"].id for ticket in tickets_data],
+            )
+            send_reservation_confirmation.enqueue(
+                reservation_id=reservation.id
+            )
             return reservation
 
 
 class ReservationListSerializer(ReservationSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+
+class ArchivedPerformanceListSerializer(serializers.ModelSerializer):
+    play_title = serializers.CharField(source="play.title", read_only=True)
+    theatre_hall = serializers.CharField(
+        source="theatre_hall.name", read_only=True
+    )
+
+    class Meta:
+        model = ArchivedPerformance
+        fields = (
+            "id",
+            "show_time",
+            "end_time",
+            "play",
+            "play_title",
+            "theatre_hall",
+            "capacity",
+            "tickets_sold",
+            "reservations",
+            "archived_at",
+        )
+
+
+class ArchivedTicketSeatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedTicket
+        fields = ("row", "seat")
+
+
+class ArchivedPerformanceRetrieveSerializer(
+    ArchivedPerformanceListSerializer
+):
+    taken_places = ArchivedTicketSeatsSerializer(
+        many=True, read_only=True, source="tickets"
+    )
+
+    class Meta(ArchivedPerformanceListSerializer.Meta):
+        fields = ArchivedPerformanceListSerializer.Meta.fields + (
+            "taken_places",
+        )
+
+
+class ArchivedTicketSerializer(serializers.ModelSerializer):
+    performance = ArchivedPerformanceListSerializer(read_only=True)
+
+    class Meta:
+        model = ArchivedTicket
+        fields = (
+            "id", "row", "seat", "reservation_id", "sold_at", "performance"
+        )
+
+
+class AutocompleteMatchSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=("play", "actor"))
+    id = serializers.IntegerField()
+    label = serializers.CharField()
+
+
+class AutocompleteSerializer(serializers.Serializer):
+    version = serializers.CharField()
+    results = AutocompleteMatchSerializer(many=True)
+
+
+class SummaryPerformanceSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    play_id = serializers.IntegerField()
+    play_title = serializers.CharField()
+    show_time = serializers.DateTimeField()
+    theatre_hall = serializers.CharField()
+    tickets = serializers.IntegerField()
+
+
+class SummaryPlaySerializer(serializers.Serializer):
+    play_id = serializers.IntegerField()
+    play_title = serializers.CharField()
+    tickets = serializers.IntegerField()
+    upcoming_tickets = serializers.IntegerField()
+
+
+class ReservationSummarySerializer(serializers.Serializer):
+    upcoming_tickets = serializers.IntegerField()
+    past_tickets = serializers.IntegerField()
+    next_performance = SummaryPerformanceSerializer(allow_null=True)
+    plays = SummaryPlaySerializer(many=True)
+
+
+class SchedulePerformanceSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    show_time = serializers.DateTimeField()
+    theatre_hall_id = serializers.IntegerField()
+    theatre_hall = serializers.CharField()
+    capacity = serializers.IntegerField()
+    seats_left = serializers.IntegerField()
+
+
+class SchedulePlaySerializer(serializers.Serializer):
+    play_id = serializers.IntegerField()
+    play_title = serializers.CharField()
+    performances = SchedulePerformanceSerializer(many=True)
+
+
+class ScheduleDaySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    plays = SchedulePlaySerializer(many=True)
+
+
+class ScheduleSerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    days = ScheduleDaySerializer(many=True)
+
+
+class PerformanceSalesSerializer(serializers.Serializer):
+    performance_id = serializers.IntegerField()
+    date = serializers.DateField()
+    show_time = serializers.DateTimeField()
+    play_id = serializers.IntegerField()
+    play_title = serializers.CharField()
+    theatre_hall_id = serializers.IntegerField()
+    theatre_hall_name = serializers.CharField()
+    capacity = serializers.IntegerField()
+    tickets_sold = serializers.IntegerField()
+    reservations = serializers.IntegerField()
+    occupancy = serializers.FloatField()
+
+
+class PlaySalesDaySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    play_id = serializers.IntegerField()
+    play_title = serializers.CharField()
+    tickets_sold = serializers.IntegerField()
+    reservations = serializers.IntegerField()
+
+
+class HallOccupancyWeekSerializer(serializers.Serializer):
+    week = serializers.DateField()
+    theatre_hall_id = serializers.IntegerField()
+    theatre_hall_name = serializers.CharField()
+    performances = serializers.IntegerField()
+    capacity = serializers.IntegerField()
+    tickets_sold = serializers.IntegerField()
+    occupancy = serializers.FloatField()
+
+
+class SalesReportSerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+
+
+class PerformanceSalesReportSerializer(SalesReportSerializer):
+    results = PerformanceSalesSerializer(many=True)
+
+
+class PlaySalesReportSerializer(SalesReportSerializer):
+    results = PlaySalesDaySerializer(many=True)
+
+
+class HallOccupancyReportSerializer(SalesReportSerializer):
+    results = HallOccupancyWeekSerializer(many=True)
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    position = serializers.SerializerMethodField()
+    held_seats = SeatHoldSerializer(many=True, read_only=True, source="holds")
+
+    class Meta:
+        model = WaitlistEntry
+        fields = (
+            "id",
+            "performance",
+            "seats",
+            "status",
+            "position",
+            "held_seats",
+            "offer_expires_at",
+            "created_at",
+        )
+        read_only_fields = (
+            "performance", "status", "offer_expires_at", "created_at"
+        )
+        extra_kwargs = {
+            "seats": {
+                "min_value": 1, "max_value": settings.WAITLIST_MAX_SEATS
+            },
+        }
+
+    def get_position(self, entry) -> int | None:
+        return position(entry)
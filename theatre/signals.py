@@ -0,0 +1,189 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.db import transaction
+from django.dispatch import receiver
+
+from theatre.analytics import mark_sales_stale
+from theatre.autocomplete import index_update
+from theatre.cancellation import tickets_released
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    PerformanceSchedule,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+from theatre.schedule import mark_schedule_stale, refresh_schedule
+from theatre.search import update_search_vectors
+from theatre.summary import mark_summaries_stale
+from theatre.waitlist import mark_seats_released
+
+SEARCH_FIELDS = {"title", "description"}
+
+
+@receiver(post_save, sender=Play)
+def play_saved(sender, instance, update_fields, **kwargs):
+    if update_fields is None or SEARCH_FIELDS & set(update_fields):
+        update_search_vectors([instance.pk])
+        PerformanceSchedule.objects.filter(play=instance).update(
+            play_title=instance.title
+        )
+        pk, title = instance.pk, instance.title
+        transaction.on_commit(lambda: index_update("play", pk, title))
+
+
+@receiver(post_delete, sender=Play)
+def play_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: index_update("play", pk))
+
+
+@receiver(post_save, sender=Actor)
+def actor_saved(sender, instance, **kwargs):
+    pk, full_name = instance.pk, instance.full_name
+    transaction.on_commit(lambda: index_update("actor", pk, full_name))
+
+
+@receiver(post_delete, sender=Actor)
+def actor_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: index_update("actor", pk))
+
+
+@receiver(post_save, sender=Actor)
+@receiver(post_save, sender=Genre)
+def play_relation_saved(sender, instance, created, **kwargs):
+    if not created:
+        update_search_vectors(instance.plays.values("pk"))
+
+
+@receiver(pre_delete, sender=Actor)
+@receiver(pre_delete, sender=Genre)
+def play_relation_deleting(sender, instance, **kwargs):
+    # The link rows are gone by post_delete, so remember the plays now.
+    instance._search_play_ids = list(
+        instance.plays.values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Actor)
+@receiver(post_delete, sender=Genre)
+def play_relation_deleted(sender, instance, **kwargs):
+    update_search_vectors(instance.__dict__.pop("_search_play_ids", []))
+
+
+@receiver(m2m_changed, sender=Play.actors.through)
+@receiver(m2m_changed, sender=Play.genres.through)
+def play_relations_changed(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action == "pre_clear" and reverse:
+        instance._search_play_ids = list(
+            instance.plays.values_list("pk", flat=True)
+        )
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        play_ids = [instance.pk]
+    elif action == "post_clear":
+        play_ids = instance.__dict__.pop("_search_play_ids", [])
+    else:
+        play_ids = pk_set
+    update_search_vectors(play_ids)
+
+
+@receiver(pre_save, sender=Performance)
+def performance_saving(sender, instance, **kwargs):
+    instance.fill_end_time()
+
+
+@receiver(post_save, sender=Performance)
+def performance_saved(sender, instance, created, **kwargs):
+    mark_schedule_stale([instance.pk])
+    mark_sales_stale([instance.pk])
+    if not created:
+        # Tickets follow the show time into its partition.
+        Ticket.objects.filter(performance=instance).exclude(
+            show_time=instance.show_time
+        ).update(show_time=instance.show_time)
+        # A new show time moves tickets between upcoming and past.
+        mark_summaries_stale(performance_ids=[instance.pk])
+
+
+@receiver(post_delete, sender=Performance)
+def performance_deleted(sender, instance, **kwargs):
+    mark_sales_stale(removed=[instance])
+
+
+@receiver(post_save, sender=TheatreHall)
+def theatre_hall_saved(sender, instance, created, **kwargs):
+    if not created:
+        performance_ids = list(
+            instance.performances.values_list("pk", flat=True)
+        )
+        mark_schedule_stale(performance_ids)
+        mark_sales_stale(performance_ids)
+
+
+@receiver(pre_save, sender=Ticket)
+def ticket_saving(sender, instance, raw, **kwargs):
+    if raw or instance._state.adding:
+        return
+    # A ticket moved to another performance frees a seat in the old one.
+    performance_ids = list(
+        Ticket.objects.filter(pk=instance.pk)
+        .exclude(performance_id=instance.performance_id)
+        .values_list("performance_id", flat=True)
+    )
+    mark_schedule_stale(performance_ids)
+    mark_sales_stale(performance_ids)
+    mark_seats_released(performance_ids)
+
+
+@receiver(post_delete, sender=Ticket)
+def ticket_deleted(sender, instance, **kwargs):
+    mark_seats_released([instance.performance_id])
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def ticket_changed(sender, instance, **kwargs):
+    mark_schedule_stale([instance.performance_id])
+    # The sale day is only known for free when the reservation is loaded,
+    # as it is when tickets are reserved; deleted reservations report
+    # their own day below.
+    sold_at = []
+    if Ticket.reservation.is_cached(instance):
+        sold_at.append(instance.reservation.created_at)
+    mark_sales_stale([instance.performance_id], sold_at)
+    mark_summaries_stale(reservation_ids=[instance.reservation_id])
+
+
+@receiver(post_delete, sender=Reservation)
+def reservation_deleted(sender, instance, **kwargs):
+    mark_sales_stale(sold_at=[instance.created_at])
+    mark_summaries_stale(user_ids=[instance.user_id])
+
+
+@receiver(tickets_released)
+def seats_released(sender, tickets, **kwargs):
+    performance_ids = {ticket.performance_id for ticket in tickets}
+    # Seats left are recounted before the cancellation commits.
+    refresh_schedule(performance_ids)
+    mark_sales_stale(
+        performance_ids, {ticket.sold_at for ticket in tickets}
+    )
+    mark_seats_released(performance_ids)
+    # Reservations left empty were deleted and report their own users.
+    mark_summaries_stale(
+        reservation_ids={ticket.reservation_id for ticket in tickets}
+    )
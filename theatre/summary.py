@@ -0,0 +1,146 @@
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from theatre.models import ArchivedTicket, Reservation, Ticket
+
+_pending = threading.local()
+
+
+def cache_key(user_id: int) -> str:
+    return f"theatre:reservation-summary:{user_id}"
+
+
+def build_summary(user_id: int, now=None) -> dict:
+    """
+    Ticket counts of the user's reservations, split at `now`, with the next
+    performance and totals per play. One query groups the user's tickets
+    by performance, reached through the reservation user and ticket
+    reservation indexes, together with their archived tickets, which are
+    all past; the rest is summed here.
+    """
+    now = now or timezone.now()
+    columns = (
+        "performance_id",
+        "performance__show_time",
+        "performance__play_id",
+        "performance__play__title",
+        "performance__theatre_hall__name",
+    )
+    live = (
+        Ticket.objects.filter(reservation__user_id=user_id)
+        .values(*columns)
+        .annotate(tickets=Count("pk"))
+        .order_by()
+    )
+    archived = (
+        ArchivedTicket.objects.filter(user_id=user_id)
+        .values(*columns)
+        .annotate(tickets=Count("pk"))
+        .order_by()
+    )
+    performances = live.union(archived, all=True).order_by(
+        "performance__show_time", "performance_id"
+    )
+    summary = {
+        "upcoming_tickets": 0,
+        "past_tickets": 0,
+        "next_performance": None,
+        "plays": [],
+    }
+    plays = {}
+    for row in performances:
+        upcoming = row["performance__show_time"] > now
+        play = plays.setdefault(row["performance__play_id"], {
+            "play_id": row["performance__play_id"],
+            "play_title": row["performance__play__title"],
+            "tickets": 0,
+            "upcoming_tickets": 0,
+        })
+        play["tickets"] += row["tickets"]
+        if upcoming:
+            play["upcoming_tickets"] += row["tickets"]
+            summary["upcoming_tickets"] += row["tickets"]
+        else:
+            summary["past_tickets"] += row["tickets"]
+        if upcoming and summary["next_performance"] is None:
+            summary["next_performance"] = {
+                "id": row["performance_id"],
+                "play_id": row["performance__play_id"],
+                "play_title": row["performance__play__title"],
+                "show_time": row["performance__show_time"],
+                "theatre_hall": row["performance__theatre_hall__name"],
+                "tickets": row["tickets"],
+            }
+    summary["plays"] = sorted(
+        plays.values(), key=lambda play: (play["play_title"], play["play_id"])
+    )
+    return summary
+
+
+def reservation_summary(user_id: int) -> dict:
+    """
+    The cached summary, built on a miss. It is kept until the user's
+    reservations change, for at most RESERVATION_SUMMARY_TTL seconds and
+    never past the start of the next performance, when its tickets move
+    from upcoming to past.
+    """
+    key = cache_key(user_id)
+    summary = cache.get(key)
+    if summary is None:
+        now = timezone.now()
+        summary = build_summary(user_id, now)
+        timeout = settings.RESERVATION_SUMMARY_TTL
+        if summary["next_performance"] is not None:
+            starts_in = summary["next_performance"]["show_time"] - now
+            timeout = min(timeout, starts_in / timedelta(seconds=1))
+        cache.set(key, summary, max(1, int(timeout)))
+    return summary
+
+
+def _take_pending() -> dict:
+    pending = getattr(_pending, "marks", None) or {
+        "user_ids": set(), "reservation_ids": set(), "performance_ids": set(),
+    }
+    _pending.marks = {
+        "user_ids": set(), "reservation_ids": set(), "performance_ids": set(),
+    }
+    return pending
+
+
+def _flush_pending() -> None:
+    pending = _take_pending()
+    user_ids = pending["user_ids"]
+    if pending["reservation_ids"] or pending["performance_ids"]:
+        user_ids |= set(
+            Reservation.objects.filter(
+                Q(pk__in=pending["reservation_ids"])
+                | Q(tickets__performance_id__in=pending["performance_ids"])
+            )
+            .order_by()
+            .values_list("user_id", flat=True)
+            .distinct()
+        )
+    if user_ids:
+        cache.delete_many([cache_key(user_id) for user_id in user_ids])
+
+
+def mark_summaries_stale(
+    user_ids=(), reservation_ids=(), performance_ids=()
+) -> None:
+    """
+    Drop the cached summaries of the given users, of the owners of
+    `reservation_ids` and of everyone holding tickets for
+    `performance_ids`, once the current transaction commits.
+    """
+    if getattr(_pending, "marks", None) is None:
+        _take_pending()
+    _pending.marks["user_ids"].update(user_ids)
+    _pending.marks["reservation_ids"].update(reservation_ids)
+    _pending.marks["performance_ids"].update(performance_ids)
+    transaction.on_commit(_flush_pending)
@@ -0,0 +1,90 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.utils import timezone
+
+from theatre.analytics import refresh_sales
+from theatre.images import generate_play_image_variants
+from theatre.jobs import task
+from theatre.models import Reservation, WaitlistEntry
+from theatre.waitlist import offer_seats
+
+
+@task("theatre.play_image_variants", queue="images")
+def build_play_image_variants(play_id: int) -> None:
+    generate_play_image_variants(play_id)
+
+
+@task("theatre.reservation_confirmation", priority=10)
+def send_reservation_confirmation(reservation_id: int) -> None:
+    reservation = (
+        Reservation.objects.select_related("user")
+        .prefetch_related(
+            "tickets__performance__play", "tickets__performance__theatre_hall"
+        )
+        .filter(pk=reservation_id)
+        .first()
+    )
+    if reservation is None:
+        return
+
+    lines = [
+        f"{ticket.performance.play.title}, "
+        f"{ticket.performance.theatre_hall.name}, "
+        f"{ticket.performance.show_time:%Y-%m-%d %H:%M} - "
+        f"row {ticket.row}, seat {ticket.seat}"
+        for ticket in reservation.tickets.all()
+    ]
+    send_mail(
+        subject=f"Reservation #{reservation.id} confirmed",
+        message="Your tickets:\n\n" + "\n".join(lines),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[reservation.user.email],
+    )
+
+
+@task("theatre.refresh_sales")
+def refresh_sales_rollups(
+    performance_ids=(), days=(), hall_weeks=()
+) -> None:
+    refresh_sales(
+        performance_ids,
+        [date.fromisoformat(day) for day in days],
+        [(hall_id, date.fromisoformat(week)) for hall_id, week in hall_weeks],
+    )
+
+
+@task("theatre.offer_waitlist_seats", priority=5)
+def offer_waitlist_seats(performance_id: int) -> None:
+    offer_seats(performance_id)
+
+
+@task("theatre.waitlist_offer", priority=10)
+def send_waitlist_offer(entry_id: int) -> None:
+    entry = (
+        WaitlistEntry.objects.select_related(
+            "user", "performance__play", "performance__theatre_hall"
+        )
+        .filter(pk=entry_id, status=WaitlistEntry.Status.OFFERED)
+        .first()
+    )
+    if entry is None:
+        return
+
+    performance = entry.performance
+    seats = [
+        f"row {hold.row}, seat {hold.seat}" for hold in entry.holds.all()
+    ]
+    send_mail(
+        subject=f"Seats available for {performance.play.title}",
+        message=(
+            f"{performance.play.title}, {performance.theatre_hall.name}, "
+            f"{performance.show_time:%Y-%m-%d %H:%M}\n\n"
+            "These seats are held for you until "
+            f"{timezone.localtime(entry.offer_expires_at):%Y-%m-%d %H:%M}:"
+            "\n\n" + "\n".join(seats)
+        ),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[entry.user.email],
+    )
@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from theatre.admin import EstimatedCountPaginator
+from theatre.models import Reservation, Ticket
+from theatre.tests.tests_api.test_helpers import (
+    create_performance,
+    create_theatre_hall,
+)
+
+TICKETS_URL = reverse("admin:theatre_ticket_changelist")
+
+
+class AdminTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "password"
+        )
+        self.client.force_login(self.admin)
+        self.reservation = Reservation.objects.create(user=self.admin)
+        self.performances = [
+            create_performance(
+                theatre_hall=create_theatre_hall(rows=1, seats_in_row=3),
+                show_time=f"2025-07-{day} 19:00:00",
+            )
+            for day in (10, 11, 12)
+        ]
+
+    def reserve(self, performances):
+        for performance in performances:
+            for seat in (1, 2, 3):
+                Ticket.objects.create(
+                    reservation=self.reservation,
+                    row=1,
+                    seat=seat,
+                    performance=performance,
+                )
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(TICKETS_URL)
+        self.assertEqual(response.status_code, 200)
+        return [query["sql"] for query in queries]
+
+    def test_ticket_changelist_queries_do_not_grow(self):
+        self.reserve(self.performances[:1])
+        few = self.changelist_queries()
+
+        self.reserve(self.performances[1:])
+
+        self.assertEqual(len(self.changelist_queries()), len(few))
+
+    def test_estimated_count(self):
+        self.reserve(self.performances)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE theatre_ticket")
+
+        paginator = EstimatedCountPaginator(Ticket.objects.all(), 100)
+        self.assertEqual(paginator.count, 9)
+
+        with override_settings(ADMIN_EXACT_COUNT_LIMIT=0):
+            paginator = EstimatedCountPaginator(Ticket.objects.all(), 100)
+            self.assertGreater(paginator.count, 0)
+            queries = self.changelist_queries()
+        self.assertFalse([sql for sql in queries if "COUNT(*)" in sql])
+
+    def test_ticket_date_filter(self):
+        self.reserve(self.performances)
+
+        response = self.client.get(TICKETS_URL, {
+            "show_time__gte": "2025-07-11",
+            "show_time__lt": "2025-07-12",
+        })
+
+        self.assertEqual(
+            {ticket.performance for ticket in response.context["cl"].result_list},
+            {self.performances[1]},
+        )
+
+    @override_settings(ADMIN_TICKETS_PER_PAGE=4)
+    def test_reservation_ticket_inline_is_paginated(self):
+        self.reserve(self.performances)
+        url = reverse(
+            "admin:theatre_reservation_change", args=[self.reservation.id]
+        )
+
+        response = self.client.get(url, {"tickets_page": 3})
+
+        formset = response.context["inline_admin_formsets"][0].formset
+        self.assertEqual(
+            [(ticket.performance, ticket.seat) for ticket in (
+                form.instance for form in formset.forms
+            )],
+            [(self.performances[2], 3)],
+        )
+        self.assertContains(response, "9 tickets")
+        self.assertFalse(formset.can_delete)
+        self.assertEqual(formset.extra, 0)
@@ -0,0 +1,251 @@
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.models import (
+    HallOccupancyWeek,
+    Job,
+    PerformanceSales,
+    PlaySalesDay,
+    Reservation,
+    Ticket,
+)
+from theatre.analytics import performance_report
+from theatre.scheduling import bulk_schedule, recurrence
+from theatre.tasks import refresh_sales_rollups
+from theatre.tests.tests_api.test_helpers import (
+    create_performance,
+    create_play,
+    create_theatre_hall,
+)
+
+PERFORMANCES_URL = reverse("theatre:analytics-performances")
+PLAYS_URL = reverse("theatre:analytics-plays")
+HALLS_URL = reverse("theatre:analytics-halls")
+
+
+def rollups():
+    return {
+        "performances": list(PerformanceSales.objects.values_list(
+            "performance_id", "date", "week", "capacity", "tickets_sold",
+            "reservations",
+        )),
+        "plays": list(PlaySalesDay.objects.values_list(
+            "date", "play_id", "tickets_sold", "reservations"
+        )),
+        "halls": list(HallOccupancyWeek.objects.values_list(
+            "week", "theatre_hall_id", "performances", "capacity",
+            "tickets_sold",
+        )),
+    }
+
+
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.hall = create_theatre_hall(rows=10, seats_in_row=10)
+        self.play = create_play(title="Hamlet")
+        # Thursday and Saturday of one week.
+        self.thursday = create_performance(
+            play=self.play,
+            theatre_hall=self.hall,
+            show_time="2025-07-03 19:00:00",
+        )
+        self.saturday = create_performance(
+            play=self.play,
+            theatre_hall=self.hall,
+            show_time="2025-07-05 19:00:00",
+        )
+
+    def run_refresh_jobs(self):
+        for job in Job.objects.filter(
+            name="theatre.refresh_sales", status=Job.Status.QUEUED
+        ):
+            refresh_sales_rollups(**job.payload)
+            job.status = Job.Status.DONE
+            job.save()
+
+    def reserve(self, performance, seats, sold_at=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation = Reservation.objects.create(user=self.user)
+            if sold_at is not None:
+                reservation.created_at = sold_at
+                reservation.save()
+            for seat in seats:
+                Ticket.objects.create(
+                    reservation=reservation,
+                    row=1,
+                    seat=seat,
+                    performance=performance,
+                )
+        self.run_refresh_jobs()
+        return reservation
+
+    def test_reservations_update_every_rollup(self):
+        sold_at = make_aware(datetime(2025, 6, 20, 12))
+        self.reserve(self.thursday, [1, 2, 3], sold_at)
+        self.reserve(self.saturday, [1], sold_at)
+
+        # One refresh per committed reservation.
+        self.assertEqual(
+            Job.objects.filter(name="theatre.refresh_sales").count(), 2
+        )
+        self.assertEqual(rollups(), {
+            "performances": [
+                (self.thursday.id, date(2025, 7, 3), date(2025, 6, 30),
+                 100, 3, 1),
+                (self.saturday.id, date(2025, 7, 5), date(2025, 6, 30),
+                 100, 1, 1),
+            ],
+            "plays": [(date(2025, 6, 20), self.play.id, 4, 2)],
+            "halls": [(date(2025, 6, 30), self.hall.id, 2, 200, 4)],
+        })
+
+    def test_moved_and_deleted_rows_are_recounted(self):
+        sold_at = make_aware(datetime(2025, 6, 20, 12))
+        reservation = self.reserve(self.thursday, [1, 2], sold_at)
+        self.reserve(self.saturday, [1], sold_at)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.saturday.show_time = make_aware(datetime(2025, 7, 8, 19))
+            self.saturday.save()
+            reservation.delete()
+        self.run_refresh_jobs()
+
+        self.assertEqual(rollups()["plays"], [
+            (date(2025, 6, 20), self.play.id, 1, 1)
+        ])
+        self.assertEqual(rollups()["halls"], [
+            (date(2025, 6, 30), self.hall.id, 1, 100, 0),
+            (date(2025, 7, 7), self.hall.id, 1, 100, 1),
+        ])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.thursday.delete()
+        self.run_refresh_jobs()
+        self.assertEqual(rollups()["halls"], [
+            (date(2025, 7, 7), self.hall.id, 1, 100, 1),
+        ])
+
+    def test_bulk_scheduled_performances_are_reported(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = bulk_schedule(
+                self.play,
+                self.hall,
+                recurrence(
+                    date(2025, 7, 7), date(2025, 7, 8), range(7), [time(19)]
+                ),
+                timedelta(hours=3),
+            )
+        self.run_refresh_jobs()
+
+        report = performance_report(date(2025, 7, 7), date(2025, 7, 8))
+        self.assertEqual(
+            [row["performance_id"] for row in report],
+            [performance["id"] for performance in result["performances"]],
+        )
+        self.assertEqual(report[0]["capacity"], 100)
+        self.assertEqual(report[0]["tickets_sold"], 0)
+
+    def test_rebuild_matches_incremental(self):
+        self.reserve(self.thursday, [1, 2, 3])
+        self.reserve(self.saturday, [4, 5])
+        expected = rollups()
+        for model in (PerformanceSales, PlaySalesDay, HallOccupancyWeek):
+            model.objects.all().delete()
+
+        call_command("refresh_sales", stdout=StringIO())
+
+        self.assertEqual(rollups(), expected)
+
+
+class SalesAnalyticsApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "password"
+        )
+        self.client.force_authenticate(self.admin)
+        self.performance = create_performance(
+            show_time="2025-07-03 19:00:00"
+        )
+        reservation = Reservation.objects.create(user=self.admin)
+        for seat in (1, 2):
+            Ticket.objects.create(
+                reservation=reservation,
+                row=1,
+                seat=seat,
+                performance=self.performance,
+            )
+        Reservation.objects.filter(pk=reservation.pk).update(
+            created_at=make_aware(datetime(2025, 7, 1, 9))
+        )
+        call_command("refresh_sales", stdout=StringIO())
+        self.range = {"from": "2025-07-01", "to": "2025-07-31"}
+
+    def test_performances(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(PERFORMANCES_URL, self.range)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row = response.data["results"][0]
+        self.assertEqual(row["performance_id"], self.performance.id)
+        self.assertEqual(row["play_title"], "Sample Play")
+        self.assertEqual(row["tickets_sold"], 2)
+        self.assertEqual(row["occupancy"], 0.005)
+
+    def test_plays(self):
+        response = self.client.get(PLAYS_URL, self.range)
+
+        self.assertEqual(response.data["results"], [{
+            "date": date(2025, 7, 1),
+            "play_id": self.performance.play_id,
+            "tickets_sold": 2,
+            "reservations": 1,
+            "play_title": "Sample Play",
+        }])
+        response = self.client.get(
+            PLAYS_URL, {**self.range, "play": self.performance.play_id + 1}
+        )
+        self.assertEqual(response.data["results"], [])
+
+    def test_halls(self):
+        response = self.client.get(HALLS_URL, self.range)
+
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(
+            response.data["results"][0]["week"], date(2025, 6, 30)
+        )
+        self.assertEqual(response.data["results"][0]["performances"], 1)
+
+    def test_invalid_range(self):
+        for params in (
+            {"from": "2025-07-31", "to": "2025-07-01"},
+            {"from": "2024-01-01", "to": "2025-07-01"},
+            {"play": "hamlet"},
+        ):
+            response = self.client.get(PLAYS_URL, params)
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+
+    def test_admin_required(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="user@test.com", password="test_password"
+            )
+        )
+
+        for url in (PERFORMANCES_URL, PLAYS_URL, HALLS_URL):
+            response = client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,201 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.analytics import performance_report, refresh_sales
+from theatre.archive import archive_performances
+from theatre.models import (
+    ArchivedPerformance,
+    ArchivedTicket,
+    HallOccupancyWeek,
+    Performance,
+    PerformanceSales,
+    PlaySalesDay,
+    Reservation,
+    Ticket,
+)
+from theatre.summary import build_summary
+from theatre.tests.tests_api.test_helpers import (
+    create_performance,
+    create_play,
+    create_theatre_hall,
+)
+
+ARCHIVE_URL = reverse("theatre:archived-performance-list")
+ARCHIVED_TICKETS_URL = reverse("theatre:reservation-archived")
+
+
+def rollups():
+    return (
+        sorted(PlaySalesDay.objects.values_list(
+            "date", "play_id", "tickets_sold", "reservations"
+        )),
+        sorted(HallOccupancyWeek.objects.values_list(
+            "week", "theatre_hall_id", "performances", "capacity",
+            "tickets_sold",
+        )),
+    )
+
+
+class ArchivePerformancesTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.play = create_play(title="Hamlet")
+        self.hall = create_theatre_hall(rows=2, seats_in_row=2)
+        now = timezone.now()
+        self.old, self.older = [
+            create_performance(
+                play=self.play,
+                theatre_hall=self.hall,
+                show_time=now - timedelta(days=days),
+            )
+            for days in (400, 401)
+        ]
+        self.live = create_performance(
+            play=self.play,
+            theatre_hall=self.hall,
+            show_time=now + timedelta(days=7),
+        )
+        # One reservation spans an old and the live performance.
+        self.mixed = self.reserve((self.old, 1), (self.live, 1))
+        self.reserve((self.old, 2), (self.older, 1))
+        self.before = now - timedelta(days=365)
+
+    def reserve(self, *seats):
+        reservation = Reservation.objects.create(user=self.user)
+        for performance, seat in seats:
+            Ticket.objects.create(
+                reservation=reservation,
+                row=1,
+                seat=seat,
+                performance=performance,
+            )
+        return reservation
+
+    def test_archive_in_batches(self):
+        progress = []
+
+        archived = archive_performances(self.before, 1, progress.append)
+
+        self.assertEqual(archived, 2)
+        self.assertEqual(progress, [1, 2])
+        self.assertEqual(list(Performance.objects.all()), [self.live])
+        self.assertEqual(
+            list(Ticket.objects.values_list("performance_id", flat=True)),
+            [self.live.id],
+        )
+        # The reservation left empty is gone, the mixed one stays.
+        self.assertEqual(list(Reservation.objects.all()), [self.mixed])
+        self.assertEqual(
+            PerformanceSales.objects.filter(
+                performance_id=self.old.id
+            ).count(),
+            0,
+        )
+
+        summary = ArchivedPerformance.objects.get(pk=self.old.id)
+        self.assertEqual(summary.show_time, self.old.show_time)
+        self.assertEqual(summary.capacity, 4)
+        self.assertEqual(summary.tickets_sold, 2)
+        self.assertEqual(summary.reservations, 2)
+        self.assertEqual(
+            sorted(ArchivedTicket.objects.values_list(
+                "performance_id", "seat", "user_id"
+            )),
+            sorted([
+                (self.older.id, 1, self.user.id),
+                (self.old.id, 1, self.user.id),
+                (self.old.id, 2, self.user.id),
+            ]),
+        )
+
+    def test_sales_totals_survive_archival(self):
+        refresh_sales([self.old.id, self.older.id, self.live.id])
+        today = timezone.localdate()
+        refresh_sales(days=[today])
+        report = performance_report(
+            today - timedelta(days=402), today + timedelta(days=8)
+        )
+        before = rollups()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            archive_performances(self.before, 10)
+        # Recounting the days and weeks reads the archive too.
+        refresh_sales(
+            days=[today],
+            hall_weeks=HallOccupancyWeek.objects.values_list(
+                "theatre_hall_id", "week"
+            ),
+        )
+
+        self.assertEqual(rollups(), before)
+        self.assertEqual(
+            performance_report(
+                today - timedelta(days=402), today + timedelta(days=8)
+            ),
+            report,
+        )
+
+    def test_summary_counts_archived_tickets(self):
+        before = build_summary(self.user.id)
+
+        archive_performances(self.before, 10)
+
+        self.assertEqual(build_summary(self.user.id), before)
+
+    def test_archived_api(self):
+        archive_performances(self.before, 10)
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get(ARCHIVE_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]],
+            [self.old.id, self.older.id],
+        )
+        self.assertEqual(response.data["results"][0]["tickets_sold"], 2)
+
+        date = timezone.localtime(self.older.show_time).date()
+        response = client.get(ARCHIVE_URL, {"date": date.isoformat()})
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]], [self.older.id]
+        )
+
+        response = client.get(
+            reverse(
+                "theatre:archived-performance-detail", args=[self.old.id]
+            )
+        )
+        self.assertEqual(
+            response.data["taken_places"],
+            [{"row": 1, "seat": 1}, {"row": 1, "seat": 2}],
+        )
+
+        response = client.get(ARCHIVED_TICKETS_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(
+            response.data["results"][0]["performance"]["play_title"],
+            "Hamlet",
+        )
+
+    def test_command(self):
+        out = StringIO()
+
+        call_command(
+            "archive_performances", "--days", "365", "--batch-size", "1",
+            stdout=out,
+        )
+
+        self.assertIn("Archived 2 performances", out.getvalue())
+        self.assertEqual(ArchivedPerformance.objects.count(), 2)
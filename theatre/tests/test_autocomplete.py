@@ -0,0 +1,225 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre import autocomplete
+from theatre.autocomplete import PrefixIndex
+from theatre.tests.tests_api.test_helpers import create_actor, create_play
+
+AUTOCOMPLETE_URL = reverse("theatre:autocomplete-list")
+
+
+def labels(results):
+    return [result["label"] for result in results]
+
+
+def drop_index():
+    # Waits for a build another test may have started in the background.
+    with autocomplete._index_lock:
+        autocomplete._index = None
+        autocomplete._built_at = None
+
+
+class PrefixIndexTests(TestCase):
+    def setUp(self):
+        self.index = PrefixIndex()
+        self.index.add("play", 1, "Hamlet")
+        self.index.add("play", 2, "The Hamster Opera")
+        self.index.add("play", 3, "Macbeth")
+        self.index.add("actor", 1, "Olena Hamzić")
+
+    def test_prefix_of_any_word(self):
+        self.assertEqual(
+            labels(self.index.search("ham")),
+            ["Hamlet", "The Hamster Opera", "Olena Hamzić"],
+        )
+        self.assertEqual(
+            labels(self.index.search("OPE")), ["The Hamster Opera"]
+        )
+
+    def test_every_term_must_match(self):
+        self.assertEqual(
+            labels(self.index.search("the ham")), ["The Hamster Opera"]
+        )
+        self.assertEqual(
+            labels(self.index.search("hamz olena")), ["Olena Hamzić"]
+        )
+        self.assertEqual(self.index.search("ham macb"), [])
+
+    def test_accents_are_folded(self):
+        self.assertEqual(
+            labels(self.index.search("hamzic")), ["Olena Hamzić"]
+        )
+
+    def test_limit(self):
+        self.assertEqual(len(self.index.search("ham", limit=2)), 2)
+
+    def test_update_and_remove(self):
+        self.index.add("play", 1, "King Lear")
+        self.index.remove("play", 3)
+
+        self.assertEqual(labels(self.index.search("ham")), [
+            "The Hamster Opera", "Olena Hamzić",
+        ])
+        self.assertEqual(labels(self.index.search("lear")), ["King Lear"])
+        self.assertEqual(self.index.search("macbeth"), [])
+        self.assertEqual(len(self.index), 3)
+
+    def test_version_is_independent_of_build_order(self):
+        other = PrefixIndex()
+        other.add("actor", 1, "Olena Hamzić")
+        other.add("play", 3, "Macbeth")
+        other.add("play", 2, "The Hamster Opera")
+        other.add("play", 1, "Hamlet")
+        self.assertEqual(other.version, self.index.version)
+
+        other.add("play", 1, "Hamlet II")
+        self.assertNotEqual(other.version, self.index.version)
+        other.add("play", 1, "Hamlet")
+        self.assertEqual(other.version, self.index.version)
+
+    def test_bulk_build_matches_incremental(self):
+        built = PrefixIndex.from_entries([
+            ("play", 1, "Hamlet"),
+            ("play", 2, "The Hamster Opera"),
+            ("play", 3, "Macbeth"),
+            ("actor", 1, "Olena Hamzić"),
+        ])
+
+        self.assertEqual(built.version, self.index.version)
+        self.assertEqual(built.search("ham"), self.index.search("ham"))
+
+
+@override_settings(AUTOCOMPLETE_REBUILD_INTERVAL=300)
+class AutocompleteApiTests(TestCase):
+    def setUp(self):
+        drop_index()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="user@test.com", password="test_password"
+            )
+        )
+        self.play = create_play(title="Hamlet")
+        create_actor(first_name="Olena", last_name="Hamzić")
+
+    def tearDown(self):
+        drop_index()
+
+    def test_autocomplete(self):
+        response = self.client.get(AUTOCOMPLETE_URL, {"q": "ham"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [
+            {"type": "play", "id": self.play.id, "label": "Hamlet"},
+            {
+                "type": "actor",
+                "id": response.data["results"][1]["id"],
+                "label": "Olena Hamzić",
+            },
+        ])
+        self.assertEqual(
+            response.data["version"], autocomplete.build_index().version
+        )
+
+    def test_index_follows_committed_changes(self):
+        self.client.get(AUTOCOMPLETE_URL, {"q": "ham"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.play.title = "Macbeth"
+            self.play.save()
+            create_play(title="Hamletmachine")
+
+        response = self.client.get(AUTOCOMPLETE_URL, {"q": "ham"})
+        self.assertEqual(
+            labels(response.data["results"]),
+            ["Hamletmachine", "Olena Hamzić"],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.play.delete()
+        response = self.client.get(AUTOCOMPLETE_URL, {"q": "macb"})
+        self.assertEqual(response.data["results"], [])
+        self.assertEqual(
+            response.data["version"], autocomplete.build_index().version
+        )
+
+    def test_auth_required(self):
+        response = APIClient().get(AUTOCOMPLETE_URL, {"q": "ham"})
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(AUTOCOMPLETE_REBUILD_INTERVAL=300)
+class AutocompleteRebuildTests(TransactionTestCase):
+    def setUp(self):
+        drop_index()
+        self.addCleanup(drop_index)
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="user@test.com", password="test_password"
+            )
+        )
+        create_play(title="Hamlet")
+
+        # The background build reads the rows, then waits for `release`.
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+        build_index = autocomplete.build_index
+
+        def held_build():
+            index = build_index()
+            self.started.set()
+            self.release.wait(5)
+            return index
+
+        patcher = mock.patch.object(
+            autocomplete, "build_index", side_effect=held_build
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def finish_build(self):
+        self.release.set()
+        with autocomplete._index_lock:
+            pass
+
+    def test_first_request_starts_build_without_waiting(self):
+        autocomplete.connect_warm_up()
+
+        response = self.client.get(reverse("theatre:genre-list"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.started.wait(5))
+        self.assertIsNone(autocomplete._index)
+        self.finish_build()
+        self.assertEqual(
+            labels(autocomplete._index.search("ham")), ["Hamlet"]
+        )
+
+    def test_previous_index_is_served_during_rebuild(self):
+        self.release.set()
+        index = autocomplete.get_index()
+        self.started.clear()
+        self.release.clear()
+        autocomplete.reset_index()
+
+        self.assertIs(autocomplete.get_index(), index)
+        self.assertTrue(self.started.wait(5))
+        # Committed after the rebuild read the rows.
+        create_play(title="Hamletmachine")
+        self.assertIs(autocomplete.get_index(), index)
+        self.finish_build()
+
+        self.assertIsNot(autocomplete.get_index(), index)
+        self.assertEqual(
+            labels(autocomplete.get_index().search("ham")),
+            ["Hamlet", "Hamletmachine"],
+        )
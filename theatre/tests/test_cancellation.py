@@ -0,0 +1,168 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.cancellation import tickets_released
+from theatre.models import (
+    Job,
+    PerformanceSchedule,
+    Reservation,
+    Ticket,
+    WaitlistEntry,
+)
+from theatre.tests.tests_api.test_helpers import (
+    create_performance,
+    create_theatre_hall,
+)
+
+
+def cancel_url(reservation_id):
+    return reverse("theatre:reservation-cancel", args=[reservation_id])
+
+
+def cancel_ticket_url(reservation_id, ticket_id):
+    return reverse(
+        "theatre:reservation-cancel-ticket", args=[reservation_id, ticket_id]
+    )
+
+
+class CancellationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = create_performance(
+            theatre_hall=create_theatre_hall(rows=1, seats_in_row=3),
+            show_time=timezone.now() + timedelta(days=7),
+        )
+        self.reservation = self.reserve(self.user, (1, 2))
+
+    def reserve(self, user, seats):
+        reservation = Reservation.objects.create(user=user)
+        for seat in seats:
+            Ticket.objects.create(
+                reservation=reservation,
+                row=1,
+                seat=seat,
+                performance=self.performance,
+            )
+        return reservation
+
+    def seats_left(self):
+        return PerformanceSchedule.objects.get(
+            performance=self.performance
+        ).seats_left
+
+    def test_cancel_reservation(self):
+        released = []
+        tickets_released.connect(
+            lambda sender, tickets, **kwargs: released.extend(tickets),
+            weak=False,
+            dispatch_uid="test_cancel_reservation",
+        )
+        self.addCleanup(
+            tickets_released.disconnect,
+            dispatch_uid="test_cancel_reservation",
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(cancel_url(self.reservation.id))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Reservation.objects.exists())
+        self.assertEqual(
+            sorted((ticket.row, ticket.seat) for ticket in released),
+            [(1, 1), (1, 2)],
+        )
+        self.assertEqual(released[0].sold_at, self.reservation.created_at)
+        ticket_deletes = [
+            query["sql"] for query in queries
+            if query["sql"].startswith('DELETE FROM "theatre_ticket"')
+        ]
+        self.assertEqual(len(ticket_deletes), 1)
+        self.assertEqual(self.seats_left(), 3)
+        self.assertTrue(
+            Job.objects.filter(name="theatre.refresh_sales").exists()
+        )
+
+    def test_cancel_ticket(self):
+        first, second = self.reservation.tickets.order_by("seat")
+
+        response = self.client.post(
+            cancel_ticket_url(self.reservation.id, first.id)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            list(self.reservation.tickets.all()), [second]
+        )
+        self.assertEqual(self.seats_left(), 2)
+
+        self.client.post(cancel_ticket_url(self.reservation.id, second.id))
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_released_seats_go_to_waitlist(self):
+        other = get_user_model().objects.create_user(
+            email="other@test.com", password="test_password"
+        )
+        WaitlistEntry.objects.create(performance=self.performance, user=other)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(cancel_url(self.reservation.id))
+
+        self.assertEqual(
+            Job.objects.get(name="theatre.offer_waitlist_seats").payload,
+            {"performance_id": self.performance.id},
+        )
+
+    def test_cannot_cancel_others_or_started(self):
+        other = get_user_model().objects.create_user(
+            email="other@test.com", password="test_password"
+        )
+        others = self.reserve(other, (3,))
+        response = self.client.post(cancel_url(others.id))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.performance.show_time = timezone.now() - timedelta(minutes=5)
+        self.performance.save()
+        response = self.client.post(cancel_url(self.reservation.id))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Ticket.objects.count(), 3)
+
+    def test_admin_cancels_performance_reservations(self):
+        admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "password"
+        )
+        self.reserve(admin, (3,))
+        kept = create_performance()
+        Ticket.objects.create(
+            reservation=self.reservation, row=1, seat=1, performance=kept
+        )
+        self.client.force_login(admin)
+
+        response = self.client.post(
+            reverse("admin:theatre_performance_changelist"),
+            {
+                "action": "cancel_reservations",
+                "_selected_action": [self.performance.id],
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(
+            list(Ticket.objects.values_list("performance_id", flat=True)),
+            [kept.id],
+        )
+        self.assertEqual(
+            list(Reservation.objects.all()), [self.reservation]
+        )
@@ -0,0 +1,166 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from theatre.catalog import import_catalog
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    PerformanceSchedule,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+from theatre.search import search_plays
+from theatre.tests.tests_api.test_helpers import (
+    create_actor,
+    create_genre,
+    create_performance,
+    create_play,
+    create_theatre_hall,
+    create_ticket,
+)
+
+MODELS = (Ticket, Reservation, Performance, Play, Actor, Genre, TheatreHall)
+
+
+def snapshot():
+    return {
+        "halls": list(TheatreHall.objects.values_list(
+            "id", "name", "rows", "seats_in_row"
+        )),
+        "plays": list(Play.objects.values_list("id", "title", "description")),
+        "play_actors": sorted(
+            Play.actors.through.objects.values_list("play_id", "actor_id")
+        ),
+        "play_genres": sorted(
+            Play.genres.through.objects.values_list("play_id", "genre_id")
+        ),
+        "performances": sorted(Performance.objects.values_list(
+            "id", "play_id", "theatre_hall_id", "show_time", "end_time"
+        )),
+        "reservations": list(Reservation.objects.values_list(
+            "id", "user_id", "created_at"
+        )),
+        "tickets": list(Ticket.objects.values_list(
+            "id", "performance_id", "reservation_id", "row", "seat"
+        )),
+    }
+
+
+def clear_catalog():
+    for model in MODELS:
+        model.objects.all().delete()
+
+
+class CatalogTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        play = create_play(title="Hamlet", description="A play, with commas")
+        play.actors.add(create_actor(first_name="Olena"), create_actor())
+        play.genres.add(create_genre(name="Tragedy"))
+        create_performance(
+            play=play,
+            theatre_hall=create_theatre_hall(name="Main Hall"),
+            show_time="2025-07-04 19:00:00",
+        )
+        reservation = Reservation.objects.create(user=self.user)
+        create_ticket(reservation, row=2, seat=3)
+        create_ticket(reservation, row=4, seat=5)
+        self.before = snapshot()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def round_trip(self, path, fmt):
+        call_command("export_catalog", path, format=fmt, stdout=StringIO())
+        clear_catalog()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("import_catalog", path, stdout=StringIO())
+
+        self.assertEqual(snapshot(), self.before)
+        self.assertFalse(os.path.exists(f"{path}.checkpoint"))
+
+    def test_jsonl_round_trip(self):
+        self.round_trip(self.path("catalog.jsonl"), "jsonl")
+
+    def test_csv_round_trip(self):
+        self.round_trip(self.path("catalog"), "csv")
+        self.assertTrue(os.path.exists(self.path("catalog/play.csv")))
+
+    def test_derived_data_is_rebuilt(self):
+        path = self.path("catalog.jsonl")
+        call_command("export_catalog", path, stdout=StringIO())
+        clear_catalog()
+        import_catalog(path)
+
+        self.assertEqual(
+            [
+                play.title
+                for play in search_plays(Play.objects.all(), "olena tragedy")
+            ],
+            ["Hamlet"],
+        )
+        self.assertEqual(
+            list(
+                PerformanceSchedule.objects.order_by(
+                    "performance_id"
+                ).values_list("seats_left", flat=True)
+            ),
+            [400, 399, 399],
+        )
+        play = Play.objects.create(title="Macbeth", description="New")
+        self.assertGreater(play.id, self.before["plays"][0][0])
+
+    def test_resume_from_checkpoint(self):
+        path = self.path("catalog.jsonl")
+        call_command("export_catalog", path, stdout=StringIO())
+        clear_catalog()
+
+        def crash_after_play(name, read, skipped):
+            if name == "play":
+                raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            import_catalog(path, batch_size=1, progress=crash_after_play)
+
+        with open(f"{path}.checkpoint") as checkpoint:
+            self.assertIn("catalog.jsonl", json.load(checkpoint)["offsets"])
+        self.assertEqual(Play.objects.count(), 1)
+        self.assertEqual(Performance.objects.count(), 0)
+
+        resumed = []
+        import_catalog(
+            path,
+            batch_size=1,
+            progress=lambda name, read, skipped: resumed.append(name),
+        )
+
+        # The three plays left, then everything after them.
+        self.assertEqual(resumed[:4], ["play"] * 3 + ["performance"])
+        self.assertEqual(snapshot(), self.before)
+
+    def test_rerun_and_dangling_records_are_skipped(self):
+        path = self.path("catalog.jsonl")
+        call_command("export_catalog", path, stdout=StringIO())
+        with open(path, "a") as catalog:
+            catalog.write(json.dumps({
+                "type": "ticket", "id": 999, "performance": 999,
+                "reservation": 1, "row": 1, "seat": 1,
+            }) + "\n")
+
+        stats = import_catalog(path)
+
+        self.assertEqual(stats["ticket"], (3, 1))
+        self.assertEqual(snapshot(), self.before)
@@ -0,0 +1,152 @@
+import gzip
+import tempfile
+from unittest import skipIf
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from theatre.compression import (
+    brotli,
+    negotiate_encoding,
+    serve_precompressed,
+)
+from theatre.tests.tests_api.test_helpers import create_genre
+
+GENRE_URL = reverse("theatre:genre-list")
+
+
+class NegotiateEncodingTests(TestCase):
+    def test_prefers_first_available_encoding(self):
+        self.assertEqual(negotiate_encoding("gzip, br", ("br", "gzip")), "br")
+
+    def test_respects_q_values(self):
+        self.assertEqual(
+            negotiate_encoding("br;q=0.5, gzip", ("br", "gzip")), "gzip"
+        )
+        self.assertIsNone(negotiate_encoding("gzip;q=0", ("gzip",)))
+
+    def test_wildcard(self):
+        self.assertEqual(negotiate_encoding("*", ("gzip",)), "gzip")
+        self.assertIsNone(negotiate_encoding("", ("gzip",)))
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1024)
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.client.force_authenticate(self.user)
+        for index in range(60):
+            create_genre(name=f"Genre number {index}")
+
+    def test_large_json_is_compressed(self):
+        response = self.client.get(
+            GENRE_URL, {"limit": 60}, HTTP_ACCEPT_ENCODING="gzip"
+        )
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertIn(b"Genre number 59", gzip.decompress(response.content))
+
+    def test_html_is_not_compressed(self):
+        response = self.client.get(
+            GENRE_URL,
+            {"limit": 60},
+            HTTP_ACCEPT="text/html",
+            HTTP_ACCEPT_ENCODING="gzip, br",
+        )
+
+        self.assertTrue(response["Content-Type"].startswith("text/html"))
+        self.assertGreater(len(response.content), 1024)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertIn(b"csrfToken", response.content)
+
+    def test_small_json_is_not_compressed(self):
+        response = self.client.get(
+            GENRE_URL, {"limit": 2}, HTTP_ACCEPT_ENCODING="gzip"
+        )
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_not_compressed_without_accept_encoding(self):
+        response = self.client.get(GENRE_URL, {"limit": 60})
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+
+class PrecompressedStaticTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.directory.name)
+        self.asset = self.root / "schema.json"
+        self.asset.write_text('{"openapi": "3.0.3"}' * 200)
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_compress_static_command(self):
+        (self.root / "tiny.json").write_text("{}")
+        with override_settings(PRECOMPRESS_DIRS=[self.root]):
+            call_command("compress_static", stdout=StringIO())
+
+        self.assertTrue((self.root / "schema.json.gz").exists())
+        self.assertFalse((self.root / "tiny.json.gz").exists())
+        self.assertEqual(
+            gzip.decompress((self.root / "schema.json.gz").read_bytes()),
+            self.asset.read_bytes(),
+        )
+
+    def test_serves_precompressed_variant(self):
+        with override_settings(PRECOMPRESS_DIRS=[self.root]):
+            call_command("compress_static", stdout=StringIO())
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip")
+        response = serve_precompressed(
+            request, "schema.json", document_root=self.root
+        )
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(
+            gzip.decompress(b"".join(response.streaming_content)),
+            self.asset.read_bytes(),
+        )
+        response.close()
+
+    def test_serves_original_without_variant(self):
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip")
+        response = serve_precompressed(
+            request, "schema.json", document_root=self.root
+        )
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(
+            b"".join(response.streaming_content), self.asset.read_bytes()
+        )
+        response.close()
+
+    @skipIf(brotli is None, "brotli is not installed")
+    def test_static_url_serves_brotli_variant(self):
+        with override_settings(
+            PRECOMPRESS_DIRS=[self.root], STATIC_ROOT=self.root
+        ):
+            call_command("compress_static", stdout=StringIO())
+            response = self.client.get(
+                "/static/schema.json", HTTP_ACCEPT_ENCODING="br, gzip"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(
+            brotli.decompress(b"".join(response.streaming_content)),
+            self.asset.read_bytes(),
+        )
+        response.close()
@@ -0,0 +1,128 @@
+import csv
+import json
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.models import Reservation
+from theatre.tests.tests_api.test_helpers import (
+    create_performance,
+    create_ticket,
+)
+
+TICKETS_URL = reverse("theatre:export-tickets")
+RESERVATIONS_URL = reverse("theatre:export-reservations")
+
+
+def body(response):
+    return b"".join(response.streaming_content).decode()
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class SalesExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "password"
+        )
+        self.client.force_authenticate(self.admin)
+        self.performance = create_performance()
+        self.july = Reservation.objects.create(user=self.admin)
+        for seat in (1, 2, 3):
+            create_ticket(
+                self.july, row=1, seat=seat, performance=self.performance
+            )
+        self.august = Reservation.objects.create(user=self.admin)
+        self.other_ticket = create_ticket(self.august, row=5, seat=5)
+        Reservation.objects.filter(pk=self.july.pk).update(
+            created_at=make_aware(datetime(2025, 7, 31, 23, 59))
+        )
+        Reservation.objects.filter(pk=self.august.pk).update(
+            created_at=make_aware(datetime(2025, 8, 1))
+        )
+
+    def test_tickets_csv(self):
+        response = self.client.get(TICKETS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn("tickets.csv", response["Content-Disposition"])
+        rows = list(csv.DictReader(body(response).splitlines()))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]["user_email"], "admin@test.com")
+        self.assertEqual(rows[0]["play_title"], "Sample Play")
+        self.assertEqual(rows[0]["reserved_at"], "2025-07-31T23:59:00+00:00")
+        self.assertEqual(
+            [row["seat"] for row in rows[:3]], ["1", "2", "3"]
+        )
+
+    def test_tickets_jsonl_by_performance(self):
+        response = self.client.get(TICKETS_URL, {
+            "output": "jsonl", "performance": self.performance.id
+        })
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in body(response).splitlines()]
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[0]["performance_id"], self.performance.id)
+        self.assertEqual(lines[0]["row"], 1)
+
+    def test_date_range(self):
+        response = self.client.get(TICKETS_URL, {"from": "2025-08-01"})
+        rows = list(csv.DictReader(body(response).splitlines()))
+        self.assertEqual(
+            [int(row["ticket_id"]) for row in rows], [self.other_ticket.id]
+        )
+
+        response = self.client.get(
+            TICKETS_URL, {"from": "2025-07-31", "to": "2025-07-31"}
+        )
+        self.assertEqual(len(body(response).splitlines()), 1 + 3)
+
+    def test_reservations(self):
+        response = self.client.get(RESERVATIONS_URL, {"output": "jsonl"})
+        lines = [json.loads(line) for line in body(response).splitlines()]
+        self.assertEqual(
+            [(line["reservation_id"], line["tickets"]) for line in lines],
+            [(self.july.id, 3), (self.august.id, 1)],
+        )
+
+        response = self.client.get(
+            RESERVATIONS_URL, {"performance": self.performance.id}
+        )
+        rows = list(csv.DictReader(body(response).splitlines()))
+        self.assertEqual(
+            [(int(row["reservation_id"]), row["tickets"]) for row in rows],
+            [(self.july.id, "3")],
+        )
+
+    def test_invalid_params(self):
+        for params in (
+            {"output": "xml"},
+            {"from": "31.07.2025"},
+            {"from": "2025-08-01", "to": "2025-07-01"},
+            {"performance": "first"},
+        ):
+            response = self.client.get(TICKETS_URL, params)
+
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+
+    def test_admin_required(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="user@test.com", password="test_password"
+            )
+        )
+
+        for url in (TICKETS_URL, RESERVATIONS_URL):
+            response = client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
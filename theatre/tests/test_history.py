@@ -0,0 +1,93 @@
+from datetime import date, datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.history import reservation_history
+from theatre.models import Reservation, Ticket
+from theatre.tests.tests_api.test_helpers import create_performance
+
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+class ReservationHistoryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.client.force_authenticate(self.user)
+        self.seats = iter(range(1, 21))
+        self.performance = create_performance()
+        self.other_performance = create_performance(
+            show_time="2025-08-01T19:00:00"
+        )
+        self.july = self.reserve(
+            datetime(2025, 7, 10, 12), [self.performance] * 3
+        )
+        self.august = self.reserve(
+            datetime(2025, 8, 10, 12),
+            [self.performance, self.other_performance],
+        )
+
+    def reserve(self, created_at, performances):
+        reservation = Reservation.objects.create(user=self.user)
+        Reservation.objects.filter(pk=reservation.pk).update(
+            created_at=timezone.make_aware(created_at)
+        )
+        for performance in performances:
+            Ticket.objects.create(
+                reservation=reservation,
+                row=1,
+                seat=next(self.seats),
+                performance=performance,
+            )
+        return reservation
+
+    def test_history_loads_narrow_shared_performances(self):
+        with CaptureQueriesContext(connection) as queries:
+            reservations = list(reservation_history(self.user))
+
+        self.assertEqual(len(queries), 3)
+        self.assertNotIn("description", queries[2]["sql"])
+        performances = {
+            id(ticket.performance)
+            for reservation in reservations
+            for ticket in reservation.tickets.all()
+        }
+        self.assertEqual(len(performances), 2)
+
+    def test_list_query_count_does_not_grow_with_tickets(self):
+        self.reserve(datetime(2025, 8, 11, 12), [self.other_performance])
+
+        with self.assertNumQueries(4):
+            response = self.client.get(RESERVATION_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        performance = response.data["results"][0]["tickets"][0][
+            "performance"
+        ]
+        self.assertEqual(performance["play_title"], "Sample Play")
+        self.assertEqual(performance["theatre_hall_capacity"], 400)
+
+    def test_filter_by_reservation_day(self):
+        response = self.client.get(
+            RESERVATION_URL, {"from": "2025-07-01", "to": "2025-07-31"}
+        )
+
+        self.assertEqual(
+            [reservation["id"] for reservation in response.data["results"]],
+            [self.july.id],
+        )
+        self.assertEqual(
+            list(reservation_history(self.user, date_from=date(2025, 8, 10))),
+            [self.august],
+        )
+        response = self.client.get(RESERVATION_URL, {"from": "July"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,191 @@
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.idempotency import _lock_id
+from theatre.models import IdempotencyKey, Reservation
+from theatre.serializers import ReservationSerializer
+from theatre.tests.tests_api.test_helpers import create_performance
+
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+def tickets(performance, seat=1):
+    return {"tickets": [
+        {"row": 1, "seat": seat, "performance": performance.id}
+    ]}
+
+
+class IdempotentReservationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = create_performance()
+
+    def post(self, data, key="retry-1"):
+        return self.client.post(
+            RESERVATION_URL, data, format="json", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_response(self):
+        first = self.post(tickets(self.performance))
+        retry = self.post(tickets(self.performance))
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_client_errors_are_replayed(self):
+        first = self.post({"tickets": []})
+        retry = self.post({"tickets": []})
+
+        self.assertEqual(first.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+
+    def test_key_reused_with_other_body(self):
+        self.post(tickets(self.performance))
+        response = self.post(tickets(self.performance, seat=2))
+
+        self.assertEqual(
+            response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_keys_are_per_user(self):
+        self.post(tickets(self.performance))
+        other = get_user_model().objects.create_user(
+            email="other@test.com", password="test_password"
+        )
+        self.client.force_authenticate(other)
+
+        response = self.post(tickets(self.performance, seat=2))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", response)
+
+    def test_expired_key_runs_again(self):
+        self.post(tickets(self.performance))
+        IdempotencyKey.objects.update(expires_at=timezone.now())
+
+        response = self.post(tickets(self.performance, seat=2))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_without_key(self):
+        self.client.post(
+            RESERVATION_URL, tickets(self.performance), format="json"
+        )
+
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_invalid_key(self):
+        response = self.post(tickets(self.performance), key="k" * 256)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_purge_expired_keys(self):
+        now = timezone.now()
+        for number in range(5):
+            IdempotencyKey.objects.create(
+                user=self.user,
+                key=f"key-{number}",
+                request_hash="",
+                status_code=201,
+                response={},
+                expires_at=now + timedelta(hours=2 * number - 5),
+            )
+        out = StringIO()
+
+        call_command("purge_idempotency_keys", batch_size=2, stdout=out)
+
+        self.assertIn("Purged 3", out.getvalue())
+        self.assertEqual(
+            sorted(IdempotencyKey.objects.values_list("key", flat=True)),
+            ["key-3", "key-4"],
+        )
+
+
+class ConcurrentReservationTests(TransactionTestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.performance = create_performance()
+
+    def post(self, responses):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        try:
+            responses.append(client.post(
+                RESERVATION_URL,
+                tickets(self.performance),
+                format="json",
+                HTTP_IDEMPOTENCY_KEY="retry-1",
+            ))
+        finally:
+            connections.close_all()
+
+    def test_duplicate_waits_for_first_request(self):
+        release = threading.Event()
+        create = ReservationSerializer.create
+
+        def slow_create(serializer, validated_data):
+            release.wait(5)
+            return create(serializer, validated_data)
+
+        responses = []
+        threads = [
+            threading.Thread(target=self.post, args=(responses,))
+            for _ in range(2)
+        ]
+        with mock.patch.object(
+            ReservationSerializer, "create", slow_create
+        ):
+            for thread in threads:
+                thread.start()
+            time.sleep(0.3)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(
+            [response.status_code for response in responses],
+            [status.HTTP_201_CREATED] * 2,
+        )
+        replayed = ["Idempotent-Replayed" in resp for resp in responses]
+        self.assertEqual(sorted(replayed), [False, True])
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    @override_settings(IDEMPOTENCY_LOCK_TIMEOUT=0.2)
+    def test_gives_up_while_first_request_runs(self):
+        responses = []
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(%s)",
+                    [_lock_id(self.user.pk, "retry-1")],
+                )
+            thread = threading.Thread(target=self.post, args=(responses,))
+            thread.start()
+            thread.join()
+
+        self.assertEqual(responses[0].status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Reservation.objects.exists())
@@ -0,0 +1,119 @@
+import os
+import tempfile
+from io import StringIO
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.images import generate_play_image_variants
+from theatre.models import Job, Play
+from theatre.serializers import PlayListSerializer
+from theatre.tests.tests_api.test_helpers import create_play
+
+
+def image_file(size=(800, 400), fmt="PNG", name="poster.png"):
+    with tempfile.SpooledTemporaryFile() as tmp:
+        Image.new("RGBA", size, (200, 10, 10, 128)).save(tmp, format=fmt)
+        tmp.seek(0)
+        return SimpleUploadedFile(name, tmp.read())
+
+
+@override_settings(
+    PLAY_IMAGE_VARIANT_WIDTHS=(320, 640, 1280),
+    PLAY_IMAGE_VARIANT_FORMATS={"webp": 80, "jpeg": 82},
+)
+class PlayImageVariantTests(TestCase):
+    def setUp(self):
+        self.play = create_play()
+        self.play.image = image_file()
+        self.play.save()
+
+    def tearDown(self):
+        self.play.refresh_from_db()
+        for names in self.play.image_variants.values():
+            for name in names.values():
+                default_storage.delete(name)
+        self.play.image.delete()
+
+    def test_generate_variants(self):
+        variants = generate_play_image_variants(self.play.id)
+        self.play.refresh_from_db()
+
+        self.assertEqual(self.play.image_variants, variants)
+        self.assertEqual(set(variants), {"webp", "jpeg"})
+        self.assertEqual(set(variants["webp"]), {"320", "640"})
+        for fmt, names in variants.items():
+            for width, name in names.items():
+                with Image.open(default_storage.path(name)) as image:
+                    self.assertEqual(image.width, int(width))
+                    self.assertEqual(image.height, int(width) // 2)
+                    self.assertEqual(image.format, fmt.upper())
+
+    def test_variant_names_are_content_hashed(self):
+        first = generate_play_image_variants(self.play.id)
+        second = generate_play_image_variants(self.play.id)
+
+        self.assertEqual(first, second)
+        stem, _ = os.path.splitext(os.path.basename(self.play.image.name))
+        self.assertRegex(
+            os.path.basename(first["jpeg"]["320"]),
+            rf"^{stem}-[0-9a-f]{{12}}-320w\.jpg$",
+        )
+
+    def test_small_image_is_not_upscaled(self):
+        self.play.image.delete()
+        self.play.image = image_file(size=(100, 50))
+        self.play.save()
+
+        variants = generate_play_image_variants(self.play.id)
+
+        self.assertEqual(set(variants["webp"]), {"100"})
+
+    def test_serializer_exposes_srcset(self):
+        generate_play_image_variants(self.play.id)
+        self.play.refresh_from_db()
+        srcset = PlayListSerializer(self.play).data["image_srcset"]
+
+        self.assertEqual(set(srcset["webp"]), {"320w", "640w"})
+        self.assertTrue(srcset["jpeg"]["640w"].endswith("-640w.jpg"))
+
+    def test_backfill_command(self):
+        call_command("generate_play_image_variants", stdout=StringIO())
+        self.play.refresh_from_db()
+
+        self.assertIn("webp", self.play.image_variants)
+
+
+class PlayImageUploadVariantTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            "admin@test.com", "password"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.play = create_play()
+
+    def tearDown(self):
+        self.play.refresh_from_db()
+        self.play.image.delete()
+
+    def test_upload_enqueues_variants_job(self):
+        url = reverse("theatre:play-upload-image", args=[self.play.id])
+        response = self.client.post(
+            url, {"image": image_file()}, format="multipart"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        job = Job.objects.get(name="theatre.play_image_variants")
+        self.assertEqual(job.payload, {"play_id": self.play.id})
+        self.assertEqual(job.queue, "images")
+        self.assertEqual(
+            Play.objects.get(id=self.play.id).image_variants, {}
+        )
@@ -0,0 +1,212 @@
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre import jobs
+from theatre.models import Job
+from theatre.tests.tests_api.test_helpers import create_performance
+
+calls = []
+
+
+@jobs.task("tests.record")
+def record(value):
+    calls.append(value)
+
+
+@jobs.task("tests.sleep_then_record")
+def sleep_then_record(seconds, value):
+    time.sleep(seconds)
+    # Without the heartbeat the lock has expired by now.
+    if jobs.requeue_stale_jobs():
+        raise RuntimeError("The running job was released.")
+    calls.append(value)
+
+
+@jobs.task("tests.fail", max_attempts=2)
+def fail():
+    raise RuntimeError("boom")
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_runs_job_with_payload(self):
+        job = record.enqueue(value=1)
+
+        processed = jobs.work(["default"], burst=True)
+        job.refresh_from_db()
+
+        self.assertEqual(processed, 1)
+        self.assertEqual(calls, [1])
+        self.assertEqual(job.status, Job.Status.DONE)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_priority_order(self):
+        record.enqueue(value="low")
+        record.enqueue(value="high", priority=5)
+        jobs.enqueue("tests.record", {"value": "other"}, queue="other")
+
+        jobs.work(["default"], burst=True)
+
+        self.assertEqual(calls, ["high", "low"])
+        self.assertTrue(
+            Job.objects.filter(queue="other", status=Job.Status.QUEUED)
+            .exists()
+        )
+
+    def test_future_job_is_not_run(self):
+        record.enqueue(value=1, delay=60)
+
+        self.assertEqual(jobs.work(["default"], burst=True), 0)
+        self.assertEqual(calls, [])
+
+    @override_settings(JOB_RETRY_BACKOFF=10, JOB_RETRY_MAX_DELAY=3600)
+    def test_failed_job_is_retried_with_backoff(self):
+        job = fail.enqueue()
+
+        with self.assertLogs("theatre.jobs", level="WARNING"):
+            jobs.work(["default"], burst=True)
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertIn("RuntimeError: boom", job.last_error)
+        delay = (job.run_at - timezone.now()).total_seconds()
+        self.assertTrue(5 < delay <= 11)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs("theatre.jobs", level="ERROR"):
+            jobs.work(["default"], burst=True)
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_unknown_task_fails(self):
+        job = jobs.enqueue("tests.missing")
+
+        with self.assertLogs("theatre.jobs", level="ERROR"):
+            jobs.work(["default"], burst=True)
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertIn("tests.missing", job.last_error)
+
+    def test_stale_running_job_is_requeued(self):
+        job = record.enqueue(value=1)
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.Status.RUNNING,
+            attempts=1,
+            locked_by="dead-worker",
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+
+        jobs.work(["default"], burst=True)
+        job.refresh_from_db()
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(job.status, Job.Status.DONE)
+        self.assertEqual(job.attempts, 2)
+
+    @override_settings(JOB_DB_RETRY_MAX_DELAY=0)
+    def test_worker_survives_database_errors(self):
+        record.enqueue(value=1)
+        dequeue = jobs.dequeue
+        errors = [OperationalError("server closed the connection")]
+
+        def flaky_dequeue(*args):
+            if errors:
+                raise errors.pop()
+            return dequeue(*args)
+
+        with (
+            mock.patch.object(jobs, "dequeue", side_effect=flaky_dequeue),
+            mock.patch.object(jobs, "close_old_connections") as close,
+            self.assertLogs("theatre.jobs", level="ERROR"),
+        ):
+            processed = jobs.work(["default"], burst=True)
+
+        self.assertEqual(processed, 1)
+        self.assertEqual(calls, [1])
+        close.assert_called_once_with()
+
+    def test_stale_job_without_attempts_left_fails(self):
+        job = record.enqueue(value=1)
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.Status.RUNNING,
+            attempts=job.max_attempts,
+            locked_by="dead-worker",
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+
+        jobs.work(["default"], burst=True)
+        job.refresh_from_db()
+
+        self.assertEqual(calls, [])
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertIn("stopped", job.last_error)
+
+    def test_reservation_sends_confirmation_in_background(self):
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+        performance = create_performance()
+
+        response = client.post(
+            reverse("theatre:reservation-list"),
+            {"tickets": [{"row": 1, "seat": 2, "performance": performance.id}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(mail.outbox), 0)
+
+        jobs.work(["default"], burst=True)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["user@test.com"])
+        self.assertIn("row 1, seat 2", mail.outbox[0].body)
+
+
+class RunWorkerCommandTests(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_burst_with_thread_pool(self):
+        for value in range(5):
+            record.enqueue(value=value)
+
+        call_command(
+            "run_worker", "--burst", "--concurrency=3", stdout=StringIO()
+        )
+
+        self.assertEqual(sorted(calls), [0, 1, 2, 3, 4])
+        self.assertEqual(
+            Job.objects.filter(status=Job.Status.DONE).count(), 5
+        )
+
+    @override_settings(JOB_LOCK_TIMEOUT=0.3)
+    def test_lock_is_extended_while_job_runs(self):
+        job = sleep_then_record.enqueue(seconds=0.5, value=1)
+
+        jobs.work(["default"], burst=True)
+        job.refresh_from_db()
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(job.status, Job.Status.DONE)
+        self.assertEqual(job.attempts, 1)
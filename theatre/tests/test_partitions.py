@@ -0,0 +1,148 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from theatre.archive import archive_performances
+from theatre.models import ArchivedPerformance, Reservation, Ticket
+from theatre.partitions import (
+    archive_partitions,
+    partition_months,
+    roll_forward,
+)
+from theatre.tests.tests_api.test_helpers import create_performance
+from theatre.views import PerformanceViewSet
+
+
+def partition_of(model, pk):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT tableoid::regclass::text FROM {model._meta.db_table} "
+            "WHERE id = %s",
+            [pk],
+        )
+        return cursor.fetchone()[0]
+
+
+class PartitionTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        # Long before the partitions created by the migration.
+        self.performance = create_performance(show_time="2020-03-14T19:00:00")
+        self.reservation = Reservation.objects.create(user=self.user)
+        self.ticket = Ticket.objects.create(
+            reservation=self.reservation,
+            row=1,
+            seat=1,
+            performance=self.performance,
+        )
+
+    def roll_forward(self, table, column, months, month=3):
+        with connection.cursor() as cursor:
+            return roll_forward(
+                cursor,
+                table,
+                column,
+                months,
+                now=datetime(2020, month, 1, tzinfo=dt_timezone.utc),
+            )
+
+    def test_new_partitions_take_rows_from_default(self):
+        self.assertEqual(
+            partition_of(Ticket, self.ticket.id), "theatre_ticket_default"
+        )
+
+        created = self.roll_forward("theatre_ticket", "show_time", 1)
+
+        self.assertEqual(
+            created, ["theatre_ticket_p2020_03", "theatre_ticket_p2020_04"]
+        )
+        self.assertEqual(
+            partition_of(Ticket, self.ticket.id), "theatre_ticket_p2020_03"
+        )
+        self.assertEqual(self.roll_forward("theatre_ticket", "show_time", 1), [])
+
+    def test_tickets_follow_rescheduled_performance(self):
+        self.roll_forward("theatre_ticket", "show_time", 1)
+
+        self.performance.show_time += timedelta(days=30)
+        self.performance.end_time = None
+        self.performance.save()
+
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.show_time, self.performance.show_time)
+        self.assertEqual(
+            partition_of(Ticket, self.ticket.id), "theatre_ticket_p2020_04"
+        )
+
+    def test_performance_date_filter_prunes_ticket_partitions(self):
+        self.roll_forward("theatre_ticket", "show_time", 1)
+        view = PerformanceViewSet(action="list")
+        view.request = Request(
+            APIRequestFactory().get("/", {"date": "2020-03-14"})
+        )
+
+        plan = view.get_queryset().explain()
+
+        self.assertIn("theatre_ticket_p2020_03", plan)
+        self.assertNotIn("theatre_ticket_p2020_04", plan)
+        self.assertNotIn("theatre_ticket_default", plan)
+        self.assertEqual(
+            view.get_queryset().get().tickets_available, 399
+        )
+
+    def test_archive_partitions(self):
+        self.roll_forward("theatre_ticket", "show_time", 0)
+        Reservation.objects.filter(pk=self.reservation.pk).update(
+            created_at=datetime(2020, 2, 10, tzinfo=dt_timezone.utc)
+        )
+        self.roll_forward("theatre_reservation", "created_at", 1, month=2)
+
+        archived, kept = archive_partitions(
+            "theatre_reservation", date(2020, 4, 1), "archive"
+        )
+
+        self.assertEqual(archived, ["theatre_reservation_p2020_03"])
+        self.assertEqual(kept, ["theatre_reservation_p2020_02"])
+        self.assertTrue(Reservation.objects.exists())
+
+        # The performance is live, so its tickets stay with it.
+        out = StringIO()
+        call_command(
+            "archive_partitions", before=date(2020, 4, 1), stdout=out
+        )
+        self.assertIn(
+            "Kept theatre_ticket_p2020_03: it has live performances",
+            out.getvalue(),
+        )
+        self.assertTrue(Ticket.objects.exists())
+
+        # Once archived, tickets go first, then their reservations follow.
+        archive_performances(
+            datetime(2020, 4, 1, tzinfo=dt_timezone.utc), 10
+        )
+        call_command(
+            "archive_partitions", before=date(2020, 4, 1), stdout=StringIO()
+        )
+
+        self.assertFalse(Reservation.objects.exists())
+        self.assertEqual(
+            ArchivedPerformance.objects.get(pk=self.performance.pk)
+            .tickets_sold,
+            1,
+        )
+        with connection.cursor() as cursor:
+            self.assertNotIn(
+                date(2020, 3, 1), partition_months(cursor, "theatre_ticket")
+            )
+            self.assertNotIn(
+                date(2020, 2, 1),
+                partition_months(cursor, "theatre_reservation"),
+            )
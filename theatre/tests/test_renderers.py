@@ -0,0 +1,138 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from theatre import renderers
+from theatre.renderers import FastJSONRenderer
+from theatre.serializers import GenreSerializer
+from theatre.tests.tests_api.test_helpers import create_genre
+
+GENRE_URL = reverse("theatre:genre-list")
+
+SAMPLE_DATA = {
+    "title": "Play\u2028line",
+    "show_time": make_aware(datetime(2025, 7, 29, 19, 0, 0, 123456)),
+    "price": Decimal("12.50"),
+    "ids": [1, 2, 3],
+    1: "non-string key",
+}
+
+
+class FastJSONRendererTests(TestCase):
+    def test_matches_drf_json_renderer(self):
+        expected = JSONRenderer().render(SAMPLE_DATA)
+        self.assertEqual(FastJSONRenderer().render(SAMPLE_DATA), expected)
+
+    def test_falls_back_without_orjson(self):
+        expected = JSONRenderer().render(SAMPLE_DATA)
+        with mock.patch.object(renderers, "orjson", None):
+            renderer = FastJSONRenderer()
+            self.assertEqual(renderer.engine, "json")
+            self.assertEqual(renderer.render(SAMPLE_DATA), expected)
+
+    def test_indent_uses_stdlib_encoder(self):
+        rendered = FastJSONRenderer().render(
+            {"a": 1}, "application/json; indent=4"
+        )
+        self.assertEqual(rendered, b'{\n    "a": 1\n}')
+
+    def test_render_stream(self):
+        chunks = list(FastJSONRenderer().render_stream(
+            {"count": 3, "next": None}, iter([{"id": 1}, {"id": 2}]), 1
+        ))
+
+        self.assertGreater(len(chunks), 2)
+        self.assertEqual(
+            json.loads(b"".join(chunks)),
+            {"count": 3, "next": None, "results": [{"id": 1}, {"id": 2}]},
+        )
+
+
+class StreamingListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.client.force_authenticate(self.user)
+        for index in range(7):
+            create_genre(name=f"Genre {index}")
+
+    @override_settings(
+        JSON_STREAMING_THRESHOLD=5, JSON_STREAMING_CHUNK_SIZE=2
+    )
+    def test_large_page_is_streamed(self):
+        buffered = self.client.get(GENRE_URL, {"limit": 4})
+        streamed = self.client.get(GENRE_URL, {"limit": 6, "offset": 1})
+
+        self.assertNotIsInstance(buffered, StreamingHttpResponse)
+        self.assertIsInstance(streamed, StreamingHttpResponse)
+        self.assertEqual(streamed.status_code, status.HTTP_200_OK)
+
+        body = json.loads(b"".join(streamed.streaming_content))
+        self.assertEqual(body["count"], 7)
+        self.assertEqual(len(body["results"]), 6)
+        self.assertIsNotNone(body["previous"])
+        self.assertEqual(list(body)[-1], "results")
+
+    def test_small_page_is_not_streamed(self):
+        response = self.client.get(GENRE_URL)
+
+        self.assertNotIsInstance(response, StreamingHttpResponse)
+        self.assertIn("Server-Timing", response)
+        self.assertEqual(len(response.data["results"]), 5)
+
+    @override_settings(
+        JSON_STREAMING_THRESHOLD=5, JSON_STREAMING_CHUNK_SIZE=2
+    )
+    def test_streamed_page_is_read_in_chunks(self):
+        with mock.patch.object(
+            QuerySet, "iterator", autospec=True, side_effect=QuerySet.iterator
+        ) as iterator:
+            response = self.client.get(GENRE_URL, {"limit": 6})
+
+        self.assertIsInstance(response, StreamingHttpResponse)
+        iterator.assert_called_once_with(mock.ANY, chunk_size=2)
+        body = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(body["results"]), 6)
+
+    @override_settings(PAGINATION_MAX_LIMIT=3)
+    def test_limit_is_capped(self):
+        response = self.client.get(GENRE_URL, {"limit": 1000})
+
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertIn("limit=3", response.data["next"])
+
+    @override_settings(
+        JSON_STREAMING_THRESHOLD=5, JSON_STREAMING_CHUNK_SIZE=2
+    )
+    def test_error_while_streaming_is_logged(self):
+        to_representation = GenreSerializer.to_representation
+        calls = []
+
+        def fail_on_third(serializer, instance):
+            calls.append(instance)
+            if len(calls) == 3:
+                raise RuntimeError("boom")
+            return to_representation(serializer, instance)
+
+        with mock.patch.object(
+            GenreSerializer, "to_representation", fail_on_third
+        ):
+            response = self.client.get(GENRE_URL, {"limit": 6})
+            with (
+                self.assertLogs("theatre.mixins", "ERROR"),
+                self.assertRaises(RuntimeError),
+            ):
+                b"".join(response.streaming_content)
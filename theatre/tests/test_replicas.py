@@ -0,0 +1,173 @@
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.models import Genre, Play
+from theatre.replicas import (
+    PrimaryReplicaRouter,
+    is_pinned,
+    reset_replica,
+    use_replica,
+)
+from theatre.tests.tests_api.test_helpers import create_performance
+
+GENRE_URL = reverse("theatre:genre-list")
+PLAY_URL = reverse("theatre:play-list")
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class RouterTests(SimpleTestCase):
+    def test_reads_follow_the_request_replica(self):
+        router = PrimaryReplicaRouter()
+        self.assertIsNone(router.db_for_read(Play))
+
+        token = use_replica("replica_1")
+        self.addCleanup(reset_replica, token)
+
+        self.assertEqual(router.db_for_read(Play), "replica_1")
+        self.assertEqual(router.db_for_write(Play), "default")
+        self.assertFalse(router.allow_migrate("replica_1", "theatre"))
+        self.assertIsNone(router.allow_migrate("default", "theatre"))
+
+    def test_transactions_read_from_primary(self):
+        token = use_replica("replica_1")
+        self.addCleanup(reset_replica, token)
+        connection = connections["default"]
+        connection.in_atomic_block = True
+        self.addCleanup(setattr, connection, "in_atomic_block", False)
+
+        self.assertIsNone(PrimaryReplicaRouter().db_for_read(Play))
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReplicaReadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.client.force_authenticate(self.user)
+
+    def replicas_used(self, method, url, data=None):
+        with mock.patch(
+            "theatre.mixins.use_replica", wraps=use_replica
+        ) as chosen:
+            response = getattr(self.client, method)(url, data, format="json")
+        return response, [call.args[0] for call in chosen.call_args_list]
+
+    def test_catalog_reads_use_replica(self):
+        response, replicas = self.replicas_used("get", PLAY_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(replicas, ["replica_1"])
+        self.assertEqual(self.replicas_used("get", GENRE_URL)[1], ["replica_1"])
+
+    def test_seat_maps_are_read_from_primary(self):
+        performance = create_performance()
+
+        response, replicas = self.replicas_used(
+            "get", reverse("theatre:performance-detail", args=[performance.id])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(replicas, [])
+
+    def test_writer_is_pinned_to_primary(self):
+        performance = create_performance()
+
+        response, replicas = self.replicas_used(
+            "post",
+            RESERVATION_URL,
+            {"tickets": [
+                {"row": 1, "seat": 1, "performance": performance.id}
+            ]},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replicas, [])
+        self.assertTrue(is_pinned(self.user.id))
+        response, replicas = self.replicas_used("get", RESERVATION_URL)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(replicas, [None])
+
+        other = get_user_model().objects.create_user(
+            email="other@test.com", password="test_password"
+        )
+        self.client.force_authenticate(other)
+        self.assertEqual(
+            self.replicas_used("get", RESERVATION_URL)[1], ["replica_1"]
+        )
+
+    def test_failed_writes_do_not_pin(self):
+        self.client.post(RESERVATION_URL, {"tickets": []}, format="json")
+
+        self.assertFalse(is_pinned(self.user.id))
+
+
+@skipUnless(
+    settings.DATABASE_REPLICAS, "Set POSTGRES_REPLICA_HOSTS to run."
+)
+class ReplicaDatabaseTests(TransactionTestCase):
+    databases = {"default", *settings.DATABASE_REPLICAS}
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="user@test.com", password="test_password"
+            )
+        )
+
+    def test_catalog_is_read_from_replica(self):
+        Genre.objects.create(name="Drama")
+        replica = settings.DATABASE_REPLICAS[0]
+
+        with (
+            override_settings(DATABASE_REPLICAS=[replica]),
+            CaptureQueriesContext(connections[replica]) as replica_queries,
+            CaptureQueriesContext(connections["default"]) as queries,
+        ):
+            response = self.client.get(GENRE_URL)
+
+        self.assertEqual(response.data["results"][0]["name"], "Drama")
+        self.assertTrue(replica_queries.captured_queries)
+        self.assertFalse(queries.captured_queries)
+
+    @override_settings(
+        JSON_STREAMING_THRESHOLD=2, JSON_STREAMING_CHUNK_SIZE=1
+    )
+    def test_streamed_catalog_is_read_from_replica(self):
+        Genre.objects.bulk_create(
+            Genre(name=name) for name in ("Drama", "Comedy", "Opera")
+        )
+        replica = settings.DATABASE_REPLICAS[0]
+
+        with (
+            override_settings(DATABASE_REPLICAS=[replica]),
+            CaptureQueriesContext(connections[replica]) as replica_queries,
+            CaptureQueriesContext(connections["default"]) as queries,
+        ):
+            response = self.client.get(GENRE_URL, {"limit": 3})
+            body = b"".join(response.streaming_content)
+
+        self.assertIn(b"Opera", body)
+        self.assertTrue(replica_queries.captured_queries)
+        self.assertFalse(queries.captured_queries)
@@ -0,0 +1,138 @@
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.models import PerformanceSchedule, Reservation, Ticket
+from theatre.tests.tests_api.test_helpers import (
+    create_performance,
+    create_play,
+)
+
+SCHEDULE_URL = reverse("theatre:schedule-list")
+
+
+class PerformanceScheduleTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.performance = create_performance(
+                show_time="2025-07-29 19:00:00"
+            )
+
+    def schedule(self):
+        return PerformanceSchedule.objects.get(performance=self.performance)
+
+    def test_row_created_with_performance(self):
+        row = self.schedule()
+
+        self.assertEqual(row.date.isoformat(), "2025-07-29")
+        self.assertEqual(row.play_title, "Sample Play")
+        self.assertEqual(row.capacity, 400)
+        self.assertEqual(row.seats_left, 400)
+
+    def test_seats_left_follow_tickets(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation = Reservation.objects.create(user=self.user)
+            for seat in range(1, 4):
+                Ticket.objects.create(
+                    row=1,
+                    seat=seat,
+                    performance=self.performance,
+                    reservation=reservation,
+                )
+        self.assertEqual(self.schedule().seats_left, 397)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation.tickets.first().delete()
+        self.assertEqual(self.schedule().seats_left, 398)
+
+    def test_performance_and_play_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.performance.show_time = make_aware(
+                datetime(2025, 8, 1, 18, 0)
+            )
+            self.performance.save()
+        self.assertEqual(self.schedule().date.isoformat(), "2025-08-01")
+
+        self.performance.play.title = "Renamed"
+        self.performance.play.save()
+        self.assertEqual(self.schedule().play_title, "Renamed")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.performance.theatre_hall.rows = 10
+            self.performance.theatre_hall.save()
+        self.assertEqual(self.schedule().capacity, 200)
+
+    def test_refresh_command(self):
+        PerformanceSchedule.objects.all().delete()
+
+        call_command("refresh_schedule", stdout=StringIO())
+
+        self.assertEqual(self.schedule().seats_left, 400)
+
+
+class ScheduleApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="user@test.com", password="test_password"
+            )
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            first = create_performance(show_time="2025-07-01 19:00:00")
+            self.evening = create_performance(
+                show_time="2025-07-01 21:00:00", play=first.play
+            )
+            other = create_performance(
+                show_time="2025-07-01 12:00:00",
+                play=create_play(title="A Matinee"),
+            )
+            create_performance(show_time="2025-08-01 19:00:00")
+        self.first, self.other = first, other
+
+    def test_month_grouped_by_day_and_play(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                SCHEDULE_URL, {"from": "2025-07-01", "to": "2025-07-31"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        days = response.data["days"]
+        self.assertEqual(len(days), 1)
+        self.assertEqual(days[0]["date"].isoformat(), "2025-07-01")
+        self.assertEqual(
+            [play["play_title"] for play in days[0]["plays"]],
+            ["A Matinee", "Sample Play"],
+        )
+        self.assertEqual(
+            [
+                performance["id"]
+                for performance in days[0]["plays"][1]["performances"]
+            ],
+            [self.first.id, self.evening.id],
+        )
+        self.assertEqual(
+            days[0]["plays"][1]["performances"][0]["seats_left"], 400
+        )
+
+    def test_invalid_range(self):
+        for params in (
+            {"from": "2025-07-31", "to": "2025-07-01"},
+            {"from": "2025-01-01", "to": "2025-12-31"},
+            {"from": "July"},
+        ):
+            response = self.client.get(SCHEDULE_URL, params)
+
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
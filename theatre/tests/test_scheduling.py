@@ -0,0 +1,339 @@
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.models import Performance, PerformanceSchedule
+from theatre import scheduling
+from theatre.scheduling import find_conflicts, recurrence
+from theatre.tests.tests_api.test_helpers import (
+    create_performance,
+    create_play,
+    create_theatre_hall,
+)
+
+BULK_SCHEDULE_URL = reverse("theatre:performance-bulk-schedule")
+PERFORMANCE_URL = reverse("theatre:performance-list")
+
+
+def aware(*args):
+    return make_aware(datetime(*args))
+
+
+class RecurrenceTests(TestCase):
+    def test_weekdays_and_times(self):
+        starts = recurrence(
+            date(2025, 7, 1), date(2025, 7, 7), [4, 5], [time(19), time(14)]
+        )
+
+        self.assertEqual(starts, [
+            aware(2025, 7, 4, 14), aware(2025, 7, 4, 19),
+            aware(2025, 7, 5, 14), aware(2025, 7, 5, 19),
+        ])
+
+
+def two_hours(*starts):
+    return [(start, start + timedelta(hours=2)) for start in starts]
+
+
+class FindConflictsTests(TestCase):
+    def setUp(self):
+        self.hall = create_theatre_hall()
+        self.existing = create_performance(
+            theatre_hall=self.hall, show_time="2025-07-04 19:00:00"
+        )
+
+    def test_default_end_time(self):
+        self.assertEqual(self.existing.end_time, aware(2025, 7, 4, 22))
+
+    def test_overlap_with_existing(self):
+        conflicts = find_conflicts(
+            self.hall,
+            two_hours(
+                aware(2025, 7, 4, 17), aware(2025, 7, 4, 17, 30),
+                aware(2025, 7, 4, 22),
+                aware(2025, 7, 5, 19),
+            ),
+        )
+
+        self.assertEqual(conflicts, [{
+            "show_time": aware(2025, 7, 4, 17, 30),
+            "end_time": aware(2025, 7, 4, 19, 30),
+            "conflicts_with": {
+                "id": self.existing.id,
+                "show_time": aware(2025, 7, 4, 19),
+                "end_time": aware(2025, 7, 4, 22),
+            },
+        }])
+
+    def test_uses_stored_end_time(self):
+        create_performance(
+            theatre_hall=self.hall,
+            show_time="2025-07-05 10:00:00",
+            end_time=aware(2025, 7, 5, 18),
+        )
+
+        self.assertEqual(
+            len(find_conflicts(self.hall, two_hours(aware(2025, 7, 5, 16)))),
+            1,
+        )
+
+    def test_overlap_between_candidates(self):
+        conflicts = find_conflicts(
+            self.hall,
+            [
+                (aware(2025, 7, 5, 12), aware(2025, 7, 5, 18)),
+                (aware(2025, 7, 5, 13), aware(2025, 7, 5, 14)),
+                (aware(2025, 7, 5, 15), aware(2025, 7, 5, 16)),
+            ],
+        )
+
+        self.assertEqual(len(conflicts), 2)
+        self.assertEqual(
+            conflicts[1]["conflicts_with"]["show_time"],
+            aware(2025, 7, 5, 12),
+        )
+        self.assertIsNone(conflicts[1]["conflicts_with"]["id"])
+
+    def test_excluded_and_other_hall_are_ignored(self):
+        candidate = two_hours(aware(2025, 7, 4, 19))
+
+        self.assertEqual(
+            find_conflicts(self.hall, candidate, exclude=[self.existing.id]),
+            [],
+        )
+        self.assertEqual(
+            find_conflicts(create_theatre_hall(name="Small Hall"), candidate),
+            [],
+        )
+
+    def test_one_query_for_a_batch(self):
+        with self.assertNumQueries(1):
+            find_conflicts(
+                self.hall,
+                two_hours(*(
+                    aware(2025, 7, 4, 10) + timedelta(days=day)
+                    for day in range(100)
+                )),
+            )
+
+    def test_database_rejects_overlap(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            create_performance(
+                theatre_hall=self.hall, show_time="2025-07-04 21:00:00"
+            )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            create_performance(
+                theatre_hall=self.hall,
+                show_time="2025-07-05 21:00:00",
+                end_time=aware(2025, 7, 5, 20),
+            )
+        create_performance(
+            theatre_hall=self.hall, show_time="2025-07-04 22:00:00"
+        )
+
+
+class PerformanceConflictApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@test.com", "password"
+            )
+        )
+        self.hall = create_theatre_hall()
+        self.existing = create_performance(
+            theatre_hall=self.hall, show_time="2025-07-04 19:00:00"
+        )
+        self.other = create_performance(
+            theatre_hall=self.hall,
+            show_time="2025-07-05 12:00:00",
+            end_time=aware(2025, 7, 5, 13),
+        )
+
+    def test_create_conflict(self):
+        response = self.client.post(PERFORMANCE_URL, {
+            "play": self.existing.play_id,
+            "theatre_hall": self.hall.id,
+            "show_time": "2025-07-04T16:30:00Z",
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            response.data["detail"].code, "performance_conflict"
+        )
+        self.assertEqual(response.data["conflicts"], [{
+            "show_time": aware(2025, 7, 4, 16, 30),
+            "end_time": aware(2025, 7, 4, 19, 30),
+            "conflicts_with": {
+                "id": self.existing.id,
+                "show_time": aware(2025, 7, 4, 19),
+                "end_time": aware(2025, 7, 4, 22),
+            },
+        }])
+
+    def test_create_with_end_time(self):
+        response = self.client.post(PERFORMANCE_URL, {
+            "play": self.existing.play_id,
+            "theatre_hall": self.hall.id,
+            "show_time": "2025-07-04T17:00:00Z",
+            "end_time": "2025-07-04T19:00:00Z",
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post(PERFORMANCE_URL, {
+            "play": self.existing.play_id,
+            "theatre_hall": self.hall.id,
+            "show_time": "2025-07-06T17:00:00Z",
+            "end_time": "2025-07-06T17:00:00Z",
+        })
+        self.assertEqual(
+            response.status_code, status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_move_keeps_duration(self):
+        url = reverse("theatre:performance-detail", args=[self.other.id])
+
+        response = self.client.patch(
+            url, {"show_time": "2025-07-04T18:30:00Z"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        response = self.client.patch(
+            url, {"show_time": "2025-07-05T12:30:00Z"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.end_time, aware(2025, 7, 5, 13, 30))
+
+
+class BulkScheduleApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@test.com", "password"
+            )
+        )
+        self.play = create_play()
+        self.hall = create_theatre_hall()
+        self.payload = {
+            "play": self.play.id,
+            "theatre_hall": self.hall.id,
+            "date_from": "2025-09-01",
+            "date_to": "2025-11-30",
+            "times": ["19:00"],
+        }
+
+    def test_nightly_run_in_one_insert(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            # Play and hall lookups, hall lock, overlap read, insert in
+            # a savepoint.
+            with self.assertNumQueries(9):
+                response = self.client.post(
+                    BULK_SCHEDULE_URL, self.payload, format="json"
+                )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 91)
+        self.assertEqual(
+            Performance.objects.filter(theatre_hall=self.hall).count(), 91
+        )
+        self.assertEqual(
+            PerformanceSchedule.objects.filter(
+                theatre_hall=self.hall
+            ).count(),
+            91,
+        )
+
+    def test_dry_run_reports_conflicts(self):
+        existing = create_performance(
+            theatre_hall=self.hall, show_time="2025-09-06 18:00:00"
+        )
+        response = self.client.post(
+            BULK_SCHEDULE_URL,
+            {**self.payload, "weekdays": [5], "dry_run": True},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 0)
+        self.assertEqual(response.data["requested"], 13)
+        self.assertEqual(
+            response.data["conflicts"][0]["conflicts_with"]["id"],
+            existing.id,
+        )
+        self.assertEqual(Performance.objects.count(), 1)
+
+    def test_conflicts_create_nothing(self):
+        create_performance(
+            theatre_hall=self.hall, show_time="2025-09-06 18:00:00"
+        )
+        response = self.client.post(
+            BULK_SCHEDULE_URL, self.payload, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(len(response.data["conflicts"]), 1)
+        self.assertEqual(Performance.objects.count(), 1)
+
+    def test_overlap_committed_after_check(self):
+        existing = create_performance(
+            theatre_hall=self.hall, show_time="2025-09-06 18:00:00"
+        )
+        # The overlap read runs before `existing` is visible.
+        with mock.patch.object(
+            scheduling,
+            "find_conflicts",
+            side_effect=[[], find_conflicts(self.hall, [
+                (aware(2025, 9, 6, 19), aware(2025, 9, 6, 22))
+            ])],
+        ):
+            response = self.client.post(
+                BULK_SCHEDULE_URL, self.payload, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            response.data["detail"].code, "performance_conflict"
+        )
+        self.assertEqual(
+            response.data["conflicts"][0]["conflicts_with"]["id"],
+            existing.id,
+        )
+        self.assertEqual(Performance.objects.count(), 1)
+
+    def test_invalid_rules(self):
+        for payload in (
+            {**self.payload, "date_to": "2025-08-01"},
+            {**self.payload, "date_to": "2027-01-01"},
+            {**self.payload, "times": []},
+            {**self.payload, "weekdays": [7]},
+            {**self.payload, "date_to": "2025-09-01", "weekdays": [0, 6]}
+            | {"date_from": "2025-09-02"},
+        ):
+            response = self.client.post(
+                BULK_SCHEDULE_URL, payload, format="json"
+            )
+
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+
+    def test_admin_required(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="user@test.com", password="test_password"
+            )
+        )
+        response = client.post(BULK_SCHEDULE_URL, self.payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
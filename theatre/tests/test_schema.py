@@ -0,0 +1,104 @@
+import gzip
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre import schema
+from theatre_service.settings import source_version
+
+SCHEMA_URL = reverse("schema")
+
+
+class CachedSchemaViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings = override_settings(
+            OPENAPI_SCHEMA_DIR=Path(self.directory.name),
+            CODE_VERSION="test-build",
+        )
+        self.settings.enable()
+        schema._artifacts.clear()
+        call_command("generate_schema", stdout=StringIO())
+        self.manifest = json.loads(
+            (Path(self.directory.name) / schema.MANIFEST_NAME).read_text()
+        )
+
+    def tearDown(self):
+        schema._artifacts.clear()
+        self.settings.disable()
+        self.directory.cleanup()
+
+    def test_serves_stored_artifact(self):
+        with mock.patch.object(schema, "generate_schema") as generate:
+            response = self.client.get(SCHEMA_URL)
+
+        generate.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response["ETag"], self.manifest["files"]["yaml"]["etag"]
+        )
+        self.assertEqual(
+            response.content,
+            (Path(self.directory.name) / "schema.yaml").read_bytes(),
+        )
+
+    def test_json_format(self):
+        response = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response["ETag"], self.manifest["files"]["json"]["etag"]
+        )
+        self.assertIn("paths", json.loads(response.content))
+
+    def test_not_modified(self):
+        etag = self.client.get(SCHEMA_URL)["ETag"]
+        response = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_precompressed_variant(self):
+        response = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertTrue(response["ETag"].endswith('-gzip"'))
+        self.assertEqual(
+            gzip.decompress(response.content),
+            (Path(self.directory.name) / "schema.yaml").read_bytes(),
+        )
+
+    def test_stale_artifact_is_regenerated_once(self):
+        schema._artifacts.clear()
+        with override_settings(CODE_VERSION="next-build"), mock.patch.object(
+            schema, "generate_schema", wraps=schema.generate_schema
+        ) as generate:
+            first = self.client.get(SCHEMA_URL)
+            second = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first["ETag"], second["ETag"])
+
+
+class SourceVersionTests(TestCase):
+    def test_changes_with_the_sources(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            (root / "app").mkdir()
+            module = root / "app" / "views.py"
+            module.write_text("VERSION = 1\n")
+            before = source_version(root, ("app",))
+
+            self.assertEqual(source_version(root, ("app",)), before)
+            module.write_text("VERSION = 2\n")
+            self.assertNotEqual(source_version(root, ("app",)), before)
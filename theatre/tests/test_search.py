@@ -0,0 +1,110 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.models import Play
+from theatre.search import search_plays
+from theatre.tests.tests_api.test_helpers import (
+    create_actor,
+    create_genre,
+    create_play,
+)
+
+PLAY_URL = reverse("theatre:play-list")
+
+
+def search(text):
+    return list(
+        search_plays(Play.objects.all(), text).values_list("title", flat=True)
+    )
+
+
+class PlaySearchTests(TestCase):
+    def setUp(self):
+        self.hamlet = create_play(
+            title="Hamlet", description="The prince of Denmark seeks revenge."
+        )
+        self.dream = create_play(
+            title="A Midsummer Night's Dream",
+            description="Lovers lost in a forest outside Athens.",
+        )
+        self.actor = create_actor(first_name="Olena", last_name="Shevchuk")
+        self.genre = create_genre(name="Tragedy")
+        self.hamlet.actors.add(self.actor)
+        self.hamlet.genres.add(self.genre)
+
+    def test_matches_all_fields(self):
+        self.assertEqual(search("hamlet"), ["Hamlet"])
+        self.assertEqual(search("denmark"), ["Hamlet"])
+        self.assertEqual(search("shevchuk"), ["Hamlet"])
+        self.assertEqual(search("tragedy"), ["Hamlet"])
+
+    def test_prefix_terms(self):
+        self.assertEqual(search("midsum"), ["A Midsummer Night's Dream"])
+        self.assertEqual(search("ham shev"), ["Hamlet"])
+        self.assertEqual(search("ham athens"), [])
+
+    def test_prefix_starting_with_stopword(self):
+        self.assertEqual(search("the pri"), ["Hamlet"])
+        self.assertEqual(search("a mid"), ["A Midsummer Night's Dream"])
+
+    def test_prefix_altered_by_stemming(self):
+        # English stems "lovely" to "love", which "lovel" is no prefix of.
+        create_play(title="Twelfth Night", description="A lovely comedy.")
+
+        self.assertEqual(search("lovel"), ["Twelfth Night"])
+        # Other word forms still match through the English stems.
+        self.assertEqual(search("revenges"), ["Hamlet"])
+
+    def test_title_ranks_above_description(self):
+        create_play(title="Revenge", description="A quiet comedy.")
+
+        self.assertEqual(search("revenge"), ["Revenge", "Hamlet"])
+
+    def test_ignores_punctuation(self):
+        self.assertEqual(search("hamlet & | !"), ["Hamlet"])
+        self.assertEqual(search("&!:*"), [])
+
+    def test_vector_follows_related_changes(self):
+        self.actor.last_name = "Kovalenko"
+        self.actor.save()
+        self.assertEqual(search("kovalenko"), ["Hamlet"])
+        self.assertEqual(search("shevchuk"), [])
+
+        self.hamlet.actors.remove(self.actor)
+        self.assertEqual(search("kovalenko"), [])
+
+        self.actor.plays.add(self.dream)
+        self.assertEqual(search("kovalenko"), ["A Midsummer Night's Dream"])
+
+        self.genre.delete()
+        self.assertEqual(search("tragedy"), [])
+
+    def test_vector_follows_title_change(self):
+        self.dream.title = "The Tempest"
+        self.dream.save()
+
+        self.assertEqual(search("tempest"), ["The Tempest"])
+
+
+class PlaySearchApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="user@test.com", password="test_password"
+            )
+        )
+
+    def test_search_param(self):
+        create_play(title="Hamlet")
+        create_play(title="Macbeth")
+
+        response = self.client.get(PLAY_URL, {"search": "ham"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [play["title"] for play in response.data["results"]], ["Hamlet"]
+        )
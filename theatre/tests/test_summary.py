@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.models import Reservation, Ticket
+from theatre.summary import build_summary
+from theatre.tests.tests_api.test_helpers import (
+    create_performance,
+    create_play,
+)
+
+RESERVATION_URL = reverse("theatre:reservation-list")
+SUMMARY_URL = reverse("theatre:reservation-summary")
+
+
+class ReservationSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.client.force_authenticate(self.user)
+        now = timezone.now()
+        self.past = create_performance(show_time=now - timedelta(days=3))
+        self.next = create_performance(
+            show_time=now + timedelta(days=2),
+            play=create_play(title="Antigone"),
+        )
+        self.later = create_performance(
+            show_time=now + timedelta(days=9), play=self.past.play
+        )
+        self.reservation = self.reserve(
+            (self.past, 1), (self.past, 2), (self.next, 1), (self.later, 1)
+        )
+
+    def reserve(self, *seats):
+        reservation = Reservation.objects.create(user=self.user)
+        for performance, seat in seats:
+            Ticket.objects.create(
+                reservation=reservation,
+                row=1,
+                seat=seat,
+                performance=performance,
+            )
+        return reservation
+
+    def test_summary(self):
+        with self.assertNumQueries(1):
+            summary = build_summary(self.user.id)
+
+        self.assertEqual(summary["upcoming_tickets"], 2)
+        self.assertEqual(summary["past_tickets"], 2)
+        self.assertEqual(summary["next_performance"]["id"], self.next.id)
+        self.assertEqual(summary["next_performance"]["tickets"], 1)
+        self.assertEqual(
+            [
+                (play["play_title"], play["tickets"], play["upcoming_tickets"])
+                for play in summary["plays"]
+            ],
+            [("Antigone", 1, 1), ("Sample Play", 3, 1)],
+        )
+
+    def test_summary_is_cached_per_user(self):
+        response = self.client.get(SUMMARY_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(SUMMARY_URL)
+
+        self.assertEqual(response.data["upcoming_tickets"], 2)
+        other = get_user_model().objects.create_user(
+            email="other@test.com", password="test_password"
+        )
+        self.client.force_authenticate(other)
+        response = self.client.get(SUMMARY_URL)
+        self.assertEqual(response.data["upcoming_tickets"], 0)
+        self.assertIsNone(response.data["next_performance"])
+
+    def test_reserving_refreshes_summary(self):
+        self.client.get(SUMMARY_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                RESERVATION_URL,
+                {"tickets": [
+                    {"row": 2, "seat": 1, "performance": self.next.id}
+                ]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(SUMMARY_URL)
+        self.assertEqual(response.data["upcoming_tickets"], 3)
+
+    def test_cancelling_refreshes_summary(self):
+        self.client.get(SUMMARY_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse(
+                    "theatre:reservation-cancel-ticket",
+                    args=[
+                        self.reservation.id,
+                        self.reservation.tickets.get(
+                            performance=self.later
+                        ).id,
+                    ],
+                )
+            )
+
+        response = self.client.get(SUMMARY_URL)
+        self.assertEqual(response.data["upcoming_tickets"], 1)
+        self.assertEqual(response.data["plays"][1]["tickets"], 2)
@@ -0,0 +1,190 @@
+from django.contrib.auth import get_user_model
+from types import SimpleNamespace
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.tests.tests_api.test_helpers import create_performance
+from theatre.throttling import (
+    InMemoryBucketStore,
+    booked_performances,
+    get_store,
+)
+
+PERFORMANCE_URL = reverse("theatre:performance-list")
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+class BucketStoreTests(TestCase):
+    def test_take_refills_up_to_burst(self):
+        store = InMemoryBucketStore()
+
+        self.assertEqual(store.take("key", 1.0, 2, now=0), 0)
+        self.assertEqual(store.take("key", 1.0, 2, now=0), 0)
+        self.assertEqual(store.take("key", 1.0, 2, now=0.25), 0.75)
+        self.assertEqual(store.take("key", 1.0, 2, now=1), 0)
+        self.assertEqual(store.take("key", 1.0, 2, now=100), 0)
+        self.assertEqual(store.take("key", 1.0, 2, now=100), 0)
+        self.assertEqual(store.take("key", 1.0, 2, now=100), 1)
+
+    def test_take_all_takes_nothing_when_a_bucket_is_empty(self):
+        store = InMemoryBucketStore()
+        store.take("empty", 1.0, 1, now=0)
+        buckets = [("full", 1.0, 2), ("empty", 1.0, 1)]
+
+        self.assertEqual(store.peek(buckets, now=0.5), 0.5)
+        self.assertEqual(store.take_all(buckets, now=0.5), 0.5)
+        self.assertEqual(store.take_all(buckets, now=1), 0)
+        # The rejected call left the full bucket untouched.
+        self.assertEqual(store.take("full", 1.0, 2, now=1), 0)
+        self.assertEqual(store.take("full", 1.0, 2, now=1), 1)
+
+    def test_least_recently_used_keys_are_evicted(self):
+        store = InMemoryBucketStore()
+        store.max_keys = 2
+        store.take("a", 1.0, 1, now=0)
+        store.take("b", 1.0, 1, now=0)
+        store.take_all([("a", 1.0, 1)], now=1)
+
+        store.take("c", 1.0, 1, now=1)
+
+        self.assertEqual(list(store._buckets), ["a", "c"])
+        # The evicted bucket starts full again.
+        self.assertEqual(store.take("b", 1.0, 1, now=1), 0)
+
+    def test_admit_gives_slots_in_arrival_order(self):
+        store = InMemoryBucketStore()
+
+        self.assertEqual(store.admit("room", "a", 2, 60, now=10), 10)
+        self.assertEqual(store.admit("room", "b", 2, 60, now=10), 12)
+        self.assertEqual(store.admit("room", "c", 2, 60, now=11), 14)
+        self.assertEqual(store.admit("room", "b", 2, 60, now=13), 12)
+        # Expired slots are given out again at the end of the line.
+        self.assertEqual(store.admit("room", "a", 2, 60, now=71), 71)
+
+
+class BookedPerformancesTests(TestCase):
+    def performances(self, tickets):
+        request = SimpleNamespace(data={"tickets": tickets})
+        return booked_performances(request, SimpleNamespace(action="create"))
+
+    def test_only_integer_ids(self):
+        self.assertEqual(
+            self.performances([
+                {"performance": 1},
+                {"performance": "2"},
+                {"performance": 1},
+                {"performance": "x"},
+                {"performance": -3},
+                {"performance": True},
+                {"performance": 1.5},
+                {"performance": "9" * 50},
+                {"performance": [4]},
+                "5",
+            ]),
+            {1, 2},
+        )
+
+    @override_settings(BOOKING_THROTTLE_MAX_PERFORMANCES=3)
+    def test_number_of_performances_is_capped(self):
+        self.assertEqual(
+            self.performances(
+                [{"performance": number} for number in range(1, 1000)]
+            ),
+            {1, 2, 3},
+        )
+
+
+@override_settings(BOOKING_RATE_LIMITS={
+    "user": ("2/min", 2),
+    "performance": ("3/min", 3),
+})
+class BookingThrottleTests(TestCase):
+    def setUp(self):
+        get_store().clear()
+        self.client = APIClient()
+        self.users = [
+            get_user_model().objects.create_user(
+                email=f"user{number}@test.com", password="test_password"
+            )
+            for number in range(3)
+        ]
+        self.client.force_authenticate(self.users[0])
+        self.performance = create_performance()
+
+    def tearDown(self):
+        get_store().clear()
+
+    def get_performance(self, user, performance=None):
+        self.client.force_authenticate(user)
+        return self.client.get(reverse(
+            "theatre:performance-detail",
+            args=[(performance or self.performance).id],
+        ))
+
+    def test_user_bucket(self):
+        for _ in range(2):
+            response = self.get_performance(self.users[0])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.get_performance(self.users[0])
+
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertEqual(response["Retry-After"], "30")
+        # Lists are not booking actions.
+        response = self.client.get(PERFORMANCE_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_performance_bucket(self):
+        for user in self.users:
+            response = self.get_performance(user)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.get_performance(self.users[0])
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        response = self.get_performance(self.users[1], create_performance())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # The rejected request did not use up the user's second token.
+        response = self.get_performance(self.users[0], create_performance())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_reservations_draw_from_performance_bucket(self):
+        for seat in (1, 2, 3):
+            self.get_performance(self.users[seat - 1])
+        self.client.force_authenticate(self.users[2])
+
+        response = self.client.post(
+            RESERVATION_URL,
+            {"tickets": [
+                {"row": 1, "seat": 1, "performance": self.performance.id}
+            ]},
+            format="json",
+        )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+
+    @override_settings(BOOKING_WAITING_ROOM_RATE="1/min")
+    def test_waiting_room(self):
+        first = self.get_performance(self.users[0])
+        second = self.get_performance(self.users[1])
+        third = self.get_performance(self.users[2])
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            second.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertEqual(second.data["position"], 1)
+        self.assertEqual(third.data["position"], 2)
+        self.assertEqual(third.data["retry_after"], 120)
+        self.assertEqual(third["Retry-After"], "120")
+        # Admission lasts, so the first user carries on booking.
+        response = self.get_performance(self.users[0])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,139 @@
+from io import BytesIO
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import serializers, status
+from rest_framework.test import APIClient
+
+from theatre.tests.tests_api.test_helpers import create_play
+from theatre.uploads import (
+    ImageUploadTooLarge,
+    ValidatedImageUpload,
+    ValidatingImageUploadHandler,
+)
+
+
+def image_bytes(size=(10, 10), fmt="JPEG"):
+    buffer = BytesIO()
+    Image.new("RGB", size).save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def image_upload_url(play_id):
+    return reverse("theatre:play-upload-image", args=[play_id])
+
+
+class ValidatingImageUploadHandlerTests(TestCase):
+    def setUp(self):
+        self.handler = ValidatingImageUploadHandler()
+        self.handler.new_file("image", "poster.png", "image/png", None)
+
+    def test_accepts_image_in_chunks(self):
+        data = image_bytes(size=(30, 20), fmt="PNG")
+        self.handler.receive_data_chunk(data[:40], 0)
+        self.handler.receive_data_chunk(data[40:], 40)
+        upload = self.handler.file_complete(len(data))
+
+        self.assertIsInstance(upload, ValidatedImageUpload)
+        self.assertEqual(
+            upload.image_info, {"format": "PNG", "width": 30, "height": 20}
+        )
+        self.assertEqual(upload.content_type, "image/png")
+        self.assertEqual(upload.read(), data)
+
+    @override_settings(PLAY_IMAGE_MAX_PIXELS=100)
+    def test_rejects_bomb_from_first_chunk(self):
+        data = image_bytes(size=(20, 20), fmt="PNG")
+
+        with self.assertRaises(serializers.ValidationError):
+            self.handler.receive_data_chunk(data[:64], 0)
+
+    def test_rejects_unsupported_format(self):
+        data = image_bytes(fmt="GIF")
+
+        with self.assertRaises(serializers.ValidationError):
+            self.handler.receive_data_chunk(data, 0)
+
+    @override_settings(PLAY_IMAGE_MAX_UPLOAD_SIZE=100)
+    def test_rejects_oversized_body(self):
+        with self.assertRaises(ImageUploadTooLarge):
+            self.handler.handle_raw_input(None, {}, 2**20, b"")
+
+        with self.assertRaises(ImageUploadTooLarge):
+            self.handler.receive_data_chunk(b"x" * 101, 0)
+
+    @override_settings(PLAY_IMAGE_SPOOL_SIZE=64)
+    def test_spools_large_upload_to_disk(self):
+        self.handler.new_file("image", "poster.png", "image/png", None)
+        data = image_bytes(size=(64, 64), fmt="PNG")
+        self.assertGreater(len(data), 64)
+        self.handler.receive_data_chunk(data, 0)
+        upload = self.handler.file_complete(len(data))
+
+        self.assertTrue(upload.file._rolled)
+        self.assertEqual(upload.read(), data)
+
+
+class PlayImageStreamedUploadTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            "admin@test.com", "password"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.play = create_play()
+
+    def tearDown(self):
+        self.play.refresh_from_db()
+        self.play.image.delete()
+
+    def upload(self, data, name="poster.jpg"):
+        return self.client.post(
+            image_upload_url(self.play.id),
+            {"image": SimpleUploadedFile(name, data)},
+            format="multipart",
+        )
+
+    def test_upload_valid_image(self):
+        response = self.upload(image_bytes())
+        self.play.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.play.image.name.endswith(".jpg"))
+
+    @override_settings(PLAY_IMAGE_MAX_DIMENSION=50)
+    def test_upload_too_wide_image(self):
+        response = self.upload(image_bytes(size=(51, 10)))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("image", response.data)
+
+    @override_settings(PLAY_IMAGE_MAX_UPLOAD_SIZE=1024)
+    def test_upload_too_large_body(self):
+        response = self.upload(image_bytes() + b"\0" * 2**17)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+
+    def test_upload_not_an_image(self):
+        response = self.upload(b"plain text", name="poster.txt")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("image", response.data)
+
+    def test_upload_image_with_other_extension(self):
+        data = image_bytes(fmt="PNG") + b"<script>alert(1)</script>"
+
+        for name in ("poster.html", "poster.jpg", "poster"):
+            response = self.upload(data, name=name)
+
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+            self.assertIn("image", response.data)
+        self.play.refresh_from_db()
+        self.assertFalse(self.play.image)
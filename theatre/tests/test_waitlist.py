@@ -0,0 +1,177 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.models import Job, Reservation, SeatHold, Ticket, WaitlistEntry
+from theatre.tasks import offer_waitlist_seats, send_waitlist_offer
+from theatre.tests.tests_api.test_helpers import (
+    create_performance,
+    create_theatre_hall,
+)
+from theatre.waitlist import offer_seats
+
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+def waitlist_url(performance_id):
+    return reverse("theatre:performance-waitlist", args=[performance_id])
+
+
+class WaitlistTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.owner, self.first, self.second = [
+            get_user_model().objects.create_user(
+                email=f"{name}@test.com", password="test_password"
+            )
+            for name in ("owner", "first", "second")
+        ]
+        self.performance = create_performance(
+            theatre_hall=create_theatre_hall(rows=1, seats_in_row=2)
+        )
+        reservation = Reservation.objects.create(user=self.owner)
+        self.tickets = [
+            Ticket.objects.create(
+                reservation=reservation,
+                row=1,
+                seat=seat,
+                performance=self.performance,
+            )
+            for seat in (1, 2)
+        ]
+        self.join(self.first)
+        self.join(self.second)
+
+    def join(self, user, seats=1):
+        self.client.force_authenticate(user)
+        return self.client.post(
+            waitlist_url(self.performance.id), {"seats": seats}
+        )
+
+    def entry(self, user):
+        return WaitlistEntry.objects.get(user=user)
+
+    def release_seat(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tickets.pop(0).delete()
+        for job in Job.objects.filter(
+            name="theatre.offer_waitlist_seats",
+            status=Job.Status.QUEUED,
+            run_at__lte=timezone.now(),
+        ):
+            offer_waitlist_seats(**job.payload)
+            job.status = Job.Status.DONE
+            job.save()
+
+    def book(self, user, seat):
+        self.client.force_authenticate(user)
+        return self.client.post(
+            RESERVATION_URL,
+            {"tickets": [
+                {"row": 1, "seat": seat, "performance": self.performance.id}
+            ]},
+            format="json",
+        )
+
+    def test_join_places_users_in_line(self):
+        self.client.force_authenticate(self.second)
+
+        response = self.client.get(waitlist_url(self.performance.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "waiting")
+        self.assertEqual(response.data["position"], 2)
+
+    def test_join_is_refused(self):
+        self.assertEqual(
+            self.join(self.first).status_code, status.HTTP_400_BAD_REQUEST
+        )
+        other = create_performance()
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(waitlist_url(other.id), {"seats": 1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_released_seat_is_held_for_head_of_line(self):
+        self.release_seat()
+
+        entry = self.entry(self.first)
+        self.assertEqual(entry.status, WaitlistEntry.Status.OFFERED)
+        self.assertEqual(
+            list(entry.holds.values_list("row", "seat")), [(1, 1)]
+        )
+        self.assertEqual(
+            self.book(self.second, 1).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.client.force_authenticate(self.second)
+        response = self.client.get(waitlist_url(self.performance.id))
+        self.assertEqual(response.data["position"], 1)
+
+        self.assertEqual(
+            self.book(self.first, 1).status_code, status.HTTP_201_CREATED
+        )
+        self.assertEqual(
+            self.entry(self.first).status, WaitlistEntry.Status.BOOKED
+        )
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_lapsed_offer_passes_to_next_in_line(self):
+        self.release_seat()
+        # The expiry job is queued for the end of the hold.
+        expiry = Job.objects.get(
+            name="theatre.offer_waitlist_seats", status=Job.Status.QUEUED
+        )
+        self.assertEqual(
+            expiry.run_at, self.entry(self.first).offer_expires_at
+        )
+        WaitlistEntry.objects.filter(user=self.first).update(
+            offer_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        SeatHold.objects.update(expires_at=timezone.now())
+
+        self.assertEqual(offer_seats(self.performance.id), 1)
+
+        self.assertEqual(
+            self.entry(self.first).status, WaitlistEntry.Status.EXPIRED
+        )
+        self.assertEqual(
+            self.entry(self.second).status, WaitlistEntry.Status.OFFERED
+        )
+
+    def test_leaving_with_an_offer_passes_it_on(self):
+        self.release_seat()
+        self.client.force_authenticate(self.first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(waitlist_url(self.performance.id))
+        offer_seats(self.performance.id)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            self.entry(self.second).status, WaitlistEntry.Status.OFFERED
+        )
+
+    def test_offer_waits_for_enough_seats(self):
+        WaitlistEntry.objects.filter(user=self.first).update(seats=2)
+
+        self.release_seat()
+
+        self.assertEqual(
+            self.entry(self.first).status, WaitlistEntry.Status.WAITING
+        )
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_offer_email(self):
+        self.release_seat()
+
+        send_waitlist_offer(entry_id=self.entry(self.first).id)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["first@test.com"])
+        self.assertIn("row 1, seat 1", mail.outbox[0].body)
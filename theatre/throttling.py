@@ -0,0 +1,225 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import ErrorDetail, Throttled
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+
+@cache
+def parse_rate(rate: str) -> float:
+    """Tokens per second of a "number/period" rate, like DRF throttles."""
+    count, seconds = SimpleRateThrottle.parse_rate(None, rate)
+    return count / seconds
+
+
+class InMemoryBucketStore:
+    """
+    Token buckets and waiting room slots held by this process. Fine for a
+    single worker; several workers need a shared store with the same
+    methods. Each table keeps its `max_keys` most recently used keys.
+    """
+
+    max_keys = 100_000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+        self._rooms = OrderedDict()
+        self._slots = OrderedDict()
+
+    def take(self, key, rate: float, burst: int, now: float) -> float:
+        """
+        Take a token from the `key` bucket, refilled at `rate` tokens per
+        second up to `burst`. Returns 0 when a token was taken, otherwise
+        the seconds until the next one.
+        """
+        return self.take_all([(key, rate, burst)], now)
+
+    def take_all(self, buckets, now: float) -> float:
+        """
+        Take a token from every (key, rate, burst) bucket, or from none of
+        them when one is empty. Returns 0 when the tokens were taken,
+        otherwise the seconds until every bucket has one.
+        """
+        with self._lock:
+            levels, wait = self._levels(buckets, now)
+            if wait:
+                return wait
+            for key, _, _, tokens in levels:
+                self._store(self._buckets, key, (tokens - 1, now))
+            return 0.0
+
+    def peek(self, buckets, now: float) -> float:
+        """Like `take_all`, without taking any token."""
+        with self._lock:
+            return self._levels(buckets, now)[1]
+
+    def _levels(self, buckets, now: float) -> tuple[list, float]:
+        """Refilled token counts of `buckets` and the wait for all of them."""
+        levels, wait = [], 0.0
+        for key, rate, burst in buckets:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            levels.append((key, rate, burst, tokens))
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) / rate)
+        return levels, wait
+
+    def admit(self, room, member, interval: float, ttl: float, now: float):
+        """
+        The time `member` is admitted to `room`. Newcomers get the next
+        slot, `interval` seconds after the previous one; a slot is kept
+        until `ttl` seconds after it opened.
+        """
+        with self._lock:
+            admit_at = self._slots.get((room, member))
+            if admit_at is not None and admit_at + ttl > now:
+                return admit_at
+            admit_at = max(now, self._rooms.get(room, now))
+            self._store(self._rooms, room, admit_at + interval)
+            self._store(self._slots, (room, member), admit_at)
+            return admit_at
+
+    def _store(self, entries: OrderedDict, key, value) -> None:
+        """Set `key` as the most recent entry, evicting the oldest ones."""
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.max_keys:
+            entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._rooms.clear()
+            self._slots.clear()
+
+
+@cache
+def _load_store(path: str):
+    return import_string(path)()
+
+
+def get_store():
+    return _load_store(settings.BOOKING_THROTTLE_STORE)
+
+
+def _performance_id(value) -> int | None:
+    """A positive integer id from request data, or None."""
+    if isinstance(value, str) and value.isascii() and value.isdigit():
+        value = int(value) if len(value) <= 18 else None
+    if type(value) is int and value > 0:
+        return value
+    return None
+
+
+def booked_performances(request, view) -> set:
+    """
+    Ids of the performances a booking request is about, at most
+    BOOKING_THROTTLE_MAX_PERFORMANCES of them. The throttle runs before
+    the serializer, so anything but an integer id is left for it to reject.
+    """
+    if view.action == "retrieve":
+        values = [view.kwargs.get(view.lookup_field)]
+    else:
+        tickets = None
+        if isinstance(request.data, dict):
+            tickets = request.data.get("tickets")
+        if not isinstance(tickets, list):
+            return set()
+        values = (
+            ticket.get("performance")
+            for ticket in tickets
+            if isinstance(ticket, dict)
+        )
+    performance_ids = set()
+    for value in values:
+        performance_id = _performance_id(value)
+        if performance_id is None:
+            continue
+        performance_ids.add(performance_id)
+        if (
+            len(performance_ids)
+            >= settings.BOOKING_THROTTLE_MAX_PERFORMANCES
+        ):
+            break
+    return performance_ids
+
+
+class InWaitingRoom(Throttled):
+    default_detail = "You are in the waiting room for this performance."
+    default_code = "waiting_room"
+
+    def __init__(self, wait, position):
+        super().__init__(wait)
+        self.detail = {
+            "detail": ErrorDetail(self.default_detail, self.default_code),
+            "position": position,
+            "retry_after": self.wait,
+        }
+
+
+class BookingThrottle(BaseThrottle):
+    """
+    Token buckets from BOOKING_RATE_LIMITS, one per user and one per
+    performance booked, and the optional waiting room, which admits users
+    into booking a performance at BOOKING_WAITING_ROOM_RATE, first come
+    first served. Tokens are only taken when every bucket has one, so a
+    rejected request costs nothing.
+    """
+
+    timer = time.monotonic
+
+    def __init__(self):
+        self.wait_for = None
+
+    def allow_request(self, request, view):
+        store = get_store()
+        now = self.timer()
+        limits = settings.BOOKING_RATE_LIMITS
+        rate, burst = limits["user"]
+        buckets = [(f"user:{request.user.pk}", parse_rate(rate), burst)]
+        self.wait_for = store.peek(buckets, now)
+        if self.wait_for:
+            return False
+
+        performance_ids = booked_performances(request, view)
+        if settings.BOOKING_WAITING_ROOM_RATE is not None:
+            self.wait_in_room(request.user.pk, performance_ids, store, now)
+
+        rate, burst = limits["performance"]
+        rate = parse_rate(rate)
+        buckets.extend(
+            (f"performance:{performance_id}", rate, burst)
+            for performance_id in performance_ids
+        )
+        self.wait_for = store.take_all(buckets, now)
+        return not self.wait_for
+
+    @staticmethod
+    def wait_in_room(user_id, performance_ids, store, now) -> None:
+        rate = parse_rate(settings.BOOKING_WAITING_ROOM_RATE)
+        admit_at = max(
+            (
+                store.admit(
+                    f"room:{performance_id}",
+                    user_id,
+                    1 / rate,
+                    settings.BOOKING_ADMISSION_TTL,
+                    now,
+                )
+                for performance_id in performance_ids
+            ),
+            default=now,
+        )
+        if admit_at > now:
+            raise InWaitingRoom(
+                admit_at - now, math.ceil((admit_at - now) * rate)
+            )
+
+    def wait(self):
+        return self.wait_for
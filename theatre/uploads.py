@@ -0,0 +1,148 @@
+import os
+import warnings
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from PIL import Image
+from rest_framework import serializers
+from rest_framework.exceptions import APIException
+
+
+class ImageUploadTooLarge(APIException):
+    status_code = 413
+    default_detail = "Uploaded image is too large."
+    default_code = "image_too_large"
+
+
+def image_error(message: str) -> serializers.ValidationError:
+    return serializers.ValidationError({"image": [message]})
+
+
+class ValidatedImageUpload(UploadedFile):
+    """Uploaded image whose header was checked while it was streamed in."""
+
+    def __init__(self, *args, image_info: dict, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.image_info = image_info
+
+
+class ValidatingImageUploadHandler(FileUploadHandler):
+    """
+    Stream image uploads into a spooled temporary file, reading format and
+    dimensions from the first chunks with Pillow's lazy header parser.
+    Oversized bodies, unsupported formats and decompression bombs are
+    rejected before the rest of the request body is read.
+    """
+
+    def handle_raw_input(
+        self, input_data, META, content_length, boundary, encoding=None
+    ):
+        # Allow a little room for the multipart envelope.
+        if content_length > settings.PLAY_IMAGE_MAX_UPLOAD_SIZE + 2**16:
+            raise ImageUploadTooLarge()
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file = SpooledTemporaryFile(
+            max_size=settings.PLAY_IMAGE_SPOOL_SIZE
+        )
+        self.header = b""
+        self.image_info = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.PLAY_IMAGE_MAX_UPLOAD_SIZE:
+            self.file.close()
+            raise ImageUploadTooLarge()
+
+        if self.image_info is None:
+            self.header += raw_data
+            self.image_info = self.inspect_header(final=False)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        if self.image_info is None:
+            self.image_info = self.inspect_header(final=True)
+        self.header = b""
+        self.file.seek(0)
+        return ValidatedImageUpload(
+            file=self.file,
+            name=self.file_name,
+            content_type=Image.MIME.get(self.image_info["format"]),
+            size=file_size,
+            charset=self.charset,
+            content_type_extra=self.content_type_extra,
+            image_info=self.image_info,
+        )
+
+    def inspect_header(self, final: bool) -> dict | None:
+        """
+        Return the format and size of the buffered header, or None when
+        more data is needed to tell.
+        """
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+                with Image.open(BytesIO(self.header)) as image:
+                    info = {
+                        "format": image.format,
+                        "width": image.width,
+                        "height": image.height,
+                    }
+        except Image.DecompressionBombError:
+            self.file.close()
+            raise image_error("Image dimensions are too large.")
+        except OSError:
+            header_size = len(self.header)
+            if not final and header_size < settings.PLAY_IMAGE_HEADER_SIZE:
+                return None
+            self.file.close()
+            raise image_error(
+                "Upload a valid image. The file you uploaded was either "
+                "not an image or a corrupted image."
+            )
+
+        self.validate(info)
+        return info
+
+    def validate(self, info: dict) -> None:
+        error = None
+        if info["format"] not in settings.PLAY_IMAGE_ALLOWED_FORMATS:
+            error = (
+                "Unsupported image format. Allowed formats: "
+                + ", ".join(settings.PLAY_IMAGE_ALLOWED_FORMATS)
+            )
+        elif (
+            max(info["width"], info["height"])
+            > settings.PLAY_IMAGE_MAX_DIMENSION
+            or info["width"] * info["height"] > settings.PLAY_IMAGE_MAX_PIXELS
+        ):
+            error = "Image dimensions are too large."
+
+        if error is not None:
+            self.file.close()
+            raise image_error(error)
+
+
+class StreamedImageField(serializers.ImageField):
+    """
+    Image field that trusts the header checks of
+    `ValidatingImageUploadHandler` instead of decoding the image again;
+    full decoding happens when the variants are built in the background.
+    The file name must carry an extension of the detected format, since
+    the stored file keeps it and is served by it.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, ValidatedImageUpload):
+            return super().to_internal_value(data)
+        image_format = data.image_info["format"]
+        extension = os.path.splitext(data.name or "")[1].lower()
+        if Image.registered_extensions().get(extension) != image_format:
+            raise serializers.ValidationError(
+                f"File extension “{extension.lstrip('.')}” does not match "
+                f"the {image_format} image."
+            )
+        return serializers.FileField.to_internal_value(self, data)
@@ -7,7 +7,12 @@ from theatre.views import (
     ActorViewSet,
     PlayViewSet,
     PerformanceViewSet,
-    ReservationViewSet
+    ReservationViewSet,
+    ArchivedPerformanceViewSet,
+    AutocompleteViewSet,
+    ScheduleViewSet,
+    SalesExportViewSet,
+    SalesAnalyticsViewSet,
 )
 
 app_name = "theatre"
@@ -19,6 +24,17 @@ router.register("theatre-halls", TheatreHallViewSet)
 router.register("plays", PlayViewSet)
 router.register("performances", PerformanceViewSet)
 router.register("reservations", ReservationViewSet)
+router.register(
+    "archive/performances",
+    ArchivedPerformanceViewSet,
+    basename="archived-performance",
+)
+router.register(
+    "autocomplete", AutocompleteViewSet, basename="autocomplete"
+)
+router.register("schedule", ScheduleViewSet, basename="schedule")
+router.register("exports", SalesExportViewSet, basename="export")
+router.register("analytics", SalesAnalyticsViewSet, basename="analytics")
 
 urlpatterns = [
     path("", include(router.urls)),
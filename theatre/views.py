@@ -1,19 +1,63 @@
-from datetime import datetime
-
-from django.db.models import F, Count
-from drf_spectacular.utils import extend_schema, OpenApiParameter
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    F,
+    Count,
+    FilteredRelation,
+    Prefetch,
+    Q,
+    prefetch_related_objects,
+)
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    OpenApiParameter,
+)
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 
+from theatre.analytics import (
+    hall_occupancy_report,
+    performance_report,
+    play_sales_report,
+)
+from theatre.autocomplete import get_index
+from theatre.cancellation import cancel_tickets
+from theatre.exports import (
+    CONTENT_TYPES,
+    CSV,
+    RESERVATION_COLUMNS,
+    TICKET_COLUMNS,
+    reservation_rows,
+    stream_export,
+    ticket_rows,
+)
+from theatre.history import reservation_history
+from theatre.mixins import (
+    BookingThrottleMixin,
+    IdempotentCreateModelMixin,
+    ReplicaReadMixin,
+    StreamingListModelMixin,
+)
 from theatre.models import (
+    ArchivedPerformance,
+    ArchivedTicket,
     TheatreHall,
     Actor,
     Genre,
     Reservation,
+    Ticket,
     Play,
-    Performance
+    Performance,
+    WaitlistEntry,
 )
 from theatre.serializers import (
     GenreSerializer,
@@ -26,13 +70,34 @@ from theatre.serializers import (
     PerformanceListSerializer,
     PerformanceRetrieveSerializer,
     ReservationSerializer,
-    ReservationListSerializer, PlayImageSerializer
+    ReservationListSerializer, PlayImageSerializer,
+    ReservationSummarySerializer,
+    AutocompleteSerializer,
+    ScheduleSerializer,
+    PerformanceBulkScheduleSerializer,
+    PerformanceConflictSerializer,
+    PerformanceBulkScheduleResultSerializer,
+    PerformanceSalesReportSerializer,
+    PlaySalesReportSerializer,
+    HallOccupancyReportSerializer,
+    ArchivedPerformanceListSerializer,
+    ArchivedPerformanceRetrieveSerializer,
+    ArchivedTicketSerializer,
+    WaitlistEntrySerializer,
 )
+from theatre.schedule import calendar
+from theatre.scheduling import bulk_schedule
+from theatre.search import search_plays
+from theatre.summary import reservation_summary
+from theatre.waitlist import ACTIVE, held_seat_count, leave
+from theatre.tasks import build_play_image_variants
+from theatre.uploads import ValidatingImageUploadHandler
 
 
 class GenreViewSet(
+    ReplicaReadMixin,
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
+    StreamingListModelMixin,
     viewsets.GenericViewSet,
 ):
     queryset = Genre.objects.all()
@@ -40,8 +105,9 @@ class GenreViewSet(
 
 
 class ActorViewSet(
+    ReplicaReadMixin,
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
+    StreamingListModelMixin,
     viewsets.GenericViewSet,
 ):
     queryset = Actor.objects.all()
@@ -49,8 +115,9 @@ class ActorViewSet(
 
 
 class TheatreHallViewSet(
+    ReplicaReadMixin,
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
+    StreamingListModelMixin,
     viewsets.GenericViewSet,
 ):
     queryset = TheatreHall.objects.all()
@@ -59,12 +126,15 @@ class TheatreHallViewSet(
 
 
 class PlayViewSet(
-    mixins.ListModelMixin,
+    ReplicaReadMixin,
+    StreamingListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     viewsets.GenericViewSet,
 ):
-    queryset = Play.objects.prefetch_related("actors", "genres")
+    queryset = Play.objects.defer("search_vector").prefetch_related(
+        "actors", "genres"
+    )
     serializer_class = PlaySerializer
 
     def get_serializer_class(self):
@@ -84,12 +154,16 @@ class PlayViewSet(
         return [int(str_id) for str_id in queryset.split(",")]
 
     def get_queryset(self):
+        search = self.request.query_params.get("search")
         title = self.request.query_params.get("title")
         genres = self.request.query_params.get("genres")
         actors = self.request.query_params.get("actors")
 
         queryset = self.queryset
 
+        if search:
+            queryset = search_plays(queryset, search)
+
         if title:
             queryset = queryset.filter(title__icontains=title)
 
@@ -110,15 +184,26 @@ class PlayViewSet(
         permission_classes=[IsAdminUser],
     )
     def upload_image(self, request, pk=None):
+        request.upload_handlers = [ValidatingImageUploadHandler(request)]
         play = self.get_object()
         serializer = self.get_serializer(play, data=request.data)
         if serializer.is_valid():
             serializer.save()
+            build_play_image_variants.enqueue(play_id=play.id)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @extend_schema(parameters=[
+        OpenApiParameter(
+            "search",
+            type=str,
+            description=(
+                "Full-text search over title, description, actors and "
+                "genres, best matches first; the words may be prefixes "
+                "(ex. ?search=hamlet shake)"
+            ),
+        ),
         OpenApiParameter(
             "title",
             type=str,
@@ -140,35 +225,73 @@ class PlayViewSet(
         return super().list(request, *args, **kwargs)
 
 
+@extend_schema_view(
+    create=extend_schema(responses={
+        201: PerformanceSerializer, 409: PerformanceConflictSerializer
+    }),
+    update=extend_schema(responses={
+        200: PerformanceSerializer, 409: PerformanceConflictSerializer
+    }),
+    partial_update=extend_schema(responses={
+        200: PerformanceSerializer, 409: PerformanceConflictSerializer
+    }),
+)
 class PerformanceViewSet(
-    viewsets.ModelViewSet
+    BookingThrottleMixin,
+    ReplicaReadMixin,
+    StreamingListModelMixin,
+    viewsets.ModelViewSet,
 ):
     queryset = (
         Performance.objects.all()
         .select_related("play", "theatre_hall")
-        .annotate(
-            tickets_available=(
-                F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
-                - Count("tickets")
-            )
-        )
+        .defer("play__search_vector")
     )
     serializer_class = PerformanceSerializer
+    booking_actions = ("retrieve",)
+    # Seat maps are read from the primary, where seats are booked.
+    replica_actions = ("list",)
 
     def get_queryset(self):
         date = self.request.query_params.get("date")
         play_id_str = self.request.query_params.get("play")
         queryset = self.queryset
+        # Tickets are partitioned by show time; joining on it lets the
+        # planner skip the partitions of other months.
+        sold = Q(tickets__show_time=F("show_time"))
 
         if date:
             date = datetime.strptime(date, "%Y-%m-%d").date()
-            queryset = queryset.filter(show_time__date=date)
+            start = timezone.make_aware(datetime.combine(date, time.min))
+            end = start + timedelta(days=1)
+            queryset = queryset.filter(show_time__gte=start, show_time__lt=end)
+            sold &= Q(
+                tickets__show_time__gte=start, tickets__show_time__lt=end
+            )
 
         if play_id_str:
             play_ids = [int(str_id) for str_id in play_id_str.split(",")]
             queryset = queryset.filter(play_id__in=play_ids)
 
-        return queryset.distinct()
+        return queryset.annotate(
+            sold_tickets=FilteredRelation("tickets", condition=sold),
+            tickets_available=(
+                F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
+                - Count("sold_tickets")
+            ),
+        ).distinct()
+
+    def get_object(self):
+        performance = super().get_object()
+        if self.action == "retrieve":
+            # The show time confines the seat map to one ticket partition.
+            prefetch_related_objects([performance], Prefetch(
+                "tickets",
+                queryset=Ticket.objects.filter(
+                    show_time=performance.show_time
+                ),
+            ))
+        return performance
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -179,6 +302,96 @@ class PerformanceViewSet(
 
         return PerformanceSerializer
 
+    @extend_schema(
+        request=PerformanceBulkScheduleSerializer,
+        responses={
+            201: PerformanceBulkScheduleResultSerializer,
+            200: PerformanceBulkScheduleResultSerializer,
+            409: PerformanceBulkScheduleResultSerializer,
+        },
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk-schedule",
+        permission_classes=[IsAdminUser],
+    )
+    def bulk_schedule(self, request):
+        """Schedule a recurring run of performances in one request"""
+        serializer = PerformanceBulkScheduleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        result = bulk_schedule(
+            data["play"],
+            data["theatre_hall"],
+            data["starts"],
+            timedelta(minutes=data["duration"]),
+            dry_run=data["dry_run"],
+        )
+
+        if data["dry_run"]:
+            response_status = status.HTTP_200_OK
+        elif result["conflicts"]:
+            response_status = status.HTTP_409_CONFLICT
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response(result, status=response_status)
+
+    @extend_schema(methods=["GET"], responses=WaitlistEntrySerializer)
+    @extend_schema(
+        methods=["POST"],
+        request=WaitlistEntrySerializer,
+        responses={201: WaitlistEntrySerializer},
+    )
+    @extend_schema(methods=["DELETE"], request=None, responses={204: None})
+    @action(
+        methods=["GET", "POST", "DELETE"],
+        detail=True,
+        permission_classes=[IsAuthenticated],
+    )
+    def waitlist(self, request, pk=None):
+        """Join, check or leave the waitlist of a sold out performance"""
+        performance = self.get_object()
+        entry = (
+            WaitlistEntry.objects.filter(
+                performance=performance, user=request.user, status__in=ACTIVE
+            )
+            .prefetch_related("holds")
+            .first()
+        )
+
+        if request.method == "POST":
+            if entry is not None:
+                raise ValidationError("You are already on the waitlist.")
+            serializer = WaitlistEntrySerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            free = (
+                performance.tickets_available
+                - held_seat_count(performance.id)
+            )
+            if free >= serializer.validated_data["seats"]:
+                raise ValidationError(
+                    "Tickets for this performance are still available."
+                )
+            try:
+                with transaction.atomic():
+                    entry = serializer.save(
+                        performance=performance, user=request.user
+                    )
+            except IntegrityError:
+                raise ValidationError("You are already on the waitlist.")
+            return Response(
+                WaitlistEntrySerializer(entry).data,
+                status=status.HTTP_201_CREATED,
+            )
+
+        if entry is None:
+            raise NotFound("You are not on the waitlist.")
+        if request.method == "DELETE":
+            leave(entry)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(WaitlistEntrySerializer(entry).data)
+
     @extend_schema(parameters=[
         OpenApiParameter(
             "date",
@@ -197,19 +410,25 @@ class PerformanceViewSet(
 
 
 class ReservationViewSet(
-    mixins.CreateModelMixin,
-    mixins.ListModelMixin,
+    BookingThrottleMixin,
+    IdempotentCreateModelMixin,
+    ReplicaReadMixin,
+    StreamingListModelMixin,
     viewsets.GenericViewSet,
 ):
-    queryset = Reservation.objects.prefetch_related(
-        "tickets__performance__play", "tickets__performance__theatre_hall"
-    )
+    queryset = Reservation.objects.all()
     serializer_class = ReservationSerializer
     permission_classes = (IsAuthenticated, )
+    booking_actions = ("create",)
+    replica_actions = ("list", "archived")
+    lookup_value_regex = r"\d+"
 
     def get_queryset(self):
-        queryset = self.queryset
-        return queryset.filter(user=self.request.user)
+        return reservation_history(
+            self.request.user,
+            _param_to_date(self.request, "from"),
+            _param_to_date(self.request, "to"),
+        )
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -219,3 +438,373 @@ class ReservationViewSet(
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "from",
+                type=str,
+                description="First reservation day (ex. ?from=2025-07-01)",
+            ),
+            OpenApiParameter(
+                "to",
+                type=str,
+                description="Last reservation day (ex. ?to=2025-07-31)",
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        """Get the user's reservation history"""
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(responses=ReservationSummarySerializer)
+    @action(methods=["GET"], detail=False)
+    def summary(self, request):
+        """Upcoming and past ticket counts, next performance and plays"""
+        return Response(
+            ReservationSummarySerializer(
+                reservation_summary(request.user.id)
+            ).data
+        )
+
+    @extend_schema(responses=ArchivedTicketSerializer(many=True))
+    @action(methods=["GET"], detail=False)
+    def archived(self, request):
+        """The user's tickets for archived performances, newest first"""
+        tickets = (
+            ArchivedTicket.objects.filter(user=request.user)
+            .select_related("performance__play", "performance__theatre_hall")
+            .order_by("-sold_at", "pk")
+        )
+        page = self.paginate_queryset(tickets)
+        serializer = ArchivedTicketSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def get_tickets(self, **lookups):
+        """The user's tickets matching `lookups`, or 404 if none."""
+        tickets = Ticket.objects.filter(
+            reservation__user=self.request.user, **lookups
+        )
+        if not tickets.exists():
+            raise NotFound()
+        return tickets
+
+    @extend_schema(request=None, responses={204: None})
+    @action(methods=["POST"], detail=True)
+    def cancel(self, request, pk=None):
+        """Cancel a whole reservation and release its seats"""
+        cancel_tickets(self.get_tickets(reservation_id=pk))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @extend_schema(request=None, responses={204: None})
+    @action(
+        methods=["POST"],
+        detail=True,
+        url_path=r"tickets/(?P<ticket_id>\d+)/cancel",
+    )
+    def cancel_ticket(self, request, pk=None, ticket_id=None):
+        """Cancel one ticket; a reservation left empty is removed"""
+        cancel_tickets(self.get_tickets(reservation_id=pk, pk=ticket_id))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ArchivedPerformanceViewSet(
+    ReplicaReadMixin, viewsets.ReadOnlyModelViewSet
+):
+    """
+    Performances moved out of the live tables by `archive_performances`.
+    Reads go to the archive tables, apart from the live performance list.
+    """
+
+    queryset = ArchivedPerformance.objects.select_related(
+        "play", "theatre_hall"
+    ).defer("play__search_vector")
+    serializer_class = ArchivedPerformanceListSerializer
+
+    def get_queryset(self):
+        queryset = self.queryset
+        date = _param_to_date(self.request, "date")
+        play_id_str = self.request.query_params.get("play")
+
+        if date:
+            queryset = queryset.filter(date=date)
+
+        if play_id_str:
+            play_ids = [int(str_id) for str_id in play_id_str.split(",")]
+            queryset = queryset.filter(play_id__in=play_ids)
+
+        if self.action == "retrieve":
+            queryset = queryset.prefetch_related("tickets")
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == "retrieve":
+            return ArchivedPerformanceRetrieveSerializer
+
+        return ArchivedPerformanceListSerializer
+
+    @extend_schema(parameters=[
+        OpenApiParameter(
+            "date",
+            type=str,
+            description="Filter by performance date (ex. ?date=2024-07-24)",
+        ),
+        OpenApiParameter(
+            "play",
+            type=str,
+            description="Filter by performance play id (ex. ?play=2,4)",
+        )
+    ])
+    def list(self, request, *args, **kwargs):
+        """Get list of archived performances"""
+        return super().list(request, *args, **kwargs)
+
+
+class AutocompleteViewSet(viewsets.ViewSet):
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                type=str,
+                description=(
+                    "Words typed so far; each must start a word of the play "
+                    "title or actor name (ex. ?q=ham)"
+                ),
+            ),
+            OpenApiParameter(
+                "limit",
+                type=int,
+                description="Maximum number of matches (ex. ?limit=5)",
+            ),
+        ],
+        responses=AutocompleteSerializer,
+    )
+    def list(self, request):
+        """Complete play titles and actor names"""
+        try:
+            limit = int(
+                request.query_params.get("limit", settings.AUTOCOMPLETE_LIMIT)
+            )
+        except ValueError:
+            limit = settings.AUTOCOMPLETE_LIMIT
+        limit = max(1, min(limit, settings.AUTOCOMPLETE_MAX_LIMIT))
+
+        index = get_index()
+        return Response({
+            "version": index.version,
+            "results": index.search(request.query_params.get("q", ""), limit),
+        })
+
+
+def _param_to_date(request, name, default=None):
+    value = request.query_params.get(name)
+    if not value:
+        return default
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValidationError({name: "Use the YYYY-MM-DD format."})
+
+
+def _param_to_id(request, name):
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: "Must be an id."})
+
+
+class ScheduleViewSet(ReplicaReadMixin, viewsets.ViewSet):
+    replica_actions = ("list",)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "from",
+                type=str,
+                description=(
+                    "First day, defaults to today (ex. ?from=2025-07-01)"
+                ),
+            ),
+            OpenApiParameter(
+                "to",
+                type=str,
+                description="Last day, inclusive (ex. ?to=2025-07-31)",
+            ),
+        ],
+        responses=ScheduleSerializer,
+    )
+    def list(self, request):
+        """Get performances grouped by day and play"""
+        date_from = _param_to_date(
+            request, "from", timezone.localdate()
+        )
+        date_to = _param_to_date(
+            request,
+            "to",
+            date_from + timedelta(days=settings.SCHEDULE_DEFAULT_DAYS - 1),
+        )
+        if date_to < date_from:
+            raise ValidationError({"to": "Must not be before `from`."})
+        if (date_to - date_from).days >= settings.SCHEDULE_MAX_DAYS:
+            raise ValidationError(
+                {"to": f"At most {settings.SCHEDULE_MAX_DAYS} days at once."}
+            )
+
+        return Response({
+            "date_from": date_from,
+            "date_to": date_to,
+            "days": calendar(date_from, date_to),
+        })
+
+
+EXPORT_PARAMETERS = [
+    OpenApiParameter(
+        "output",
+        type=str,
+        enum=list(CONTENT_TYPES),
+        description="File format, csv by default (ex. ?output=jsonl)",
+    ),
+    OpenApiParameter(
+        "from",
+        type=str,
+        description="First reservation day (ex. ?from=2025-07-01)",
+    ),
+    OpenApiParameter(
+        "to",
+        type=str,
+        description="Last reservation day, inclusive (ex. ?to=2025-07-31)",
+    ),
+    OpenApiParameter(
+        "performance",
+        type=int,
+        description="Only this performance (ex. ?performance=12)",
+    ),
+]
+
+
+class SalesExportViewSet(viewsets.ViewSet):
+    permission_classes = (IsAdminUser, )
+
+    def _export(self, request, name, columns, rows):
+        fmt = request.query_params.get("output", CSV)
+        if fmt not in CONTENT_TYPES:
+            raise ValidationError(
+                {"output": f"Choose one of: {', '.join(CONTENT_TYPES)}."}
+            )
+        date_from = _param_to_date(request, "from")
+        date_to = _param_to_date(request, "to")
+        if date_from and date_to and date_to < date_from:
+            raise ValidationError({"to": "Must not be before `from`."})
+        performance_id = _param_to_id(request, "performance")
+
+        response = StreamingHttpResponse(
+            stream_export(
+                columns, rows(date_from, date_to, performance_id), fmt
+            ),
+            content_type=CONTENT_TYPES[fmt],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{name}.{fmt}"'
+        )
+        return response
+
+    @extend_schema(
+        parameters=EXPORT_PARAMETERS, responses={200: OpenApiTypes.BINARY}
+    )
+    @action(methods=["GET"], detail=False)
+    def tickets(self, request):
+        """Stream sold tickets as CSV or JSON lines"""
+        return self._export(request, "tickets", TICKET_COLUMNS, ticket_rows)
+
+    @extend_schema(
+        parameters=EXPORT_PARAMETERS, responses={200: OpenApiTypes.BINARY}
+    )
+    @action(methods=["GET"], detail=False)
+    def reservations(self, request):
+        """Stream reservations with their ticket count"""
+        return self._export(
+            request, "reservations", RESERVATION_COLUMNS, reservation_rows
+        )
+
+
+def _report_parameters(filter_name, description):
+    return [
+        OpenApiParameter(
+            "from",
+            type=str,
+            description=(
+                f"First day, defaults to {settings.ANALYTICS_DEFAULT_DAYS} "
+                f"days before `to` (ex. ?from=2025-07-01)"
+            ),
+        ),
+        OpenApiParameter(
+            "to",
+            type=str,
+            description="Last day, defaults to today (ex. ?to=2025-07-31)",
+        ),
+        OpenApiParameter(filter_name, type=int, description=description),
+    ]
+
+
+class SalesAnalyticsViewSet(viewsets.ViewSet):
+    """Dashboards read from the sales rollups, never from raw tickets."""
+
+    permission_classes = (IsAdminUser, )
+
+    def _report(self, request, report, filter_name):
+        date_to = _param_to_date(request, "to", timezone.localdate())
+        date_from = _param_to_date(
+            request,
+            "from",
+            date_to - timedelta(days=settings.ANALYTICS_DEFAULT_DAYS - 1),
+        )
+        if date_to < date_from:
+            raise ValidationError({"to": "Must not be before `from`."})
+        if (date_to - date_from).days >= settings.ANALYTICS_MAX_DAYS:
+            raise ValidationError(
+                {"to": f"At most {settings.ANALYTICS_MAX_DAYS} days at once."}
+            )
+
+        return Response({
+            "date_from": date_from,
+            "date_to": date_to,
+            "results": report(
+                date_from, date_to, _param_to_id(request, filter_name)
+            ),
+        })
+
+    @extend_schema(
+        parameters=_report_parameters(
+            "play", "Only this play (ex. ?play=3)"
+        ),
+        responses=PerformanceSalesReportSerializer,
+    )
+    @action(methods=["GET"], detail=False)
+    def performances(self, request):
+        """Tickets sold and occupancy per performance, by show date"""
+        return self._report(request, performance_report, "play")
+
+    @extend_schema(
+        parameters=_report_parameters(
+            "play", "Only this play (ex. ?play=3)"
+        ),
+        responses=PlaySalesReportSerializer,
+    )
+    @action(methods=["GET"], detail=False)
+    def plays(self, request):
+        """Tickets sold per play per day, by reservation date"""
+        return self._report(request, play_sales_report, "play")
+
+    @extend_schema(
+        parameters=_report_parameters(
+            "theatre_hall", "Only this hall (ex. ?theatre_hall=1)"
+        ),
+        responses=HallOccupancyReportSerializer,
+    )
+    @action(methods=["GET"], detail=False)
+    def halls(self, request):
+        """Weekly occupancy per theatre hall"""
+        return self._report(request, hall_occupancy_report, "theatre_hall")
@@ -0,0 +1,189 @@
+import threading
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from theatre.jobs import get_task
+from theatre.models import Performance, SeatHold, Ticket, WaitlistEntry
+
+_pending = threading.local()
+
+ACTIVE = (WaitlistEntry.Status.WAITING, WaitlistEntry.Status.OFFERED)
+
+
+def position(entry: WaitlistEntry) -> int | None:
+    """Place in line, counted on the queue index; None once offered."""
+    if entry.status != WaitlistEntry.Status.WAITING:
+        return None
+    return WaitlistEntry.objects.filter(
+        performance_id=entry.performance_id,
+        status=WaitlistEntry.Status.WAITING,
+        pk__lt=entry.pk,
+    ).count() + 1
+
+
+def held_seat_count(performance_id: int) -> int:
+    return SeatHold.objects.filter(
+        performance_id=performance_id, expires_at__gt=timezone.now()
+    ).count()
+
+
+def free_seats(performance: Performance) -> list[tuple[int, int]]:
+    """Seats neither sold nor held, in row and seat order."""
+    taken = set(
+        Ticket.objects.filter(
+            performance=performance, show_time=performance.show_time
+        )
+        .values_list("row", "seat")
+    )
+    taken.update(
+        SeatHold.objects.filter(performance=performance)
+        .values_list("row", "seat")
+    )
+    hall = performance.theatre_hall
+    return [
+        (row, seat)
+        for row in range(1, hall.rows + 1)
+        for seat in range(1, hall.seats_in_row + 1)
+        if (row, seat) not in taken
+    ]
+
+
+def _expire_offers(performance_id: int, now) -> None:
+    expired = WaitlistEntry.objects.filter(
+        performance_id=performance_id,
+        status=WaitlistEntry.Status.OFFERED,
+        offer_expires_at__lte=now,
+    )
+    SeatHold.objects.filter(entry__in=expired).delete()
+    expired.update(status=WaitlistEntry.Status.EXPIRED)
+
+
+def offer_seats(performance_id: int) -> int:
+    """
+    Expire lapsed offers, then hold free seats for the head of the line
+    until everyone offered is served or the next in line wants more seats
+    than are left. Returns the number of offers made.
+    """
+    with transaction.atomic():
+        # Offers for one performance are made one job at a time.
+        performance = (
+            Performance.objects.select_for_update(of=("self",))
+            .select_related("theatre_hall")
+            .filter(pk=performance_id)
+            .first()
+        )
+        if performance is None:
+            return 0
+        now = timezone.now()
+        _expire_offers(performance_id, now)
+
+        seats = free_seats(performance)
+        expires_at = now + timedelta(seconds=settings.WAITLIST_OFFER_TTL)
+        line = WaitlistEntry.objects.filter(
+            performance_id=performance_id,
+            status=WaitlistEntry.Status.WAITING,
+        ).order_by("pk")
+        offers = 0
+        while seats:
+            entry = line.first()
+            if entry is None or entry.seats > len(seats):
+                break
+            held, seats = seats[:entry.seats], seats[entry.seats:]
+            SeatHold.objects.bulk_create(
+                SeatHold(
+                    entry=entry,
+                    performance_id=performance_id,
+                    row=row,
+                    seat=seat,
+                    expires_at=expires_at,
+                )
+                for row, seat in held
+            )
+            entry.status = WaitlistEntry.Status.OFFERED
+            entry.offer_expires_at = expires_at
+            entry.save(update_fields=["status", "offer_expires_at"])
+            get_task("theatre.waitlist_offer").enqueue(entry_id=entry.id)
+            offers += 1
+        if offers:
+            # Passes the seats on if the offers lapse.
+            get_task("theatre.offer_waitlist_seats").enqueue(
+                run_at=expires_at, performance_id=performance_id
+            )
+        return offers
+
+
+def held_for_others(user, seats) -> list[tuple[int, int, int]]:
+    """The (performance id, row, seat) of `seats` held for other users."""
+    if not seats:
+        return []
+    return list(
+        SeatHold.objects.filter(
+            reduce(or_, (
+                Q(performance_id=performance_id, row=row, seat=seat)
+                for performance_id, row, seat in seats
+            )),
+            expires_at__gt=timezone.now(),
+        )
+        .exclude(entry__user=user)
+        .values_list("performance_id", "row", "seat")
+    )
+
+
+def claim_offers(user, performance_ids) -> None:
+    """
+    Close the user's offers for performances they just booked. Held seats
+    they left unbooked go to the next in line.
+    """
+    offered = WaitlistEntry.objects.filter(
+        user=user,
+        performance_id__in=set(performance_ids),
+        status=WaitlistEntry.Status.OFFERED,
+    )
+    if SeatHold.objects.filter(entry__in=offered).delete()[0]:
+        offered.update(status=WaitlistEntry.Status.BOOKED)
+        mark_seats_released(performance_ids)
+
+
+def leave(entry: WaitlistEntry) -> None:
+    offered = entry.status == WaitlistEntry.Status.OFFERED
+    entry.delete()
+    if offered:
+        mark_seats_released([entry.performance_id])
+
+
+def _flush_pending() -> None:
+    performance_ids = getattr(_pending, "ids", set())
+    _pending.ids = set()
+    if not performance_ids:
+        return
+    waiting = (
+        WaitlistEntry.objects.filter(
+            performance_id__in=performance_ids,
+            status=WaitlistEntry.Status.WAITING,
+        )
+        .order_by()
+        .values_list("performance_id", flat=True)
+        .distinct()
+    )
+    for performance_id in waiting:
+        get_task("theatre.offer_waitlist_seats").enqueue(
+            performance_id=performance_id
+        )
+
+
+def mark_seats_released(performance_ids) -> None:
+    """
+    Offer the seats freed in `performance_ids` to their waitlists once the
+    current transaction commits, with one job per performance that has
+    someone waiting.
+    """
+    if not hasattr(_pending, "ids"):
+        _pending.ids = set()
+    _pending.ids.update(performance_ids)
+    transaction.on_commit(_flush_pending)
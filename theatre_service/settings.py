@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/5.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
+import hashlib
 import os
 from datetime import timedelta
 from pathlib import Path
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "debug_toolbar",
     "drf_spectacular",
     "rest_framework",
@@ -51,11 +53,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "theatre.compression.CompressionMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "theatre.replicas.PrimaryPinMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -94,6 +98,39 @@ DATABASES = {
     }
 }
 
+# Catalog and history reads go to a read replica when
+# POSTGRES_REPLICA_HOSTS lists any (comma separated hosts sharing the
+# primary's name, port and credentials). Writes, transactions, seat maps
+# and the requests of users who wrote in the last
+# DATABASE_REPLICA_PIN_SECONDS (pins are kept in the default cache) stay
+# on the primary. Tests run replicas as mirrors of the primary's test
+# database.
+DATABASE_REPLICAS = []
+
+for number, host in enumerate(
+    filter(None, os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(",")),
+    start=1,
+):
+    DATABASES[f"replica_{number}"] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{number}")
+
+DATABASE_ROUTERS = ["theatre.replicas.PrimaryReplicaRouter"]
+
+DATABASE_REPLICA_PIN_SECONDS = 10
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -131,6 +168,41 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# Response compression
+
+COMPRESSION_MIN_SIZE = 1024
+
+COMPRESSION_LEVELS = {"br": 4, "gzip": 6}
+
+# text/html is left out: admin and browsable API pages carry CSRF tokens
+# next to reflected input, which compression would expose (BREACH).
+COMPRESSION_CONTENT_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/vnd.oai.openapi",
+    "application/xml",
+    "image/svg+xml",
+    "text/css",
+    "text/csv",
+    "text/javascript",
+    "text/plain",
+    "text/xml",
+    "text/yaml",
+)
+
+# Text assets in these directories are precompressed by `compress_static`
+# and served as .br/.gz variants without compressing per request. STATIC_URL
+# is routed to `theatre.compression.serve_static`, which reads STATIC_ROOT, so
+# run the server with `runserver --nostatic` to keep the staticfiles handler
+# from answering first with the uncompressed files.
+PRECOMPRESS_DIRS = [STATIC_ROOT]
+
+PRECOMPRESS_EXTENSIONS = (
+    ".css", ".html", ".js", ".json", ".map", ".svg", ".txt", ".xml", ".yaml",
+)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -144,26 +216,152 @@ INTERNAL_IPS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "theatre.permissions.IsAdminOrIfAuthenticatedReadOnly",
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    "DEFAULT_RENDERER_CLASSES": (
+        "theatre.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PAGINATION_CLASS": "theatre.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 5,
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# The largest `?limit=` a paginated list accepts; larger values are
+# clamped to it.
+PAGINATION_MAX_LIMIT = 500
+
+# Paginated list pages with at least this many objects are streamed
+# to the client in chunks of JSON_STREAMING_CHUNK_SIZE objects, read
+# from the database that many rows at a time.
+JSON_STREAMING_THRESHOLD = 100
+
+JSON_STREAMING_CHUNK_SIZE = 50
+
+# Admin sales exports read rows through a server-side cursor and send
+# them to the client EXPORT_CHUNK_SIZE rows at a time.
+EXPORT_CHUNK_SIZE = 2000
+
+# Sales dashboards read the rollup tables refreshed by the
+# "theatre.refresh_sales" job; `manage.py refresh_sales` rebuilds them.
+ANALYTICS_DEFAULT_DAYS = 30
+
+ANALYTICS_MAX_DAYS = 366
+
+# Responses to POST /reservations/ with an Idempotency-Key header are
+# replayed to retries for IDEMPOTENCY_KEY_TTL seconds; a concurrent
+# duplicate waits up to IDEMPOTENCY_LOCK_TIMEOUT seconds for the first
+# request. `manage.py purge_idempotency_keys` deletes expired keys.
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
+IDEMPOTENCY_LOCK_TIMEOUT = 10
+
+# Token buckets ("number/period" refill rate, burst size) guarding
+# reservation creation and performance details, per user and per
+# performance. BOOKING_THROTTLE_STORE holds them; the default keeps them
+# in process memory.
+BOOKING_RATE_LIMITS = {
+    "user": ("30/min", 10),
+    "performance": ("50/s", 100),
+}
+
+BOOKING_THROTTLE_STORE = "theatre.throttling.InMemoryBucketStore"
+
+# A booking request is throttled on at most this many of the performances
+# it names.
+BOOKING_THROTTLE_MAX_PERFORMANCES = 10
+
+# When set ("number/period"), users are admitted into booking a
+# performance at this rate and wait in line otherwise. Admission lasts
+# BOOKING_ADMISSION_TTL seconds.
+BOOKING_WAITING_ROOM_RATE = None
+
+BOOKING_ADMISSION_TTL = 10 * 60
+
+# Seats released from a sold out performance are held for the head of
+# its waitlist for WAITLIST_OFFER_TTL seconds, then passed on.
+WAITLIST_OFFER_TTL = 15 * 60
+
+WAITLIST_MAX_SEATS = 10
+
+# /reservations/summary/ is cached per user for at most
+# RESERVATION_SUMMARY_TTL seconds and dropped when their reservations
+# change. Invalidation reaches other processes only through a shared
+# cache backend (CACHE_BACKEND, CACHE_LOCATION); the local memory default
+# suits a single process.
+RESERVATION_SUMMARY_TTL = 5 * 60
+
+# Tickets and reservations are partitioned by month. `manage.py
+# roll_partitions` keeps PARTITION_MONTHS_AHEAD months of partitions ready
+# and `manage.py archive_partitions` moves partitions older than
+# PARTITION_RETENTION_MONTHS into the PARTITION_ARCHIVE_SCHEMA schema.
+PARTITION_MONTHS_AHEAD = 3
+
+PARTITION_RETENTION_MONTHS = 24
+
+PARTITION_ARCHIVE_SCHEMA = "archive"
+
+# `manage.py archive_performances` moves performances that started more
+# than PERFORMANCE_ARCHIVE_DAYS days ago, with their tickets, to the
+# archive tables, PERFORMANCE_ARCHIVE_BATCH_SIZE performances per
+# transaction.
+PERFORMANCE_ARCHIVE_DAYS = 365
+
+PERFORMANCE_ARCHIVE_BATCH_SIZE = 100
+
+# Admin changelists of tickets and reservations show the planner's row
+# estimate instead of running COUNT(*) once it exceeds
+# ADMIN_EXACT_COUNT_LIMIT. Reservation change pages list their tickets
+# ADMIN_TICKETS_PER_PAGE at a time.
+ADMIN_EXACT_COUNT_LIMIT = 10000
+
+ADMIN_TICKETS_PER_PAGE = 50
+
 MEDIA_ROOT = BASE_DIR / "media"
 
 MEDIA_URL = "/vol/web/media/"
 
+# Uploaded play images are resized to these widths for every format
+# (format -> encoder quality) by a background job.
+PLAY_IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+
+PLAY_IMAGE_VARIANT_FORMATS = {"webp": 80, "jpeg": 82}
+
+# Limits checked while a play image upload is streamed in. Uploads larger
+# than PLAY_IMAGE_SPOOL_SIZE are spooled to disk, and the format and size
+# must be readable from the first PLAY_IMAGE_HEADER_SIZE bytes.
+PLAY_IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
+PLAY_IMAGE_SPOOL_SIZE = 1024 * 1024
+
+PLAY_IMAGE_HEADER_SIZE = 256 * 1024
+
+PLAY_IMAGE_MAX_DIMENSION = 8000
+
+PLAY_IMAGE_MAX_PIXELS = 40_000_000
+
+PLAY_IMAGE_ALLOWED_FORMATS = ("JPEG", "PNG", "WEBP")
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": (
+        "user.serializers.ClaimsTokenObtainPairSerializer"
+    ),
 }
 
+# Authenticated requests take the user from the token claims. The active
+# flag and staff rights are confirmed against a per-process cache of user
+# flags that re-reads the user row after AUTH_USER_STATE_TTL seconds.
+AUTH_USER_STATE_TTL = 60
+
+# Packages whose sources make up the default CODE_VERSION.
+SOURCE_PACKAGES = ("theatre", "theatre_service", "user")
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Theatre Service API",
     "DESCRIPTION": "Reserve tickets for your performances",
@@ -176,3 +374,81 @@ SPECTACULAR_SETTINGS = {
         "defaultModelExpandDepth": 2,
     }
 }
+
+
+def source_version(root=BASE_DIR, packages=SOURCE_PACKAGES) -> str:
+    """Digest of the Python sources of `packages`, changing with the code."""
+    digest = hashlib.sha256()
+    for package in packages:
+        for path in sorted((root / package).rglob("*.py")):
+            digest.update(path.relative_to(root).as_posix().encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+# Identifies the deployed code; pre-generated artifacts such as the
+# OpenAPI schema are only served when they were built for this version.
+# Without CODE_VERSION (e.g. a release tag or commit) it is derived from
+# the sources, so a schema built for other code is never served.
+CODE_VERSION = os.environ.get("CODE_VERSION") or source_version()
+
+OPENAPI_SCHEMA_DIR = BASE_DIR / "build" / "openapi"
+
+# /schedule/ returns SCHEDULE_DEFAULT_DAYS days from `from` when `to` is
+# omitted, and at most SCHEDULE_MAX_DAYS days per request.
+SCHEDULE_DEFAULT_DAYS = 31
+
+SCHEDULE_MAX_DAYS = 62
+
+# Length in minutes assumed for performances when checking a hall for
+# double bookings. A bulk schedule may create at most
+# BULK_SCHEDULE_MAX_PERFORMANCES performances over BULK_SCHEDULE_MAX_DAYS.
+PERFORMANCE_DEFAULT_DURATION = 180
+
+BULK_SCHEDULE_MAX_PERFORMANCES = 500
+
+BULK_SCHEDULE_MAX_DAYS = 366
+
+# In-process prefix index behind /autocomplete/, built in the background
+# when a process starts serving. Each process rebuilds it in the background
+# every AUTOCOMPLETE_REBUILD_INTERVAL seconds to pick up changes made by
+# other processes, serving the previous index meanwhile; a lookup walks at
+# most AUTOCOMPLETE_MAX_SCAN entries.
+AUTOCOMPLETE_LIMIT = 10
+
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+AUTOCOMPLETE_MAX_SCAN = 2000
+
+AUTOCOMPLETE_REBUILD_INTERVAL = 300
+
+# Background jobs are stored in the theatre.Job table and run by
+# `manage.py run_worker`. Failed jobs are retried up to JOB_MAX_ATTEMPTS
+# times with exponential backoff starting at JOB_RETRY_BACKOFF seconds;
+# the worker running a job renews its JOB_LOCK_TIMEOUT second lock while it
+# runs, and a job whose lock expires (its worker died) is handed to another
+# worker until its attempts are used up. Workers outlive database outages,
+# polling again after at most JOB_DB_RETRY_MAX_DELAY seconds.
+JOB_QUEUES = ("default", "images")
+
+JOB_WORKER_CONCURRENCY = int(os.environ.get("JOB_WORKER_CONCURRENCY", 2))
+
+JOB_POLL_INTERVAL = 1.0
+
+JOB_LOCK_TIMEOUT = 300
+
+JOB_MAX_ATTEMPTS = 5
+
+JOB_RETRY_BACKOFF = 10
+
+JOB_RETRY_MAX_DELAY = 3600
+
+JOB_DB_RETRY_MAX_DELAY = 30
+
+EMAIL_BACKEND = os.environ.get(
+    "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+
+DEFAULT_FROM_EMAIL = os.environ.get(
+    "DEFAULT_FROM_EMAIL", "tickets@theatre.local"
+)
@@ -14,23 +14,28 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from debug_toolbar.toolbar import debug_toolbar_urls
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from drf_spectacular.views import (
-    SpectacularAPIView,
     SpectacularSwaggerView,
     SpectacularRedocView,
 )
 
+from theatre.compression import serve_precompressed, serve_static
+from theatre.schema import CachedSpectacularAPIView
 from theatre_service import settings
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/theatre/", include("theatre.urls", namespace="theatre")),
     path("api/v1/user/", include("user.urls", namespace="user")),
-    path("api/v1/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path(
+        "api/v1/schema/", CachedSpectacularAPIView.as_view(), name="schema"
+    ),
     path(
         "api/v1/doc/swagger/",
         SpectacularSwaggerView.as_view(url_name="schema"),
@@ -41,6 +46,12 @@ urlpatterns = [
         SpectacularRedocView.as_view(url_name="schema"),
         name="redoc"
     ),
+    re_path(
+        rf"^{re.escape(settings.STATIC_URL.lstrip('/'))}(?P<path>.*)$",
+        serve_static,
+    ),
 ] + debug_toolbar_urls() + static(
-    settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
+    settings.MEDIA_URL,
+    view=serve_precompressed,
+    document_root=settings.MEDIA_ROOT,
 )
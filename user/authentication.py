@@ -0,0 +1,178 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+
+class UserState(NamedTuple):
+    is_active: bool
+    is_staff: bool
+    is_superuser: bool
+
+
+INACTIVE = UserState(False, False, False)
+
+
+class UserStateCache:
+    """
+    Per-process cache of the flags of recently checked users. Entries live
+    for AUTH_USER_STATE_TTL seconds, except deactivations, which are kept
+    as long as an access token issued before them can be valid. Only the
+    `max_keys` most recently used users are kept; an evicted user is read
+    from the database again.
+    """
+
+    max_keys = 100_000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = OrderedDict()
+
+    def get(self, user_id) -> UserState | None:
+        with self._lock:
+            entry = self._states.get(user_id)
+            if entry is None:
+                return None
+            state, expires = entry
+            if expires <= time.monotonic():
+                del self._states[user_id]
+                return None
+            self._states.move_to_end(user_id)
+            return state
+
+    def remember(self, user_id, state: UserState) -> None:
+        with self._lock:
+            self._remember(user_id, state)
+
+    def _remember(self, user_id, state: UserState) -> None:
+        if state.is_active:
+            ttl = settings.AUTH_USER_STATE_TTL
+        else:
+            ttl = api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+        self._states[user_id] = (state, time.monotonic() + ttl)
+        self._states.move_to_end(user_id)
+        while len(self._states) > self.max_keys:
+            self._states.popitem(last=False)
+
+    def load(self, user_id) -> UserState:
+        """The cached state, or the one read with a single query."""
+        state = self.get(user_id)
+        if state is None:
+            row = (
+                get_user_model().objects.filter(pk=user_id)
+                .values_list("is_active", "is_staff", "is_superuser")
+                .first()
+            )
+            state = UserState(*row) if row else INACTIVE
+            self.remember(user_id, state)
+        return state
+
+    def user_changed(self, user, deleted: bool = False) -> None:
+        """Record a saved or deleted user this process may have cached."""
+        state = INACTIVE if deleted else UserState(
+            user.is_active, user.is_staff, user.is_superuser
+        )
+        with self._lock:
+            if not state.is_active or user.pk in self._states:
+                self._remember(user.pk, state)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+user_states = UserStateCache()
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    `request.user` backed by the access token. The id and the staff flags
+    are read from the signed claims; the active flag and staff rights are
+    confirmed against the cached user state, and any other use loads the
+    user row once.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        # simplejwt signs the id as a string.
+        user_id = get_user_model()._meta.pk.to_python(
+            token[api_settings.USER_ID_CLAIM]
+        )
+        super().__init__(
+            lambda: get_user_model().objects.get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        )
+        self.__dict__["_token"] = token
+        self.__dict__["_user_id"] = user_id
+
+    def __bool__(self):
+        return True
+
+    def __copy__(self):
+        return type(self)(self._token)
+
+    def __deepcopy__(self, memo):
+        return type(self)(self._token)
+
+    @property
+    def id(self):
+        return self._user_id
+
+    @property
+    def pk(self):
+        return self._user_id
+
+    @property
+    def is_active(self) -> bool:
+        # A miss reads the row, so users deactivated by another process
+        # or by a queryset update are refused within AUTH_USER_STATE_TTL.
+        return user_states.load(self._user_id).is_active
+
+    @property
+    def is_staff(self) -> bool:
+        return self._staff_flag("is_staff")
+
+    @property
+    def is_superuser(self) -> bool:
+        return self._staff_flag("is_superuser")
+
+    def _staff_flag(self, name: str) -> bool:
+        # Tokens issued before the claims existed fall back to the lookup.
+        if not self._token.get(name, True):
+            return False
+        state = user_states.load(self._user_id)
+        return state.is_active and getattr(state, name)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that does not read the user row on every request:
+    the user is built from the token claims and checked against the cached
+    user state, read at most once per AUTH_USER_STATE_TTL seconds.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+        user = ClaimsUser(validated_token)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        return user
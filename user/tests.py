@@ -1,3 +1,189 @@
-from django.test import TestCase
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from theatre.tests.tests_api.test_helpers import create_performance
+from user.authentication import UserState, UserStateCache, user_states
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+GENRE_URL = reverse("theatre:genre-list")
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+class UserStateCacheTests(TestCase):
+    def test_least_recently_used_users_are_evicted(self):
+        states = UserStateCache()
+        active = UserState(True, False, False)
+
+        with mock.patch.object(UserStateCache, "max_keys", 2):
+            states.remember(1, active)
+            states.remember(2, active)
+            states.get(1)
+            states.remember(3, active)
+
+        self.assertEqual(states.get(1), active)
+        self.assertIsNone(states.get(2))
+        self.assertEqual(states.get(3), active)
+
+
+class ClaimsJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        user_states.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "password"
+        )
+
+    def authenticate(self, user):
+        token = RefreshToken.for_user(user)
+        token["is_staff"] = user.is_staff
+        token["is_superuser"] = user.is_superuser
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {token.access_token}"
+        )
+
+    def user_queries(self, method, *args, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(*args, **kwargs)
+        return response, [
+            query["sql"] for query in queries
+            if '"user_user"' in query["sql"]
+        ]
+
+    def test_obtained_tokens_carry_staff_claims(self):
+        response = self.client.post(
+            TOKEN_URL, {"email": "admin@test.com", "password": "password"}
+        )
+        token = AccessToken(response.data["access"])
+
+        self.assertTrue(token["is_staff"])
+        self.assertTrue(token["is_superuser"])
+
+    def test_user_state_is_read_once(self):
+        self.authenticate(self.user)
+
+        response, queries = self.user_queries("get", GENRE_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+
+        response, queries = self.user_queries("get", GENRE_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, [])
+
+    def test_non_staff_write_is_refused_without_lookup(self):
+        self.authenticate(self.user)
+        self.client.get(GENRE_URL)
+
+        response, queries = self.user_queries(
+            "post", GENRE_URL, {"name": "Drama"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(queries, [])
+
+    def test_staff_rights_are_confirmed_once(self):
+        self.authenticate(self.admin)
+
+        response, queries = self.user_queries(
+            "post", GENRE_URL, {"name": "Drama"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(queries), 1)
+
+        response, queries = self.user_queries(
+            "post", GENRE_URL, {"name": "Comedy"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(queries, [])
+
+    def test_demoted_staff_lose_rights(self):
+        self.authenticate(self.admin)
+        self.client.post(GENRE_URL, {"name": "Drama"})
+
+        self.admin.is_staff = False
+        self.admin.save()
+        response = self.client.post(GENRE_URL, {"name": "Comedy"})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_deactivated_user_is_rejected(self):
+        self.authenticate(self.user)
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(GENRE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_deactivated_elsewhere_is_rejected(self):
+        self.authenticate(self.user)
+        self.assertEqual(
+            self.client.get(GENRE_URL).status_code, status.HTTP_200_OK
+        )
+
+        # No signal reaches this process, as for another worker or the
+        # shell; a process that has not cached the user reads the row.
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False
+        )
+        user_states.clear()
+
+        response = self.client.get(GENRE_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_USER_STATE_TTL=0)
+    def test_cached_state_expires(self):
+        self.authenticate(self.user)
+        self.client.get(GENRE_URL)
+
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False
+        )
+
+        response = self.client.get(GENRE_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_schema_declares_jwt_scheme(self):
+        response = self.client.get(reverse("schema"), {"format": "json"})
+
+        schema = json.loads(response.content)
+        self.assertIn("jwtAuth", schema["components"]["securitySchemes"])
+        self.assertIn(
+            {"jwtAuth": []},
+            schema["paths"]["/api/v1/theatre/genres/"]["get"]["security"],
+        )
+
+    def test_tokens_without_claims_fall_back_to_lookup(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.admin)}"
+        )
+
+        response = self.client.post(GENRE_URL, {"name": "Drama"})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_user_row_is_loaded_for_reservations(self):
+        self.authenticate(self.user)
+        performance = create_performance()
+
+        response = self.client.post(
+            RESERVATION_URL,
+            {"tickets": [
+                {"row": 1, "seat": 1, "performance": performance.id}
+            ]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.user.reservations.count(), 1)